@@ -0,0 +1 @@
+"""Benchmarks for ctf_scraper — run from the repository root, e.g. ``python -m benchmarks.throughput``."""
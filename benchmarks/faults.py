@@ -0,0 +1,120 @@
+"""Resilience scenarios: scrape the mock CTF under each fault profile.
+
+Each profile from ``benchmarks.mock_ctf.FAULT_PROFILES`` gets a full scrape
+in a fresh process, compared against a clean run of the same catalog:
+
+- wall time;
+- wasted bytes, meaning body bytes served beyond the clean run's;
+- extra requests (retries) over the clean run;
+- the faults actually injected;
+- correctness of the output tree: every challenge folder present and
+  every attachment byte-identical to the catalog.
+
+    python -m benchmarks.faults --platform ctfd --challenges 50 --json faults.json
+"""
+import argparse
+import hashlib
+import json
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.mock_ctf import FAULT_PROFILES, PLATFORMS, Catalog, MockCTFServer, parse_size
+from benchmarks.throughput import run_scenario
+
+
+def check_output(catalog: Catalog, output_dir: Path) -> Dict:
+    """Compare a scraped tree with the catalog: challenge folders and attachment bytes."""
+    expected = {}
+    for chal_id in catalog.ids():
+        for index in range(catalog.files_per_challenge):
+            path = catalog.file_path(chal_id, index)
+            expected[path.rsplit('/', 1)[-1]] = hashlib.sha256(catalog.file_body(path)).hexdigest()
+
+    found = {p.name: p for p in output_dir.rglob('chall*_*.bin')}
+    corrupt = sorted(name for name, path in found.items()
+                     if name in expected and hashlib.sha256(path.read_bytes()).hexdigest() != expected[name])
+    missing = sorted(set(expected) - set(found))
+    challenges = sum(1 for _ in output_dir.rglob('challenge.txt'))
+    return {
+        'challenges_saved': challenges,
+        'files_ok':         len(expected) - len(missing) - len(corrupt),
+        'files_missing':    len(missing),
+        'files_corrupt':    len(corrupt),
+        'leftover_parts':   sum(1 for _ in output_dir.rglob('*.part')),
+        'correct':          challenges == catalog.challenges and not missing and not corrupt,
+    }
+
+
+def run_profile(server: MockCTFServer, catalog: Catalog, name: str, options: Dict) -> Dict:
+    server.faults = dict(FAULT_PROFILES[name])
+    result = run_scenario(server, options, keep_output=True)
+    workdir = Path(result.pop('workdir'))
+    try:
+        result.update(check_output(catalog, workdir / 'out'))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    result.update(profile=name, injected=dict(server.injected))
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Measure the cost of faults on a local mock CTF')
+    parser.add_argument('--platform', choices=PLATFORMS, default='ctfd')
+    parser.add_argument('--challenges', type=int, default=50, metavar='N')
+    parser.add_argument('--files', type=int, default=1, metavar='N', help='Attachments per challenge')
+    parser.add_argument('--file-size', type=parse_size, default=256 * 1024, metavar='SIZE')
+    parser.add_argument('--latency', type=float, default=0.01, metavar='SECONDS')
+    parser.add_argument('--profiles', default=','.join(p for p in FAULT_PROFILES if p != 'clean'),
+                        help='Comma-separated fault profiles (default: all)')
+    parser.add_argument('--max-workers', type=int, default=5, metavar='N')
+    parser.add_argument('--rate-limit', default='0', metavar='R',
+                        help='Scraper --rate-limit for every run, e.g. 5 or auto (default: unlimited)')
+    parser.add_argument('--timeout', type=int, default=10, metavar='SECONDS',
+                        help='Scraper request timeout (default: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for fault injection')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+    args = parser.parse_args(argv)
+
+    profiles = [p.strip() for p in args.profiles.split(',') if p.strip()]
+    unknown = [p for p in profiles if p not in FAULT_PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)} (choose from {', '.join(FAULT_PROFILES)})")
+
+    options = {
+        'max_workers': args.max_workers,
+        'rate_limit':  args.rate_limit if args.rate_limit == 'auto' else float(args.rate_limit),
+        'timeout':     args.timeout,
+    }
+    catalog = Catalog(args.challenges, args.files, args.file_size)
+    results = []
+    with MockCTFServer(args.platform, catalog, latency=args.latency, seed=args.seed) as server:
+        baseline = run_profile(server, catalog, 'clean', options)
+        print(f"{'profile':<15} {'wall s':>7} {'x clean':>7} {'wasted':>10} {'retries':>7} "
+              f"{'files ok':>9} {'corrupt':>7} {'correct':>7}  injected")
+        for name in ['clean'] + [p for p in profiles if p != 'clean']:
+            result = baseline if name == 'clean' else run_profile(server, catalog, name, options)
+            result['wasted_bytes'] = max(0, result['bytes'] - baseline['bytes'])
+            result['retries'] = max(0, result['requests'] - baseline['requests'])
+            results.append(result)
+            injected = ', '.join(f"{k}={v}" for k, v in sorted(result['injected'].items())) or '-'
+            print(f"{name:<15} {result['wall_s']:>7.2f} {result['wall_s'] / baseline['wall_s']:>7.2f} "
+                  f"{result['wasted_bytes']:>10} {result['retries']:>7} "
+                  f"{result['files_ok']:>4}/{catalog.challenges * catalog.files_per_challenge:<4} "
+                  f"{result['files_corrupt']:>7} {'yes' if result['correct'] else 'NO':>7}  {injected}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'created_at': datetime.now().isoformat(),
+                'config':     {k: v for k, v in vars(args).items() if k != 'json'},
+                'results':    results,
+            }, f, indent=2)
+        print(f"Results written → {args.json}")
+    return 0 if all(r['correct'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
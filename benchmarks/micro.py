@@ -0,0 +1,241 @@
+"""Micro-benchmarks for the scraper's pure-CPU hot paths.
+
+Covers ``_html_to_text``, the picoCTF description + hints parsing in
+``_fetch_picoctf_challenge_details_api``, ``_sanitize_filename``,
+``ScraperState.save`` as the completed set grows, and ``RateLimiter.wait``
+under 1–64 contending threads.  Results are JSON; ``--baseline`` compares
+against a saved run and exits non-zero on regressions.
+
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --baseline baseline.json --threshold 1.25
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.mock_ctf import Catalog
+
+# (name, setup) — setup returns (fn, ops per call of fn, teardown or None)
+Benchmark = Tuple[str, Callable[[], Tuple[Callable[[], None], int, Optional[Callable[[], None]]]]]
+
+_CTFD_DESCRIPTION = (
+    '<h2>Baby ROP</h2>'
+    '<p>Our intern wrote a <strong>totally secure</strong> echo service. '
+    'It runs at <code>nc rop.example.com 31337</code>.</p>'
+    '<p>Download the binary and <a href="/files/0123abcd/libc.so.6">libc</a>, '
+    'then pop a shell.</p>'
+    '<ul>' + ''.join(f'<li>Hint {i}: check <em>gadget {i:#x}</em></li>' for i in range(12)) + '</ul>'
+    '<pre><code>' + '\n'.join(f'0x{0x401000 + i * 16:x}: pop rdi ; ret' for i in range(40)) + '</code></pre>'
+    '<p>Flag format: <code>flag{...}</code></p>'
+)
+_PLAIN_DESCRIPTION = 'Connect to nc chall.example.com 1337 and find the flag. ' * 8
+
+
+def _html_to_text_bench(raw: str, memo: bool = False):
+    """Cold conversions clear the content-hash memo first, so every call parses."""
+    def setup():
+        from ctf_scraper import _html_to_text, _parse_html
+        if memo:
+            return (lambda: _html_to_text(raw)), 1, None
+
+        def cold():
+            _parse_html.cache_clear()
+            _html_to_text(raw)
+        return cold, 1, None
+    return setup
+
+
+def _picoctf_details_setup():
+    from ctf_scraper import UniversalCTFScraper, _parse_html
+    catalog = Catalog(challenges=1, files_per_challenge=3)
+    c = catalog.challenge(1)
+    links = ''.join(f'<a href="{f}">{f.rsplit("/", 1)[-1]}</a> ' for f in c['files'])
+    payload = {
+        'description': f"{c['description']}{_CTFD_DESCRIPTION}<p>{links}</p>",
+        'hints': ['<p>Look at the <code>timing</code>.</p>', {'hint': 'Try <b>harder</b>'},
+                  '<ul><li>strace</li><li>ltrace</li></ul>'],
+    }
+
+    class _Response:
+        status_code = 200
+
+        def json(self):
+            return payload
+
+    workdir = tempfile.TemporaryDirectory(prefix='ctf-micro-')
+    scraper = UniversalCTFScraper(url='https://ctf.example.com', output_dir=workdir.name)
+    scraper._get = lambda url: _Response()
+
+    def run():
+        _parse_html.cache_clear()
+        scraper._fetch_picoctf_challenge_details_api('1')
+    return run, 1, workdir.cleanup
+
+
+def _sanitize_setup():
+    from ctf_scraper import UniversalCTFScraper
+    names = ['Baby ROP', 'web/easy: "login" <v2>', '...hidden...', 'Crypto | RSA?*',
+             'A' * 120, 'unicode ✓ challenge', '  padded  ', 'a/b\\c']
+    sanitize = UniversalCTFScraper._sanitize_filename
+
+    def run():
+        for name in names:
+            sanitize(name)
+    return run, len(names), None
+
+
+def _state_save_bench(size: int):
+    def setup():
+        from ctf_scraper import ScraperState
+        workdir = tempfile.TemporaryDirectory(prefix='ctf-micro-')
+        state = ScraperState(Path(workdir.name) / '.scraper_state.json')
+        state.state['completed_challenges'] = {str(i) for i in range(size)}
+        return state.save, 1, workdir.cleanup
+    return setup
+
+
+def _rate_limiter_bench(threads: int, calls_per_thread: int = 2000):
+    def setup():
+        from ctf_scraper import RateLimiter
+        limiter = RateLimiter(1e9, burst=1000)   # token math and locking, never sleeps
+
+        def run():
+            def worker():
+                for _ in range(calls_per_thread):
+                    limiter.wait()
+            pool = [threading.Thread(target=worker) for _ in range(threads)]
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+        return run, threads * calls_per_thread, None
+    return setup
+
+
+BENCHMARKS: List[Benchmark] = [
+    ('html_to_text/ctfd_description', _html_to_text_bench(_CTFD_DESCRIPTION)),
+    ('html_to_text/ctfd_memo_hit',    _html_to_text_bench(_CTFD_DESCRIPTION, memo=True)),
+    ('html_to_text/plain_text',       _html_to_text_bench(_PLAIN_DESCRIPTION, memo=True)),   # no parse
+    ('picoctf/details_parse',         _picoctf_details_setup),
+    ('sanitize_filename',             _sanitize_setup),
+    *[(f'state_save/{n}', _state_save_bench(n)) for n in (10, 100, 1_000, 10_000, 100_000)],
+    *[(f'rate_limiter_wait/{n}_threads', _rate_limiter_bench(n)) for n in (1, 2, 4, 8, 16, 32, 64)],
+]
+
+
+def measure(fn: Callable[[], None], ops: int, min_time: float, repeat: int) -> Dict:
+    """Time fn in batches of at least min_time seconds; per-op figures in microseconds."""
+    fn()   # warm-up (imports, caches)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append(time.perf_counter() - start)
+    per_op = [s / (loops * ops) * 1e6 for s in samples]
+    return {
+        'median_us': statistics.median(per_op),
+        'min_us':    min(per_op),
+        'stdev_us':  statistics.stdev(per_op) if len(per_op) > 1 else 0.0,
+        'loops':     loops,
+        'ops':       ops,
+        'repeat':    repeat,
+    }
+
+
+def run(selected: List[Benchmark], min_time: float, repeat: int) -> Dict[str, Dict]:
+    logging.getLogger('ctf_scraper').setLevel(logging.WARNING)
+    results = {}
+    for name, setup in selected:
+        fn, ops, teardown = setup()
+        try:
+            results[name] = measure(fn, ops, min_time, repeat)
+        finally:
+            if teardown:
+                teardown()
+        print(f"{name:<36} {results[name]['median_us']:>12.2f} µs/op", file=sys.stderr)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Print current vs baseline; return the names slower than threshold × baseline."""
+    regressions = []
+    print(f"\n{'benchmark':<36} {'baseline µs':>12} {'now µs':>12} {'ratio':>7}", file=sys.stderr)
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            print(f"{name:<36} {'-':>12} {result['median_us']:>12.2f} {'new':>7}", file=sys.stderr)
+            continue
+        ratio = result['median_us'] / before['median_us'] if before['median_us'] else float('inf')
+        flag = '  REGRESSION' if ratio > threshold else ''
+        print(f"{name:<36} {before['median_us']:>12.2f} {result['median_us']:>12.2f} {ratio:>6.2f}x{flag}", file=sys.stderr)
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Micro-benchmark the scraper\'s CPU hot paths')
+    parser.add_argument('-k', '--filter', default='', metavar='TEXT',
+                        help='Only run benchmarks whose name contains TEXT')
+    parser.add_argument('--min-time', type=float, default=0.2, metavar='SECONDS',
+                        help='Minimum duration of each timed batch (default: 0.2)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed batches per benchmark (default: 5)')
+    parser.add_argument('--save', metavar='PATH', help='Write results as JSON (e.g. a new baseline)')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved run')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown ratio that counts as a regression (default: 1.25)')
+    args = parser.parse_args(argv)
+
+    selected = [b for b in BENCHMARKS if args.filter in b[0]]
+    if not selected:
+        parser.error(f"no benchmark matches {args.filter!r}")
+
+    results = run(selected, args.min_time, max(1, args.repeat))
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python':     platform.python_version(),
+        'machine':    platform.platform(),
+        'cpu_count':  os.cpu_count(),
+        'results':    results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written → {args.save}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold}x: {', '.join(regressions)}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,425 @@
+"""Local stand-in CTF server for benchmarks.
+
+Speaks the parts of the CTFd, picoCTF, rCTF and Mellivora APIs that
+UniversalCTFScraper uses, over a synthetic catalog of N challenges.  The
+attachment size, per-request latency and per-connection bandwidth are all
+configurable.  Attachments support Range / If-Range and ETag revalidation,
+so resumable, segmented and deduplicated downloads are exercised too.
+
+A fault profile (see FAULT_PROFILES) makes the server misbehave the way a
+CTF does in its opening minute: 429s with Retry-After, 502/503 bursts,
+connections reset mid-body, truncated bodies, slow-loris responses and
+expiring file tokens.
+
+    python -m benchmarks.mock_ctf --platform ctfd --challenges 500 --port 8000
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PLATFORMS = ('ctfd', 'picoctf', 'rctf', 'mellivora')
+CATEGORIES = ('Web', 'Crypto', 'Pwn', 'Reverse', 'Forensics', 'Misc')
+PICOCTF_PAGE_SIZE = 50
+
+# Base pages carry the same markers as the real platforms (see _HTML_MARKERS)
+_BASE_PAGES = {
+    'ctfd':      '<script>var csrfNonce = "0";</script><footer>Powered by <a href="https://ctfd.io">CTFd</a></footer>',
+    'rctf':      '<script>window.rctfConfig = {"ctfName": "mock"}</script>',
+    'mellivora': '<footer>Powered by Mellivora</footer>',
+    'picoctf':   '<title>picoCTF - practice</title>',
+}
+
+_DESCRIPTION = (
+    '<p>The flag checker behind <code>chall-{id}.example.com</code> compares your input '
+    'one byte at a time. <strong>Challenge {id}</strong> &mdash; can you beat it?</p>'
+    '<ul><li>Connect with <code>nc chall-{id}.example.com {port}</code></li>'
+    '<li>Flag format: <code>flag{{...}}</code></li></ul>'
+    '<p>Author notes: the binary was built with <em>-O2</em> and no PIE.</p>'
+)
+
+# Challenge-list endpoints; faults spare them unless a profile sets scope='all'
+_LIST_PATHS = {'/', '/api/v1/challenges', '/api/challenges/', '/api/v1/challs', '/api/challenges.php'}
+
+# Probabilities are per request.  Body faults (reset, truncate, slow) only hit attachments.
+FAULT_PROFILES = {
+    'clean':          {},
+    'throttle':       {'p_429': 0.15, 'retry_after': 1},
+    'outage':         {'p_burst': 0.05, 'burst_len': 15},
+    'resets':         {'p_reset': 0.15},
+    'truncated':      {'p_truncate': 0.15},
+    'slowloris':      {'p_slow': 0.1, 'slow_rate': 32 * 1024},
+    'expired_tokens': {'token_ttl': 0.03},
+    'opening_minute': {'p_429': 0.05, 'retry_after': 1, 'p_burst': 0.005, 'burst_len': 10,
+                       'p_reset': 0.03, 'p_truncate': 0.03, 'p_slow': 0.02, 'slow_rate': 64 * 1024},
+}
+
+_SIZE_UNITS = {'': 1, 'b': 1, 'k': 1000, 'kb': 1000, 'kib': 1024,
+               'm': 1000 ** 2, 'mb': 1000 ** 2, 'mib': 1024 ** 2,
+               'g': 1000 ** 3, 'gb': 1000 ** 3, 'gib': 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """Parse '4096', '64KiB', '1.5MB' … into bytes."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([a-zA-Z]*)\s*', str(value))
+    if not match or match.group(2).lower() not in _SIZE_UNITS:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+class Catalog:
+    """Deterministic synthetic challenges and attachment bodies."""
+
+    def __init__(self, challenges: int = 100, files_per_challenge: int = 1,
+                 file_size: int = 64 * 1024):
+        self.challenges = challenges
+        self.files_per_challenge = files_per_challenge
+        self.file_size = file_size
+
+    def ids(self) -> range:
+        return range(1, self.challenges + 1)
+
+    def file_path(self, chal_id: int, index: int) -> str:
+        # CTFd-style /files/<hash>/<name>
+        digest = hashlib.md5(f'{chal_id}:{index}'.encode()).hexdigest()
+        return f'/files/{digest}/chall{chal_id}_{index}.bin'
+
+    def challenge(self, chal_id: int) -> Dict:
+        return {
+            'id':          chal_id,
+            'name':        f'Challenge {chal_id:04d}',
+            'category':    CATEGORIES[chal_id % len(CATEGORIES)],
+            'points':      100 * (1 + chal_id % 5),
+            'solves':      (chal_id * 7) % 300,
+            'author':      f'author{chal_id % 9}',
+            'description': _DESCRIPTION.format(id=chal_id, port=31000 + chal_id),
+            'files':       [self.file_path(chal_id, j) for j in range(self.files_per_challenge)],
+        }
+
+    def file_body(self, path: str) -> Optional[bytes]:
+        """Attachment bytes for a /files/ path, or None if the catalog has no such file."""
+        match = re.fullmatch(r'/files/([0-9a-f]{32})/chall(\d+)_(\d+)\.bin', path)
+        if not match:
+            return None
+        chal_id, index = int(match.group(2)), int(match.group(3))
+        if (chal_id not in self.ids() or index >= self.files_per_challenge
+                or match.group(1) != hashlib.md5(f'{chal_id}:{index}'.encode()).hexdigest()):
+            return None
+        block = hashlib.sha256(path.encode()).digest()
+        return (block * (self.file_size // len(block) + 1))[:self.file_size]
+
+
+class MockCTFServer(ThreadingHTTPServer):
+    """Threaded HTTP/1.1 server for one platform's API over a Catalog."""
+
+    daemon_threads = True
+
+    def __init__(self, platform: str = 'ctfd', catalog: Optional[Catalog] = None,
+                 latency: float = 0.0, bandwidth: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0,
+                 faults: Optional[Dict] = None, seed: int = 0):
+        if platform not in PLATFORMS:
+            raise ValueError(f"unknown platform: {platform}")
+        super().__init__((host, port), _Handler)
+        self.platform = platform
+        self.catalog = catalog or Catalog()
+        self.latency = latency        # seconds added before every response
+        self.bandwidth = bandwidth    # bytes/s per connection (0 = unthrottled)
+        self.faults = dict(faults or {})
+        self._random = random.Random(seed)
+        self._burst_left = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.requests = 0
+        self.bytes_sent = 0
+        self.paths: Counter = Counter()      # requests per path (query stripped)
+        self.injected: Counter = Counter()   # faults served, by kind
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockCTFServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='mock-ctf', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> 'MockCTFServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients dropping keep-alive connections (or the scraper process exiting) is routine
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.paths.clear()
+            self.injected.clear()
+            self._burst_left = 0
+
+    def count(self, body_bytes: int, path: str = '') -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += body_bytes
+            self.paths[path] += 1
+
+    def pick_fault(self, path: str) -> Optional[str]:
+        """The fault to inject into this request, if any: '429', '502', '503', 'reset', 'truncate' or 'slow'."""
+        faults = self.faults
+        if not faults or (path in _LIST_PATHS and faults.get('scope') != 'all'):
+            return None
+        with self._lock:
+            roll = self._random.random
+            fault = None
+            if self._burst_left:
+                self._burst_left -= 1
+                fault = '502' if self._burst_left % 2 else '503'
+            elif roll() < faults.get('p_burst', 0):
+                self._burst_left = faults.get('burst_len', 10) - 1
+                fault = '503'
+            elif roll() < faults.get('p_429', 0):
+                fault = '429'
+            elif path.startswith('/files/'):
+                for kind in ('reset', 'truncate', 'slow'):
+                    if roll() < faults.get(f'p_{kind}', 0):
+                        fault = kind
+                        break
+            if fault:
+                self.injected[fault] += 1
+            return fault
+
+    def file_token(self) -> str:
+        """Token for a CTFd file link — it records when it was issued."""
+        return f'{time.monotonic():.3f}'
+
+    def token_expired(self, query: Dict[str, List[str]]) -> bool:
+        ttl = self.faults.get('token_ttl')
+        if not ttl or self.platform != 'ctfd':
+            return False
+        try:
+            issued = float((query.get('token') or [''])[0])
+        except ValueError:
+            return True
+        expired = time.monotonic() - issued > ttl
+        if expired:
+            with self._lock:
+                self.injected['expired_token'] += 1
+        return expired
+
+    def route(self, path: str, query: Dict[str, List[str]]) -> Optional[Tuple[str, object]]:
+        """(content type, payload) for an API path on this platform, or None for 404."""
+        catalog = self.catalog
+        if path == '/':
+            return 'text/html', _BASE_PAGES[self.platform]
+
+        if self.platform == 'ctfd':
+            if path == '/api/v1/challenges':
+                return 'application/json', {'success': True, 'data': [
+                    {'id': c['id'], 'name': c['name'], 'category': c['category'],
+                     'value': c['points'], 'solves': c['solves']}
+                    for c in map(catalog.challenge, catalog.ids())]}
+            match = re.fullmatch(r'/api/v1/challenges/(\d+)', path)
+            if match and int(match.group(1)) in catalog.ids():
+                c = catalog.challenge(int(match.group(1)))
+                return 'application/json', {'success': True, 'data': {
+                    'id': c['id'], 'name': c['name'], 'category': c['category'],
+                    'description': c['description'], 'value': c['points'],
+                    'solves': c['solves'], 'tags': [c['category'].lower()],
+                    'files': [f"{f}?token={self.file_token()}" for f in c['files']]}}
+
+        elif self.platform == 'picoctf':
+            if path == '/api/challenges/':
+                page = int((query.get('page') or ['1'])[0])
+                first = (page - 1) * PICOCTF_PAGE_SIZE + 1
+                ids = range(first, min(first + PICOCTF_PAGE_SIZE, catalog.challenges + 1))
+                return 'application/json', {'count': catalog.challenges, 'results': [
+                    {'id': c['id'], 'name': c['name'], 'category': {'name': c['category']},
+                     'event_points': c['points'], 'users_solved': c['solves'],
+                     'author': c['author'], 'difficulty': 1 + c['id'] % 3,
+                     'tags': [{'name': c['category'].lower()}], 'event': {'name': 'mock'}}
+                    for c in map(catalog.challenge, ids)]}
+            match = re.fullmatch(r'/api/challenges/(\d+)/instance/', path)
+            if match and int(match.group(1)) in catalog.ids():
+                c = catalog.challenge(int(match.group(1)))
+                links = ''.join(f'<a href="{f}">{f.rsplit("/", 1)[-1]}</a> ' for f in c['files'])
+                return 'application/json', {
+                    'description': f"{c['description']}<p>{links}</p>",
+                    'hints': ['<p>Look at the <code>timing</code>.</p>', {'hint': 'Try <b>harder</b>'}]}
+
+        elif self.platform == 'rctf':
+            if path == '/api/v1/challs':
+                return 'application/json', {'kind': 'goodChallenges', 'data': [
+                    {'id': str(c['id']), 'name': c['name'], 'category': c['category'],
+                     'description': c['description'], 'points': c['points'],
+                     'solves': c['solves'], 'author': c['author'],
+                     'files': [{'name': f.rsplit('/', 1)[-1], 'url': self.url + f} for f in c['files']]}
+                    for c in map(catalog.challenge, catalog.ids())]}
+
+        elif self.platform == 'mellivora':
+            if path == '/api/challenges.php':
+                return 'application/json', [
+                    {'id': c['id'], 'title': c['name'], 'category': c['category'],
+                     'description': c['description'], 'points': c['points'], 'solves': c['solves']}
+                    for c in map(catalog.challenge, catalog.ids())]
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like a real CTF behind nginx
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        self._path = parsed.path
+        self._fault = server.pick_fault(parsed.path)
+        if self._fault == '429':
+            self._send(429, 'application/json', b'{"message": "Too Many Requests"}',
+                       {'Retry-After': str(server.faults.get('retry_after', 1))})
+            return
+        if self._fault in ('502', '503'):
+            self._send(int(self._fault), 'text/html', b'<h1>Service Unavailable</h1>')
+            return
+        if parsed.path.startswith('/files/'):
+            if server.token_expired(query):
+                self._send(403, 'application/json', b'{"message": "Token expired"}')
+                return
+            self._send_file(parsed.path)
+            return
+        routed = server.route(parsed.path, query)
+        if routed is None:
+            self._send(404, 'application/json', b'{"message": "Not Found"}')
+            return
+        content_type, payload = routed
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self._send(200, content_type, body)
+
+    def _send(self, status: int, content_type: str, body: bytes,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self._write(body)
+
+    def _write(self, body: bytes) -> None:
+        server = self.server
+        fault = self._fault if len(body) > 1 else None
+        bandwidth = server.bandwidth
+        chunk = 64 * 1024
+        limit = len(body)
+        if fault == 'slow':
+            bandwidth, chunk = server.faults.get('slow_rate', 32 * 1024), 1024
+        elif fault in ('reset', 'truncate'):
+            limit = len(body) // 2   # Content-Length promised the whole body
+        sent = 0
+        try:
+            for start in range(0, limit, chunk):
+                piece = body[start:min(start + chunk, limit)]
+                self.wfile.write(piece)
+                sent += len(piece)
+                if bandwidth:
+                    time.sleep(len(piece) / bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client hung up mid-body (e.g. switching to a segmented download)
+            self.close_connection = True
+        if fault == 'reset':
+            # SO_LINGER 0: close with RST instead of FIN
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.connection.close()
+            self.close_connection = True
+        elif fault == 'truncate':
+            self.close_connection = True
+        server.count(sent, getattr(self, '_path', ''))
+
+    def _send_file(self, path: str) -> None:
+        body = self.server.catalog.file_body(path)
+        if body is None:
+            self._send(404, 'text/plain', b'not found')
+            return
+        etag = f'"{hashlib.md5(path.encode()).hexdigest()[:16]}"'
+        headers = {'Accept-Ranges': 'bytes', 'ETag': etag}
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.server.count(0, path)
+            return
+
+        byte_range = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if byte_range and (if_range is None or if_range == etag):
+            match = re.fullmatch(r'bytes=(\d+)-(\d*)', byte_range)
+            start = int(match.group(1)) if match else len(body)
+            if start >= len(body):
+                self._send(416, 'text/plain', b'', {'Content-Range': f'bytes */{len(body)}'})
+                return
+            end = min(int(match.group(2)) if match.group(2) else len(body) - 1, len(body) - 1)
+            headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+            self._send(206, 'application/octet-stream', body[start:end + 1], headers)
+            return
+        self._send(200, 'application/octet-stream', body, headers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve a synthetic CTF for local benchmarking')
+    parser.add_argument('--platform', choices=PLATFORMS, default='ctfd')
+    parser.add_argument('--challenges', type=int, default=100, metavar='N')
+    parser.add_argument('--files', type=int, default=1, metavar='N', help='Attachments per challenge')
+    parser.add_argument('--file-size', type=parse_size, default=64 * 1024, metavar='SIZE',
+                        help='Attachment size, e.g. 64KiB or 10MB (default: 64KiB)')
+    parser.add_argument('--latency', type=float, default=0.0, metavar='SECONDS',
+                        help='Delay added before every response')
+    parser.add_argument('--bandwidth', type=parse_size, default=0, metavar='SIZE',
+                        help='Per-connection bytes/s, e.g. 10MB (default: unthrottled)')
+    parser.add_argument('--faults', choices=sorted(FAULT_PROFILES), default='clean',
+                        help='Fault profile to inject (default: clean)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for fault injection')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = MockCTFServer(args.platform, Catalog(args.challenges, args.files, args.file_size),
+                           latency=args.latency, bandwidth=args.bandwidth,
+                           host=args.host, port=args.port,
+                           faults=FAULT_PROFILES[args.faults], seed=args.seed)
+    print(f"Mock {args.platform} CTF with {args.challenges} challenges on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
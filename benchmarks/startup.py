@@ -0,0 +1,127 @@
+"""Cold-start benchmark for ``import ctf_scraper`` and the CLI's quick exits.
+
+``import`` is the module's cumulative time from ``python -X importtime``;
+``--version``, ``--help`` and ``usage_error`` (no URL) are wall-clock times of a
+fresh interpreter running the script.  Every case also checks that none of
+the heavy dependencies (requests, bs4, lxml, tqdm) got imported — they load on
+the code paths that use them.  Exits non-zero if one did, if ``import`` is over
+``--budget-ms``, or if a case is ``--threshold`` times slower than ``--baseline``.
+
+    python -m benchmarks.startup --save startup.json
+    python -m benchmarks.startup --baseline startup.json --budget-ms 100
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from benchmarks.micro import compare
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ('requests', 'urllib3', 'bs4', 'lxml', 'tqdm')
+
+# name → interpreter arguments (run from the repository root)
+CASES: Dict[str, List[str]] = {
+    'import':      ['-c', 'import ctf_scraper'],
+    '--version':   ['ctf_scraper.py', '--version'],
+    '--help':      ['ctf_scraper.py', '--help'],
+    'usage_error': ['ctf_scraper.py'],
+}
+
+
+def _run(args: List[str], importtime: bool = False) -> Tuple[float, str]:
+    """Run a fresh interpreter; return (wall seconds, stderr)."""
+    cmd = [sys.executable, *(['-X', 'importtime'] if importtime else []), *args]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - start, proc.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds per module from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def heavy_imports(args: List[str]) -> Set[str]:
+    """Heavy dependencies (top-level packages) a fresh interpreter loads for args."""
+    loaded = parse_importtime(_run(args, importtime=True)[1])
+    return {name.split('.')[0] for name in loaded} & set(HEAVY)
+
+
+def measure(name: str, args: List[str], repeat: int) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        if name == 'import':
+            samples.append(parse_importtime(_run(args, importtime=True)[1]).get('ctf_scraper', 0))
+        else:
+            samples.append(_run(args)[0] * 1e6)
+    return {
+        'median_us': statistics.median(samples),
+        'min_us':    min(samples),
+        'stdev_us':  statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'repeat':    repeat,
+        'heavy':     sorted(heavy_imports(args)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark ctf_scraper cold-start time')
+    parser.add_argument('--repeat', type=int, default=7, help='Fresh interpreters per case (default: 7)')
+    parser.add_argument('--budget-ms', type=float, default=100, metavar='MS',
+                        help='Max median cumulative import time of ctf_scraper (default: 100)')
+    parser.add_argument('--save', metavar='PATH', help='Write results as JSON (e.g. a new baseline)')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved run')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown ratio that counts as a regression (default: 1.25)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, case in CASES.items():
+        results[name] = measure(name, case, max(1, args.repeat))
+        print(f"{name:<36} {results[name]['median_us'] / 1000:>10.1f} ms", file=sys.stderr)
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'python':     platform.python_version(),
+        'machine':    platform.platform(),
+        'cpu_count':  os.cpu_count(),
+        'results':    results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written → {args.save}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    failures = [f"{name} imports {', '.join(r['heavy'])}" for name, r in results.items() if r['heavy']]
+    import_ms = results['import']['median_us'] / 1000
+    if import_ms > args.budget_ms:
+        failures.append(f"import takes {import_ms:.1f} ms (budget {args.budget_ms:g} ms)")
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        failures += [f"{name} over {args.threshold}x baseline"
+                     for name in compare(results, baseline, args.threshold)]
+    if failures:
+        print('\n' + '\n'.join(failures), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
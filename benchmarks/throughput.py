@@ -0,0 +1,193 @@
+"""End-to-end throughput benchmark against the local mock CTF.
+
+Runs a full ``UniversalCTFScraper.scrape()`` for every --max-workers ×
+--rate-limit combination.  Each run happens in a fresh process, so its
+peak RSS and thread count are its own.  For each run it reports
+challenges/s, bytes/s, p50/p95/p99 request latency, peak RSS and peak
+thread count.  ``--json`` saves the results so runs can be compared.
+
+    python -m benchmarks.throughput --platform ctfd --challenges 200 \\
+        --file-size 256KiB --latency 0.02 --max-workers 1,5,20 --rate-limit 0,auto
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from benchmarks.mock_ctf import PLATFORMS, Catalog, MockCTFServer, parse_size
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024   # KiB on Linux
+
+
+def _scrape_once(url: str, options: Dict, keep_output: bool = False) -> Dict:
+    """Run one scrape in this (child) process and measure it.
+
+    With keep_output the scratch directory (output tree under ``out/``) is
+    left for the caller to inspect and remove; its path is in 'workdir'.
+    """
+    devnull = open(os.devnull, 'w')
+    sys.stdout = sys.stderr = devnull   # progress bars and summaries
+    workdir = tempfile.mkdtemp(prefix='ctf-bench-')
+    os.environ['CTF_SCRAPER_CACHE_DIR'] = os.path.join(workdir, 'cache')
+
+    from ctf_scraper import UniversalCTFScraper
+    scraper = UniversalCTFScraper(url=url, output_dir=os.path.join(workdir, 'out'),
+                                  redetect=True, **options)
+    logging.getLogger('ctf_scraper').setLevel(logging.WARNING)
+
+    latencies: List[float] = []
+    scraper.session.hooks['response'].append(
+        lambda r, *args, **kwargs: latencies.append(r.elapsed.total_seconds()))
+
+    peak_threads = threading.active_count()
+    done = threading.Event()
+
+    def sample_threads():
+        nonlocal peak_threads
+        while not done.wait(0.01):
+            peak_threads = max(peak_threads, threading.active_count() - 1)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    ok = scraper.scrape()
+    wall = time.perf_counter() - start
+    done.set()
+    sampler.join()
+
+    result = {
+        'ok':           bool(ok),
+        'wall_s':       wall,
+        'challenges':   scraper.stats['success'],
+        'failed':       scraper.stats['failed'],
+        'files':        scraper.stats['downloaded_files'],
+        'failed_files': scraper.stats['failed_files'],
+        'latencies':    latencies,
+        'peak_rss':     _peak_rss_bytes(),
+        'peak_threads': peak_threads,
+    }
+    if keep_output:
+        result['workdir'] = workdir
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def run_scenario(server: MockCTFServer, options: Dict, keep_output: bool = False) -> Dict:
+    """Scrape server once in a fresh process; returns the run's measurements."""
+    server.reset_counters()
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        result = pool.submit(_scrape_once, server.url, options, keep_output).result()
+    latencies = result.pop('latencies')
+    wall = result['wall_s']
+    result.update({
+        'requests':        server.requests,
+        'bytes':           server.bytes_sent,
+        'challenges_per_s': result['challenges'] / wall if wall else 0.0,
+        'bytes_per_s':     server.bytes_sent / wall if wall else 0.0,
+        'latency_p50_ms':  _ms(percentile(latencies, 50)),
+        'latency_p95_ms':  _ms(percentile(latencies, 95)),
+        'latency_p99_ms':  _ms(percentile(latencies, 99)),
+    })
+    return result
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _csv(convert):
+    def parse(value: str) -> list:
+        return [convert(v.strip()) for v in value.split(',') if v.strip()]
+    return parse
+
+
+def _rate(value: str):
+    return 'auto' if value == 'auto' else float(value)
+
+
+def _human(n: Optional[float], unit: str = 'B') -> str:
+    if n is None:
+        return '-'
+    for prefix in ('', 'Ki', 'Mi', 'Gi'):
+        if abs(n) < 1024 or prefix == 'Gi':
+            return f"{n:.1f} {prefix}{unit}"
+        n /= 1024
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark end-to-end scrape throughput on a local mock CTF')
+    parser.add_argument('--platform', choices=PLATFORMS, default='ctfd')
+    parser.add_argument('--challenges', type=int, default=100, metavar='N')
+    parser.add_argument('--files', type=int, default=1, metavar='N', help='Attachments per challenge')
+    parser.add_argument('--file-size', type=parse_size, default=64 * 1024, metavar='SIZE')
+    parser.add_argument('--latency', type=float, default=0.01, metavar='SECONDS',
+                        help='Server delay before every response (default: 0.01)')
+    parser.add_argument('--bandwidth', type=parse_size, default=0, metavar='SIZE',
+                        help='Per-connection bytes/s (default: unthrottled)')
+    parser.add_argument('--max-workers', type=_csv(int), default=[5], metavar='N[,N...]')
+    parser.add_argument('--rate-limit', type=_csv(_rate), default=[0.0], metavar='R[,R...]',
+                        help='Requests/s per run, "auto" for adaptive, 0 for unlimited')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+    args = parser.parse_args(argv)
+
+    catalog = Catalog(args.challenges, args.files, args.file_size)
+    results = []
+    with MockCTFServer(args.platform, catalog, latency=args.latency, bandwidth=args.bandwidth) as server:
+        print(f"{'workers':>7} {'rate':>6} {'chal/s':>8} {'bytes/s':>12} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'peak RSS':>10} {'threads':>7}")
+        for workers in args.max_workers:
+            for rate in args.rate_limit:
+                result = run_scenario(server, {'max_workers': workers, 'rate_limit': rate})
+                result.update(max_workers=workers, rate_limit=rate)
+                results.append(result)
+                print(f"{workers:>7} {str(rate):>6} {result['challenges_per_s']:>8.1f} "
+                      f"{_human(result['bytes_per_s'], 'B/s'):>12} "
+                      f"{result['latency_p50_ms'] or 0:>8.1f} {result['latency_p95_ms'] or 0:>8.1f} "
+                      f"{result['latency_p99_ms'] or 0:>8.1f} {_human(result['peak_rss']):>10} "
+                      f"{result['peak_threads']:>7}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'created_at': datetime.now().isoformat(),
+                'python':     platform.python_version(),
+                'machine':    platform.platform(),
+                'config':     {k: v for k, v in vars(args).items() if k != 'json'},
+                'results':    results,
+            }, f, indent=2)
+        print(f"Results written → {args.json}")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
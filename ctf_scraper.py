@@ -35,21 +35,32 @@ Examples:
 import sys
 import os
 import re
+import bisect
 import json
+import hashlib
 import time
 import logging
+import marshal
+import math
 import threading
 import platform
-from pathlib import Path
-from urllib.parse import urlparse, urljoin
-from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import shutil
+import socket
+import sqlite3
+import stat
+import uuid
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from urllib.parse import parse_qsl, urlencode, urlparse, urljoin
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 import argparse
+from email.utils import parsedate_to_datetime
 
-import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm
+# requests, bs4/lxml and tqdm are imported where they are used, so --help,
+# --version and tools that only need a helper from here start quickly
 
 __version__ = "2.1.0"
 
@@ -66,41 +77,1449 @@ _USER_AGENT = (
 
 
 class RateLimiter:
-    """Token-bucket rate limiter — limits requests per second across threads."""
+    """Token-bucket rate limiter — limits requests per second across threads.
+
+    Holds up to ``burst`` tokens refilled at ``max_per_second``.  Callers
+    reserve a token under the lock and sleep outside it, so waiters never
+    queue behind each other's sleep.  ``pause()`` blocks every caller until a
+    deadline (server ``Retry-After``), even when the rate is unlimited.
+    ``bucket(name)`` returns a sibling limiter with the same settings (e.g.
+    file downloads vs. API calls).  Siblings are independent unless
+    ``shared_buckets`` is set: then this limiter's rate is split evenly
+    between itself and its buckets, each with its own tokens so a queue of
+    downloads cannot hold up API calls, its pauses hold back all of them, and
+    the buckets report their responses here.
+    """
+
+    def __init__(self, max_per_second: float, burst: int = 1, shared_buckets: bool = False):
+        self.rate = max(0.0, max_per_second)
+        self.burst = max(1, burst)
+        self.shared_buckets = shared_buckets
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._buckets: Dict[str, 'RateLimiter'] = {}
+        self._parent: Optional['RateLimiter'] = None
+
+    def _reserve(self) -> float:
+        """Take the next token; return how long until it may be used."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._paused_until - now
+            rate = self._share()
+            if rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                self._tokens -= 1   # negative balance = reservations already handed out
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens / rate)
+        return delay
+
+    def _share(self) -> float:
+        """This limiter's slice of the rate (all of it unless buckets share it)."""
+        if self._parent is not None:
+            return self._parent._share()
+        if self.shared_buckets:
+            return self.rate / (1 + len(self._buckets))
+        return self.rate
+
+    def wait(self) -> float:
+        """Block until the next request slot is available; returns the seconds slept."""
+        delay = self._reserve()
+        if self._parent is not None:
+            delay = max(delay, self._parent._paused_until - time.monotonic())
+        if delay > 0:
+            time.sleep(delay)
+            return delay
+        return 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller of this bucket for the next ``seconds``."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record(self, status_code: int) -> None:
+        """Feed back a response status (used by the adaptive subclass)."""
+        if self._parent is not None:
+            self._parent.record(status_code)   # a shared bucket's rate is the parent's
+        else:
+            self._adjust(status_code)
+
+    def _adjust(self, status_code: int) -> None:
+        """Adapt this limiter alone to a response status."""
+
+    def bucket(self, name: str) -> 'RateLimiter':
+        """Return the named sibling bucket, creating it on first use."""
+        with self._lock:
+            if name not in self._buckets:
+                bucket = self._buckets[name] = self._spawn()
+                if self.shared_buckets:
+                    bucket._parent = self
+                if isinstance(self._lock, _TimedLock):   # --profile: report under our name
+                    bucket._lock = _TimedLock(self._lock.name, self._lock.stats)
+            return self._buckets[name]
+
+    def _spawn(self) -> 'RateLimiter':
+        return RateLimiter(self.rate, self.burst)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """AIMD rate limiter for ``--rate-limit auto``.
+
+    Healthy responses raise the rate by roughly ``increase`` req/s every
+    second; a 429/503 multiplies it by ``decrease``, at most once per
+    ``cooldown`` seconds so one burst of throttled in-flight requests only
+    counts as a single signal.
+    """
+
+    def __init__(self, initial: float = 5.0, burst: int = 1, min_rate: float = 0.5,
+                 max_rate: float = 100.0, increase: float = 1.0, decrease: float = 0.5,
+                 cooldown: float = 1.0, shared_buckets: bool = False):
+        super().__init__(initial, burst, shared_buckets)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._last_decrease = 0.0
+
+    def _adjust(self, status_code: int) -> None:
+        with self._lock:
+            if status_code in _THROTTLE_STATUSES:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._last_decrease = now
+            elif 200 <= status_code < 400:
+                # One increment per response ≈ ``increase`` per second at the current rate
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def _spawn(self) -> 'RateLimiter':
+        return AdaptiveRateLimiter(self.rate, self.burst, self.min_rate, self.max_rate,
+                                   self.increase, self.decrease, self.cooldown)
+
+
+# Responses that mean "slow down" rather than "this request is broken"
+_THROTTLE_STATUSES = (429, 503)
+# Longest Retry-After honoured — a bogus header must not stall every thread for good
+_MAX_RETRY_AFTER = 300.0
+
 
-    def __init__(self, max_per_second: float):
-        self._min_interval = 1.0 / max_per_second if max_per_second > 0 else 0
+def _retry_after(resp) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP-date), if any.
+
+    Capped at ``_MAX_RETRY_AFTER``; non-finite values are ignored.
+    """
+    value = resp.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+    if not math.isfinite(seconds):
+        return None
+    return min(max(0.0, seconds), _MAX_RETRY_AFTER)
+
+
+class Tracer:
+    """Span recorder for ``--trace-out``, exported as Chrome trace JSON.
+
+    Spans are complete ("X") events on the thread that ran them, tagged with
+    whatever ``bind()`` set for that thread (the challenge ID).  Time a task
+    spent queued for a worker is an async ("b"/"e") event, shown on its own
+    track.  The file opens in Perfetto or chrome://tracing.  A disabled
+    tracer records nothing and its spans cost a shared ``nullcontext``.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._origin = time.perf_counter()
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
         self._lock = threading.Lock()
-        self._last_call = 0.0
+        self._local = threading.local()
+        self._next_id = 0
 
-    def wait(self) -> None:
-        """Block until the next request slot is available."""
-        if self._min_interval == 0:
-            return
+    def _us(self, t: float) -> float:
+        return round((t - self._origin) * 1e6, 1)
+
+    def _emit(self, event: Dict) -> None:
+        thread = threading.current_thread()
+        event.update(pid=os.getpid(), tid=thread.ident)
         with self._lock:
-            now = time.monotonic()
-            wait = self._min_interval - (now - self._last_call)
-            if wait > 0:
-                time.sleep(wait)
-            self._last_call = time.monotonic()
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+
+    def context(self) -> Dict:
+        """Args bound to the current thread."""
+        return dict(getattr(self._local, 'args', {}))
+
+    @contextmanager
+    def _bound(self, args: Dict):
+        previous = getattr(self._local, 'args', {})
+        self._local.args = {**previous, **args}
+        try:
+            yield
+        finally:
+            self._local.args = previous
+
+    def bind(self, **args):
+        """Tag every span this thread records inside the block with args."""
+        return self._bound(args) if self.enabled else nullcontext()
+
+    def add(self, name: str, cat: str, start: float, end: float, **args) -> None:
+        """Record a span measured by the caller (``time.perf_counter()`` values)."""
+        if self.enabled:
+            self._emit({'name': name, 'cat': cat, 'ph': 'X', 'ts': self._us(start),
+                        'dur': round((end - start) * 1e6, 1), 'args': {**self.context(), **args}})
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: Dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, cat, start, time.perf_counter(), **args)
+
+    def span(self, name: str, cat: str = 'scrape', **args):
+        """Context manager recording the block as one span."""
+        return self._span(name, cat, args) if self.enabled else nullcontext()
+
+    def wrap(self, queue: str, fn: Callable) -> Callable:
+        """Wrap fn for a worker pool: record its queueing time, carry this thread's tags."""
+        if not self.enabled:
+            return fn
+        submitted = time.perf_counter()
+        context = self.context()
+        with self._lock:
+            self._next_id += 1
+            span_id = self._next_id
+
+        def run(*args):
+            started = time.perf_counter()
+            with self._bound(context):
+                for ph, t in (('b', submitted), ('e', started)):
+                    self._emit({'name': f'wait for {queue} worker', 'cat': 'queue', 'ph': ph,
+                                'id': span_id, 'ts': self._us(t), 'args': context})
+                return fn(*args)
+        return run
+
+    def write(self, path: Path, **metadata) -> None:
+        """Write the trace; metadata lands in ``otherData``."""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': names + events, 'displayTimeUnit': 'ms',
+                       'otherData': metadata}, f)
+        os.replace(tmp_path, path)
+
+
+class Scheduler:
+    """Shared staged worker pool fed by every platform adapter.
+
+    Challenge metadata, file downloads and the byte-range segments of large
+    files run on separate thread pools, each with a bounded queue.  With
+    ``cpu_workers``, HTML parsing and hashing go to a bounded process pool
+    (``run_cpu``) so the GIL stays free for the network threads;
+    ``extract_workers`` gives archive unpacking a process pool of its own.  ``slot()``
+    caps the HTTP requests in flight to the CTF itself across all stages;
+    ``slot(host)`` gives each off-site file host (CDN, object storage) its own
+    cap of ``host_limit``.  Nothing holds a slot while queueing more work, so
+    a challenge waiting on its files can never starve the download stage.
+    """
+
+    META = 'meta'
+    FILES = 'files'
+    SEGMENTS = 'segments'
+    CPU = 'cpu'
+    EXTRACT = 'extract'
+    # Stages backed by worker processes: their tasks must stay picklable
+    PROCESS_STAGES = (CPU, EXTRACT)
+
+    def __init__(self, max_in_flight: int, queue_size: Optional[int] = None,
+                 host_limit: Optional[int] = None, tracer: Optional[Tracer] = None,
+                 cpu_workers: int = 0, extract_workers: int = 0):
+        workers = max(1, max_in_flight)
+        self.tracer = tracer or Tracer(enabled=False)
+        self._host_limit = max(1, host_limit or workers)
+        if queue_size is None:
+            queue_size = workers * 4
+        file_workers = max(workers, self._host_limit)
+        stage_workers = {self.META: workers, self.FILES: file_workers, self.SEGMENTS: file_workers}
+        self._pools = {
+            stage: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f'ctf-{stage}')
+            for stage, n in stage_workers.items()
+        }
+        # Parsing/hashing and archive unpacking run in worker processes, off
+        # the GIL the network threads need.  Spawned, not forked: this process has threads.
+        for stage, n in ((self.CPU, cpu_workers), (self.EXTRACT, extract_workers)):
+            if n > 0:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._pools[stage] = ProcessPoolExecutor(
+                    max_workers=n, mp_context=multiprocessing.get_context('spawn'))
+                stage_workers[stage] = n
+        self._queues = {
+            stage: threading.BoundedSemaphore(n + queue_size)
+            for stage, n in stage_workers.items()
+        }
+        self._in_flight = threading.BoundedSemaphore(workers)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # Guards the host slot table and the depth/peak/active counters below
+        self._state_lock = threading.Lock()
+        # Submitted-but-unfinished tasks per stage (and the peak), plus slots held
+        self._depth = {stage: 0 for stage in stage_workers}
+        self._peak = dict(self._depth)
+        self._active = 0
+
+    def submit(self, stage: str, fn: Callable, *args) -> Future:
+        """Queue fn on a stage, blocking while that stage's queue is full."""
+        queue = self._queues[stage]
+        queue.acquire()
+        try:
+            # Tasks for a process pool must stay picklable, so they are not wrapped
+            task = fn if stage in self.PROCESS_STAGES else self.tracer.wrap(stage, fn)
+            future = self._pools[stage].submit(task, *args)
+        except Exception:
+            queue.release()
+            raise
+        with self._state_lock:
+            self._depth[stage] += 1
+            self._peak[stage] = max(self._peak[stage], self._depth[stage])
+        future.add_done_callback(lambda _: self._finished(stage, queue))
+        return future
+
+    def _finished(self, stage: str, queue: threading.BoundedSemaphore) -> None:
+        with self._state_lock:
+            self._depth[stage] -= 1
+        queue.release()
+
+    def run_cpu(self, fn: Callable, *args):
+        """Run a picklable, module-level fn on the CPU stage and return its result.
+
+        Without a CPU stage (or once its pool has died) fn runs on the calling thread.
+        """
+        if self.CPU in self._pools:
+            from concurrent.futures.process import BrokenProcessPool
+            try:
+                return self.submit(self.CPU, fn, *args).result()
+            except BrokenProcessPool:
+                pass
+        return fn(*args)
+
+    def depths(self) -> Dict:
+        """Current and peak task count per stage, and request slots held right now."""
+        with self._state_lock:
+            return {
+                'stages':    {stage: {'depth': self._depth[stage], 'peak': self._peak[stage]}
+                              for stage in self._depth},
+                'in_flight': self._active,
+            }
+
+    @contextmanager
+    def slot(self, host: Optional[str] = None):
+        """Hold an in-flight request slot — the global one, or an off-site host's."""
+        if host is None:
+            semaphore = self._in_flight
+        else:
+            with self._state_lock:
+                semaphore = self._host_slots.get(host)
+                if semaphore is None:
+                    semaphore = self._host_slots[host] = threading.BoundedSemaphore(self._host_limit)
+        if not semaphore.acquire(blocking=False):
+            start = time.perf_counter()
+            semaphore.acquire()
+            self.tracer.add('wait for request slot', 'queue', start, time.perf_counter(),
+                            host=host or 'ctf')
+        with self._state_lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._state_lock:
+                self._active -= 1
+            semaphore.release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+
+
+class Metrics:
+    """Thread-safe request, rate-limit and disk counters for ``--metrics-out``.
+
+    Every HTTP call is recorded under an endpoint class (``probe``, ``list``,
+    ``detail``, ``file``, ``segment``): a count per status, a latency
+    histogram, bytes received, retries and time spent waiting on the rate
+    limiter.  Disk writes are counted per kind.  ``gauge(name, fn)`` adds
+    values (queue depths) sampled whenever a snapshot is taken.
+    """
+
+    # Histogram bucket upper bounds, in seconds
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._endpoints: Dict[str, Dict] = {}
+        self._disk: Dict[str, Dict[str, float]] = {}
+        self._gauges: Dict[str, Callable[[], Dict]] = {}
+
+    def _endpoint(self, endpoint: str) -> Dict:
+        """Counters for one endpoint class (caller holds ``_lock``)."""
+        counters = self._endpoints.get(endpoint)
+        if counters is None:
+            counters = self._endpoints[endpoint] = {
+                'requests': {}, 'buckets': [0] * (len(self.BUCKETS) + 1),
+                'count': 0, 'sum': 0.0, 'max': 0.0,
+                'bytes_in': 0, 'retries': 0, 'rate_limit_wait': 0.0,
+            }
+        return counters
+
+    def observe_request(self, endpoint: str, status, seconds: float, nbytes: int = 0) -> None:
+        """Count one response (status code, or 'error' when none came back)."""
+        with self._lock:
+            counters = self._endpoint(endpoint)
+            status = str(status)
+            counters['requests'][status] = counters['requests'].get(status, 0) + 1
+            counters['buckets'][bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            counters['count'] += 1
+            counters['sum'] += seconds
+            counters['max'] = max(counters['max'], seconds)
+            counters['bytes_in'] += nbytes
+
+    def add_bytes(self, endpoint: str, nbytes: int) -> None:
+        """Count body bytes read from a streamed response."""
+        with self._lock:
+            self._endpoint(endpoint)['bytes_in'] += nbytes
+
+    def retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint)['retries'] += 1
+
+    def rate_wait(self, endpoint: str, seconds: float) -> None:
+        """Time a request spent held back by a rate limiter (or Retry-After pause)."""
+        if seconds > 0:
+            with self._lock:
+                self._endpoint(endpoint)['rate_limit_wait'] += seconds
+
+    def disk_write(self, kind: str, nbytes: int, seconds: float) -> None:
+        """Count one file written (``info``, ``file``, ``manifest``)."""
+        with self._lock:
+            counters = self._disk.setdefault(kind, {'writes': 0, 'bytes': 0, 'seconds': 0.0})
+            counters['writes'] += 1
+            counters['bytes'] += nbytes
+            counters['seconds'] += seconds
+
+    def gauge(self, name: str, fn: Callable[[], Dict]) -> None:
+        """Sample fn() into every snapshot under name."""
+        self._gauges[name] = fn
+
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-serialisable dict."""
+        with self._lock:
+            endpoints = {}
+            for endpoint, c in sorted(self._endpoints.items()):
+                cumulative, buckets = 0, {}
+                for bound, n in zip(self.BUCKETS + (float('inf'),), c['buckets']):
+                    cumulative += n
+                    buckets['+Inf' if bound == float('inf') else str(bound)] = cumulative
+                endpoints[endpoint] = {
+                    'requests':          dict(sorted(c['requests'].items())),
+                    'latency': {
+                        'count':   c['count'],
+                        'sum_s':   round(c['sum'], 6),
+                        'mean_ms': round(c['sum'] / c['count'] * 1000, 3) if c['count'] else None,
+                        'max_ms':  round(c['max'] * 1000, 3),
+                        'buckets': buckets,
+                    },
+                    'bytes_in':          c['bytes_in'],
+                    'retries':           c['retries'],
+                    'rate_limit_wait_s': round(c['rate_limit_wait'], 6),
+                }
+            disk = {kind: dict(c) for kind, c in sorted(self._disk.items())}
+        snapshot = {
+            'started_at': datetime.fromtimestamp(self._started).isoformat(),
+            'elapsed_s':  round(time.time() - self._started, 3),
+            'endpoints':  endpoints,
+            'disk':       disk,
+        }
+        for name, fn in self._gauges.items():
+            snapshot[name] = fn()
+        return snapshot
+
+    def to_prometheus(self, snapshot: Optional[Dict] = None) -> str:
+        """Render a snapshot in the Prometheus text exposition format."""
+        snapshot = snapshot or self.snapshot()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, Dict, float]]):
+            lines.append(f'# HELP ctf_scraper_{name} {help_text}')
+            lines.append(f'# TYPE ctf_scraper_{name} {kind}')
+            for suffix, labels, value in samples:
+                label_str = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                label_str = f'{{{label_str}}}' if label_str else ''
+                lines.append(f'ctf_scraper_{name}{suffix}{label_str} {value}')
+
+        endpoints = snapshot['endpoints']
+        metric('requests_total', 'counter', 'HTTP responses by endpoint class and status.',
+               [('', {'endpoint': e, 'status': status}, n)
+                for e, c in endpoints.items() for status, n in c['requests'].items()])
+        histogram = []
+        for e, c in endpoints.items():
+            latency = c['latency']
+            histogram += [('_bucket', {'endpoint': e, 'le': le}, n) for le, n in latency['buckets'].items()]
+            histogram += [('_sum', {'endpoint': e}, latency['sum_s']), ('_count', {'endpoint': e}, latency['count'])]
+        metric('request_duration_seconds', 'histogram', 'Time until response headers (whole body unless streamed).',
+               histogram)
+        for name, key, help_text in (
+                ('received_bytes_total', 'bytes_in', 'Response body bytes read.'),
+                ('retries_total', 'retries', 'Requests repeated after a throttle or network error.'),
+                ('rate_limit_wait_seconds_total', 'rate_limit_wait_s', 'Time spent waiting on rate limiters.')):
+            metric(name, 'counter', help_text, [('', {'endpoint': e}, c[key]) for e, c in endpoints.items()])
+        for name, key, help_text in (
+                ('disk_writes_total', 'writes', 'Files written by kind.'),
+                ('disk_written_bytes_total', 'bytes', 'Bytes written by kind.'),
+                ('disk_write_seconds_total', 'seconds', 'Time spent in writes by kind.')):
+            metric(name, 'counter', help_text, [('', {'kind': k}, c[key]) for k, c in snapshot['disk'].items()])
+        queues = snapshot.get('queues')
+        if queues:
+            metric('queue_depth', 'gauge', 'Tasks submitted to a scheduler stage and not finished.',
+                   [('', {'stage': st}, q['depth']) for st, q in queues['stages'].items()])
+            metric('queue_depth_peak', 'gauge', 'Highest queue depth seen this run.',
+                   [('', {'stage': st}, q['peak']) for st, q in queues['stages'].items()])
+            metric('in_flight_requests', 'gauge', 'Request slots held right now.',
+                   [('', {}, queues['in_flight'])])
+        stats = snapshot.get('stats')
+        if stats:
+            metric('run_stat', 'gauge', 'Challenge and file totals so far (see the run summary).',
+                   [('', {'stat': k}, v) for k, v in stats.items()])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path: Optional[Path] = None, prom_path: Optional[Path] = None) -> None:
+        """Atomically write the JSON and/or Prometheus textfile outputs."""
+        snapshot = self.snapshot()
+        outputs = []
+        if json_path:
+            outputs.append((json_path, json.dumps(snapshot, indent=2)))
+        if prom_path:
+            outputs.append((prom_path, self.to_prometheus(snapshot)))
+        for path, text in outputs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)   # textfile collectors must never see half a file
+
+
+class _TimedLock:
+    """Drop-in for ``threading.Lock`` that records contention into ``LockStats``."""
+
+    def __init__(self, name: str, stats: 'LockStats'):
+        self.name = name
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        waited = 0.0
+        if not self._lock.acquire(False):
+            if not blocking:
+                return False
+            start = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            waited = time.perf_counter() - start
+        self._acquired_at = time.perf_counter()
+        self.stats.acquired(self.name, waited)
+        return True
+
+    def release(self) -> None:
+        held = time.perf_counter() - self._acquired_at
+        self._lock.release()
+        self.stats.released(self.name, held)
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class LockStats:
+    """Acquisitions, contention, wait and hold time per named lock (``--profile``)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, name: str) -> Dict[str, float]:
+        entry = self._locks.get(name)
+        if entry is None:
+            entry = self._locks[name] = {'acquired': 0, 'contended': 0, 'wait': 0.0,
+                                         'max_wait': 0.0, 'held': 0.0}
+        return entry
+
+    def acquired(self, name: str, waited: float) -> None:
+        with self._lock:
+            entry = self._entry(name)
+            entry['acquired'] += 1
+            if waited:
+                entry['contended'] += 1
+                entry['wait'] += waited
+                entry['max_wait'] = max(entry['max_wait'], waited)
+
+    def released(self, name: str, held: float) -> None:
+        with self._lock:
+            self._entry(name)['held'] += held
+
+    def instrument(self, owner, name: str, attr: str = '_lock') -> None:
+        """Replace owner.<attr> (an idle ``threading.Lock``) with a timed one."""
+        if owner is not None and hasattr(owner, attr):
+            setattr(owner, attr, _TimedLock(name, self))
+
+    def summary(self) -> str:
+        with self._lock:
+            rows = sorted(self._locks.items(), key=lambda item: -item[1]['wait'])
+        lines = [f"{'lock':<28} {'acquired':>9} {'contended':>9} {'wait s':>9} "
+                 f"{'max wait ms':>11} {'held s':>9}"]
+        for name, e in rows:
+            lines.append(f"{name:<28} {e['acquired']:>9} {e['contended']:>9} {e['wait']:>9.3f} "
+                         f"{e['max_wait'] * 1000:>11.2f} {e['held']:>9.3f}")
+        return '\n'.join(lines) + '\n'
+
+
+class Profiler:
+    """Sampling profiler over every thread, for ``--profile DIR``.
+
+    A background thread reads ``sys._current_frames()`` every ``interval``
+    seconds, so pool workers are covered too (cProfile only sees the thread
+    that enabled it).  ``stop()`` writes into ``directory``:
+
+    - ``profile.pstats``  — sample counts in pstats format (``python -m pstats``)
+    - ``profile.folded``  — collapsed stacks for flamegraph.pl / speedscope
+    - ``summary.txt``     — per thread group, where samples landed (cpu,
+      network, lock, rate-limit, idle), plus the lock-wait table
+    - ``memory.txt`` / ``memory.snapshot`` — with ``memory=True``, the top
+      allocation sites of the tracemalloc snapshot taken nearest peak usage
+    """
+
+    INTERVAL = 0.01
+    # Leaf frames (file name, function) that mean the thread is blocked, not computing
+    _BLOCKED = {
+        ('socket.py', 'readinto'): 'network', ('ssl.py', 'read'): 'network',
+        ('ssl.py', 'recv_into'): 'network', ('connection.py', 'create_connection'): 'network',
+        ('socket.py', 'create_connection'): 'network', ('selectors.py', 'select'): 'network',
+        ('ctf_scraper.py', 'acquire'): 'lock',
+        ('ctf_scraper.py', 'wait'): 'rate-limit',
+        ('threading.py', 'wait'): 'idle', ('threading.py', '_wait_for_tstate_lock'): 'idle',
+        ('thread.py', '_worker'): 'idle', ('_base.py', 'wait'): 'idle', ('_base.py', 'result'): 'idle',
+        ('_base.py', 'as_completed'): 'idle', ('_monitor.py', 'run'): 'idle',
+    }
+
+    def __init__(self, directory: Path, interval: float = INTERVAL, memory: bool = False):
+        self.directory = directory
+        self.interval = interval
+        self.memory = memory
+        self.locks = LockStats()
+        self._stacks: Dict[Tuple, int] = {}
+        self._states: Dict[str, Dict[str, int]] = {}
+        self._ticks = 0
+        self._started = 0.0
+        self._elapsed = 0.0
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._peak_snapshot = None
+        self._peak_size = 0
+
+    def start(self) -> None:
+        if self.memory:
+            import tracemalloc
+            tracemalloc.start(25)
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='ctf-profiler', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        next_memory_check = 0.0
+        while not self._done.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self._sample(names.get(ident, str(ident)), frame)
+            self._ticks += 1
+            if self.memory and time.perf_counter() >= next_memory_check:
+                self._check_memory()
+                next_memory_check = time.perf_counter() + 1.0
+
+    def _sample(self, thread_name: str, frame) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack.reverse()
+        group = re.sub(r'[_-]?\d+$', '', thread_name) or 'thread'
+        leaf_file, _line, leaf_name = stack[-1]
+        state = self._BLOCKED.get((os.path.basename(leaf_file), leaf_name), 'cpu')
+        key = (group,) + tuple(stack)
+        self._stacks[key] = self._stacks.get(key, 0) + 1
+        states = self._states.setdefault(group, {})
+        states[state] = states.get(state, 0) + 1
+
+    def _check_memory(self) -> None:
+        import tracemalloc
+        current, _peak = tracemalloc.get_traced_memory()
+        if current > self._peak_size * 1.1:
+            self._peak_size = current
+            self._peak_snapshot = tracemalloc.take_snapshot()
+
+    def stop(self) -> None:
+        """Stop sampling and write every output file."""
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._elapsed = time.perf_counter() - self._started
+        if self.memory:
+            import tracemalloc
+            self._check_memory()
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write_pstats(self.directory / 'profile.pstats')
+        self._write_folded(self.directory / 'profile.folded')
+        summary = self._summary()
+        if self.memory and self._peak_snapshot is not None:
+            self._peak_snapshot.dump(str(self.directory / 'memory.snapshot'))
+            top = self._peak_snapshot.statistics('lineno')[:25]
+            with open(self.directory / 'memory.txt', 'w', encoding='utf-8') as f:
+                f.write(f"Peak traced: {peak / 1024 / 1024:.1f} MiB; "
+                        f"snapshot at {self._peak_size / 1024 / 1024:.1f} MiB\n\n")
+                f.writelines(f"{stat}\n" for stat in top)
+        with open(self.directory / 'summary.txt', 'w', encoding='utf-8') as f:
+            f.write(summary)
+
+    def _write_pstats(self, path: Path) -> None:
+        """Samples as a pstats dict: calls = samples on stack, tottime/cumtime = samples × interval."""
+        weight = self._elapsed / self._ticks if self._ticks else self.interval
+        inclusive: Dict[Tuple, int] = {}
+        own: Dict[Tuple, int] = {}
+        callers: Dict[Tuple, Dict[Tuple, int]] = {}
+        for key, count in self._stacks.items():
+            stack = key[1:]
+            for func in set(stack):
+                inclusive[func] = inclusive.get(func, 0) + count
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges = callers.setdefault(callee, {})
+                edges[caller] = edges.get(caller, 0) + count
+        stats = {
+            func: (n, n, own.get(func, 0) * weight, n * weight, callers.get(func, {}))
+            for func, n in inclusive.items()
+        }
+        with open(path, 'wb') as f:
+            marshal.dump(stats, f)
+
+    def _write_folded(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            for key, count in sorted(self._stacks.items(), key=lambda item: -item[1]):
+                group, stack = key[0], key[1:]
+                frames = [f"{name} ({os.path.basename(file)}:{line})" for file, line, name in stack]
+                f.write(f"{';'.join([group] + frames)} {count}\n")
+
+    def _summary(self) -> str:
+        lines = [f"Sampled every {self.interval * 1000:g} ms for {self._elapsed:.1f}s ({self._ticks} ticks)", '',
+                 f"{'thread group':<20} {'samples':>8}  share of samples by state"]
+        for group, states in sorted(self._states.items()):
+            total = sum(states.values())
+            shares = ', '.join(f"{state} {n / total:.0%}"
+                               for state, n in sorted(states.items(), key=lambda item: -item[1]))
+            lines.append(f"{group:<20} {total:>8}  {shares}")
+        lines += ['', 'Lock waits', self.locks.summary()]
+        return '\n'.join(lines)
+
+
+# Platform fingerprints, highest priority first: (platform, API path, matcher, label)
+_PLATFORM_PROBES = (
+    # rCTF  (/api/v1/challs → {"kind":"goodChallenge",...})
+    ('rctf', '/api/v1/challs',
+     lambda d: isinstance(d, dict) and d.get('kind') in ('goodChallenge', 'badToken', 'goodChallenges'),
+     'rCTF platform'),
+    # CTFd  (/api/v1/challenges → {"success":true,"data":[...]})
+    ('ctfd', '/api/v1/challenges',
+     lambda d: isinstance(d, dict) and ('success' in d or 'data' in d),
+     'CTFd platform'),
+    # picoCTF-style  (/api/challenges/ → paginated list)
+    ('picoctf', '/api/challenges/',
+     lambda d: isinstance(d, (list, dict)),
+     'picoCTF-style platform'),
+    # Mellivora  (/api/challenges.php → JSON array)
+    ('mellivora', '/api/challenges.php',
+     lambda d: isinstance(d, list) and bool(d) and 'title' in d[0],
+     'Mellivora platform'),
+)
+_PLATFORM_LABELS = {platform: label for platform, _path, _matches, label in _PLATFORM_PROBES}
+
+# Base-page HTML markers that identify a platform without touching its API
+_HTML_MARKERS = {
+    'rctf':      ('rctfConfig',),
+    'ctfd':      ('csrfNonce', 'Powered by <a href="https://ctfd.io'),
+    'mellivora': ('Powered by Mellivora', 'mellivora.js'),
+}
+
+
+# Elements whose content is code, not text (BeautifulSoup's get_text() skips them too)
+_NON_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+
+@lru_cache(maxsize=2048)
+def _parse_html(raw: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Stripped text nodes and unique ``<a href>`` targets of an HTML string, in one pass.
+
+    Walks lxml's tree directly instead of building a BeautifulSoup one; the
+    strings match ``BeautifulSoup(raw, 'lxml').get_text(strip=True)``'s
+    (comments and script/style/template contents skipped).  Text with no
+    markup or entities skips the parser.  Results are memoized by content,
+    so a description or hint seen before is not parsed again.
+    """
+    if '<' not in raw and '&' not in raw:
+        text = raw.strip()
+        return ((text,) if text else ()), ()
+    from lxml import etree
+    try:
+        root = etree.HTML(raw)
+    except (ValueError, etree.LxmlError):
+        # e.g. an XML declaration with an encoding — let BeautifulSoup cope
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(raw, 'lxml')
+        links = dict.fromkeys(a['href'] for a in soup.find_all('a', href=True) if a['href'])
+        return tuple(soup.stripped_strings), tuple(links)
+    if root is None:   # nothing but whitespace or comments
+        return (), ()
+
+    strings: List[str] = []
+    links: Dict[str, None] = {}
+    for event, el in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        if event == 'start':
+            if el.tag == 'a':
+                href = el.get('href')
+                if href:
+                    links[href] = None
+            text = el.text if el.tag not in _NON_TEXT_TAGS else None
+        else:
+            # An element's tail follows its whole subtree; comments only contribute theirs
+            text = el.tail if el is not root else None
+        if text:
+            text = text.strip()
+            if text:
+                strings.append(text)
+    return tuple(strings), tuple(links)
 
 
 def _html_to_text(raw: str) -> str:
     """Convert an HTML string to clean plain text, or return raw if not HTML."""
     if not raw or '<' not in raw:
         return raw
-    return BeautifulSoup(raw, 'lxml').get_text(separator='\n', strip=True)
+    return '\n'.join(_parse_html(raw)[0])
+
+
+def _picoctf_details(data: Dict) -> Tuple[str, List[str], List[str]]:
+    """(description, hints, file links) from a picoCTF instance API response."""
+    # Parse description HTML -> plain text and file links (one parse)
+    strings, links = _parse_html(data.get('description', '') or '')
+    description = '\n'.join(strings)
+
+    # Parse hints HTML -> plain text
+    hints = []
+    for hint in data.get('hints', []):
+        if isinstance(hint, str) and hint:
+            hint_text = ''.join(_parse_html(hint)[0])
+            if hint_text:
+                hints.append(hint_text)
+        elif isinstance(hint, dict):
+            raw = hint.get('hint', hint.get('body', hint.get('text', '')))
+            if raw:
+                hints.append(''.join(_parse_html(raw)[0]))
+    return description, hints, list(links)
+
+
+def _cache_dir() -> Path:
+    """Per-user cache directory shared by every output folder."""
+    override = os.environ.get('CTF_SCRAPER_CACHE_DIR')
+    if override:
+        return Path(override)
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'ctf_scraper'
+
+
+class PlatformCache:
+    """Remembers each domain's detected platform so re-runs skip the probes."""
+
+    DEFAULT_TTL = 24 * 3600
+
+    def __init__(self, cache_file: Path, ttl: float = DEFAULT_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    def _load(self) -> Dict:
+        """Load the domain → fingerprint map (empty on any error)."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data: Dict) -> None:
+        """Write atomically — several scraper processes may share the file."""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            logging.warning(f"Failed to save platform cache: {e}")
+
+    def get(self, domain: str) -> Optional[str]:
+        """Return the cached platform for domain, or None if missing/expired."""
+        entry = self._load().get(domain.lower())
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - entry.get('detected_at', 0) > self.ttl:
+            return None
+        return entry.get('platform')
+
+    def put(self, domain: str, platform: str) -> None:
+        """Record a freshly detected platform for domain."""
+        data = self._load()
+        data[domain.lower()] = {'platform': platform, 'detected_at': time.time()}
+        self._save(data)
+
+    def invalidate(self, domain: str) -> None:
+        """Forget domain's fingerprint (e.g. the CTF moved to another platform)."""
+        data = self._load()
+        if data.pop(domain.lower(), None) is not None:
+            self._save(data)
+
+
+# List-entry fields that change with every solve — not a content change
+_VOLATILE_LIST_KEYS = frozenset({
+    'solves', 'solved_by_me', 'solved', 'users_solved', 'num_solutions', 'solve_count',
+})
+# Challenge-detail fields that are per-user or rendered from the others
+_VOLATILE_DETAIL_KEYS = _VOLATILE_LIST_KEYS | {'attempts', 'view'}
+
+
+def _file_key(file_ref) -> str:
+    """A file's identity for change detection: its URL without the per-request query."""
+    url = file_ref.get('url', '') if isinstance(file_ref, dict) else str(file_ref)
+    return url.split('?')[0]
+
+
+def _dedup_key(url: str, ctf_host: str) -> str:
+    """A file URL's identity for --dedup: the full URL, except that the CTF's own
+    ``/files/`` links drop their per-request ``token`` parameter (CTFd).
+
+    Any other query may select a different file (``/get?id=1`` vs ``?id=2``).
+    """
+    parsed = urlparse(url)
+    if parsed.netloc != ctf_host or not parsed.path.startswith('/files/'):
+        return url
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != 'token']
+    return parsed._replace(query=urlencode(query), fragment='').geturl()
+
+
+def _challenge_id(challenge: Dict) -> str:
+    """ID of a CTFd / picoCTF list entry, as kept in the state file and index.json."""
+    return str(challenge.get('id'))
+
+
+def _list_hash(entry: Dict) -> str:
+    """Content hash of a challenge list entry, ignoring solve counters and file tokens."""
+    stable = {k: v for k, v in entry.items() if k not in _VOLATILE_LIST_KEYS}
+    if isinstance(stable.get('files'), list):
+        stable['files'] = sorted(_file_key(f) for f in stable['files'])
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _detail_hash(detail: Dict) -> str:
+    """Content hash of a challenge's details (description, files, ...), ignoring per-user state."""
+    return _list_hash({k: v for k, v in detail.items() if k not in _VOLATILE_DETAIL_KEYS})
+
+
+def _resume_request(file_url: str, part_path: Path, meta_path: Path) -> Tuple[Dict[str, str], int, int]:
+    """Headers, byte offset and expected total length to continue a ``.part`` download.
+
+    Returns no headers (start from scratch) unless the part belongs to the
+    same URL and something — a strong ETag, Last-Modified or the total length
+    — can tell us the remote file has not changed since.
+    """
+    try:
+        offset = part_path.stat().st_size
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}, 0, 0
+    # A preallocated segmented part has holes, so its size says nothing
+    if not offset or meta.get('segmented') or meta.get('url') != _file_key(file_url):
+        return {}, 0, 0
+    validator = _strong_validator(meta.get('etag'), meta.get('last_modified'))
+    length = meta.get('length') or 0
+    if not validator and not length:
+        return {}, 0, 0
+    headers = {'Range': f'bytes={offset}-'}
+    if validator:
+        headers['If-Range'] = validator
+    return headers, offset, length
+
+
+def _strong_validator(etag: Optional[str], last_modified: Optional[str]) -> Optional[str]:
+    """Value usable in If-Range — a strong ETag, else Last-Modified (weak ETags are not allowed)."""
+    if etag and not etag.startswith('W/'):
+        return etag
+    return last_modified
+
+
+def _content_range(resp) -> Tuple[Optional[int], Optional[int]]:
+    """(first byte, total length) from a 206's ``Content-Range: bytes a-b/total``."""
+    match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', resp.headers.get('Content-Range', ''))
+    if not match:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), (int(total) if total != '*' else None)
+
+
+def _hash_into(hasher, path: Path):
+    """Feed a file's contents into hasher and return it."""
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher
+
+
+def _sha256_file(path: Path) -> str:
+    """SHA-256 hex digest of a file (module-level so the CPU stage can run it)."""
+    return _hash_into(hashlib.sha256(), path).hexdigest()
+
+
+def _lock_file(f, blocking: bool = True) -> bool:
+    """Take an exclusive lock on an open file, shared between processes.
+
+    Held until ``_unlock_file`` or close; returns False if another process
+    holds it and ``blocking`` is off.
+    """
+    while True:
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            if os.name != 'nt':
+                raise
+            # msvcrt's blocking lock gives up after 10 s — keep waiting
+
+
+def _unlock_file(f) -> None:
+    if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Hold an exclusive lock on path (created if missing) for the block."""
+    with open(path, 'a') as f:
+        _lock_file(f)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+
+class ExtractError(ValueError):
+    """An archive --extract refuses to unpack: unsafe, over a limit, or unreadable."""
+
+
+# Archive names --extract unpacks, longest suffix first; the rest is the folder name
+_ARCHIVE_SUFFIXES = ('.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar', '.zip')
+# Small archives may expand past --extract-max-ratio up to this many bytes
+_EXTRACT_RATIO_FLOOR = 1024 * 1024
+
+
+def _archive_stem(file_name: str) -> Optional[str]:
+    """file_name without its archive suffix, or None if --extract should leave it alone."""
+    lower = file_name.lower()
+    for suffix in _ARCHIVE_SUFFIXES:
+        if lower.endswith(suffix) and len(file_name) > len(suffix):
+            return file_name[:-len(suffix)]
+    return None
+
+
+def _archive_members(archive: Path):
+    """Yield (name, is_dir, open) for each regular file and folder in a zip or tar.
+
+    Links and special files are skipped — they are how tars point outside the
+    extraction folder.
+    """
+    import tarfile
+    import zipfile
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if stat.S_ISLNK(info.external_attr >> 16):
+                    continue
+                if info.flag_bits & 0x1:
+                    raise ExtractError(f"{info.filename!r} is encrypted")
+                yield info.filename, info.is_dir(), lambda info=info: zf.open(info)
+    elif tarfile.is_tarfile(archive):
+        with tarfile.open(archive) as tf:
+            for member in tf:
+                if member.isdir() or member.isfile():
+                    yield member.name, member.isdir(), lambda member=member: tf.extractfile(member)
+    else:
+        raise ExtractError("not a zip or tar archive")
+
+
+def _extract_archive(archive: Path, dest: Path, max_bytes: int, max_ratio: float,
+                     max_files: int) -> List[str]:
+    """Unpack a zip or tar into dest and return its files, relative and sorted.
+
+    Runs on the CPU stage.  Sizes in the archive's headers are not trusted:
+    members are streamed against a budget of min(max_bytes, max_ratio × the
+    archive's size), and the archive is refused outright when it goes over,
+    holds more than max_files entries, or names a path that is absolute or
+    climbs out with '..'.  Files land in a hidden sibling folder that is
+    renamed to dest once complete; a dest already there is listed, not redone.
+    """
+    if dest.is_dir():
+        return sorted(p.relative_to(dest).as_posix() for p in dest.rglob('*') if p.is_file())
+    budget = min(max_bytes, max(int(archive.stat().st_size * max_ratio), _EXTRACT_RATIO_FLOOR))
+    tmp = dest.with_name(f'.{dest.name}.extracting')
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    files, written = set(), 0
+    try:
+        for count, (name, is_dir, open_member) in enumerate(_archive_members(archive), 1):
+            if count > max_files:
+                raise ExtractError(f"more than {max_files} entries")
+            rel = PurePosixPath(name.replace('\\', '/'))
+            if rel.is_absolute() or '..' in rel.parts or (rel.parts and ':' in rel.parts[0]):
+                raise ExtractError(f"{name!r} points outside the extraction folder")
+            if not rel.parts:
+                continue
+            target = tmp.joinpath(*rel.parts)
+            if is_dir:
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open_member() as src, open(target, 'wb') as dst:
+                for block in iter(lambda: src.read(1024 * 1024), b''):
+                    written += len(block)
+                    if written > budget:
+                        raise ExtractError(f"expands past {budget} bytes")
+                    dst.write(block)
+            files.add(rel.as_posix())
+        os.replace(tmp, dest)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return sorted(files)
+
+
+def _discard_part(part_path: Path, meta_path: Path) -> None:
+    """Remove a partial download and its validators."""
+    for path in (part_path, meta_path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with conditional revalidation.
+
+    Entries are keyed by URL plus the caller's auth identity and keep the
+    body beside its ``ETag`` / ``Last-Modified``.  Entries with validators are
+    revalidated with ``If-None-Match`` / ``If-Modified-Since``; entries without
+    are served unchecked for ``ttl`` seconds.  The cache is bounded to
+    ``max_bytes`` with least-recently-used eviction (meta file mtime = last use).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024, ttl: float = 300):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[float]] = {}   # key → [size, last used]
+        self._total = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        for meta_path in directory.glob('*.json'):
+            try:
+                with open(meta_path, 'r') as f:
+                    size = json.load(f)['size']
+                self._index[meta_path.stem] = [size, meta_path.stat().st_mtime]
+                self._total += size
+            except (OSError, ValueError, KeyError):
+                continue
+
+    @staticmethod
+    def key(url: str, identity: str = '') -> str:
+        """Cache key for url as seen by one auth identity."""
+        return hashlib.sha256(f"{identity}\n{url}".encode()).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.directory / f'{key}.json', self.directory / f'{key}.body'
+
+    def get(self, key: str) -> Optional[Tuple[Dict, bytes]]:
+        """Return (meta, body) for key and mark it recently used, or None."""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            body = body_path.read_bytes()
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index[key][1] = time.time()
+        return meta, body
+
+    def is_fresh(self, meta: Dict) -> bool:
+        """True if an entry without validators is still inside its TTL."""
+        return time.time() - meta.get('stored_at', 0) < self.ttl
+
+    def put(self, key: str, body: bytes, headers) -> None:
+        """Store a 200 response body with its validators."""
+        meta = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'stored_at': time.time(),
+            'size': len(body),
+        }
+        meta_path, body_path = self._paths(key)
+        # Temp names unique per process and thread: the cache directory is
+        # shared, and two writers may store the same URL at once
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            # Body first — an entry only exists once its meta file does
+            tmp = body_path.with_name(body_path.name + suffix)
+            tmp.write_bytes(body)
+            os.replace(tmp, body_path)
+            tmp = meta_path.with_name(meta_path.name + suffix)
+            with open(tmp, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp, meta_path)
+        except OSError as e:
+            logging.debug(f"Response cache write failed: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        with self._lock:
+            old = self._index.get(key)
+            self._total += len(body) - (old[0] if old else 0)
+            self._index[key] = [len(body), time.time()]
+            self._evict()
+
+    def refresh(self, key: str) -> None:
+        """Restart an entry's TTL after the server confirmed it (304)."""
+        meta_path, _ = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            meta['stored_at'] = time.time()
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        except (OSError, ValueError):
+            pass
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until under max_bytes (caller holds _lock)."""
+        if self._total <= self.max_bytes:
+            return
+        for key, (size, _used) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            del self._index[key]
+            self._total -= size
+
+
+def _cached_response(url: str, body: bytes, etag: Optional[str] = None) -> 'requests.Response':
+    """Build a 200 response object around a cached body (and its ETag)."""
+    import requests
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp._content = body
+    resp.encoding = 'utf-8'
+    if etag:
+        resp.headers['ETag'] = etag
+    return resp
+
+
+class BlobStore:
+    """Content-addressed attachment store shared by challenges (and CTF mirrors).
+
+    Each distinct file is kept once as ``<directory>/<sha[:2]>/<sha256>`` and
+    challenge folders get a hardlink to it — or a symlink, or a plain copy,
+    where the filesystem refuses.  ``urls/`` remembers which blob each file URL
+    produced, with its ETag / Last-Modified, so later runs (or other output
+    directories sharing the store) can link instead of downloading.  Blobs are
+    made read-only, since writing through one hardlink changes them all, and
+    are re-hashed (once per store instance) before being trusted again.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        (directory / 'urls').mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._verified: Set[str] = set()
+
+    def path(self, sha256: str) -> Path:
+        return self.directory / sha256[:2] / sha256
+
+    def has(self, sha256: Optional[str]) -> bool:
+        return bool(sha256) and self.path(sha256).is_file()
+
+    def verify(self, sha256: str) -> bool:
+        """Whether the stored blob still hashes to its name."""
+        with self._lock:
+            if sha256 in self._verified:
+                return True
+        try:
+            ok = _sha256_file(self.path(sha256)) == sha256
+        except OSError:
+            return False
+        if ok:
+            with self._lock:
+                self._verified.add(sha256)
+        return ok
+
+    def add(self, src: Path, sha256: str) -> Path:
+        """Move src into the store under its hash (dropping src if an intact blob exists)."""
+        blob = self.path(sha256)
+        if blob.exists() and self.verify(sha256):
+            src.unlink()
+        else:
+            # New, or the stored copy is corrupt: the fresh download replaces it
+            blob.parent.mkdir(exist_ok=True)
+            os.chmod(src, 0o444)
+            os.replace(src, blob)
+            with self._lock:
+                self._verified.add(sha256)
+        return blob
+
+    def link(self, sha256: str, dest: Path) -> None:
+        """Atomically point dest at a blob: hardlink, else symlink, else copy."""
+        blob = self.path(sha256)
+        tmp = dest.with_name(dest.name + '.link')
+        if tmp.is_symlink() or tmp.exists():
+            tmp.unlink()
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(blob, dest.parent), tmp)
+            except OSError:
+                shutil.copyfile(blob, tmp)
+        os.replace(tmp, dest)
+
+    def _url_file(self, url: str) -> Path:
+        return self.directory / 'urls' / f'{hashlib.sha256(url.encode()).hexdigest()}.json'
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """The blob a URL produced before ({'sha256', 'size', 'etag', 'last_modified'}), if still stored."""
+        try:
+            with open(self._url_file(url), 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record if self.has(record.get('sha256')) else None
+
+    def forget(self, url: str) -> None:
+        """Drop the record of which blob url served."""
+        try:
+            self._url_file(url).unlink()
+        except FileNotFoundError:
+            pass
+
+    def remember(self, url: str, sha256: str, size: int,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Record that url served the blob sha256."""
+        path = self._url_file(url)
+        tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'url': url, 'sha256': sha256, 'size': size,
+                       'etag': etag, 'last_modified': last_modified}, f)
+        os.replace(tmp, path)
 
 
 class ScraperState:
-    """Manages scraper state for resume capability"""
-    
-    def __init__(self, state_file: Path):
+    """Manages scraper state for resume capability.
+
+    The JSON state file is a snapshot; each completion/failure (and each
+    downloaded file's size and SHA-256) is appended to a journal beside it,
+    ``.scraper_state.json.journal``, and folded back into the snapshot every
+    ``compact_every`` events or on ``save()``.  Journal lines are flushed
+    immediately, so a killed process loses nothing, while fsync is batched
+    by count/time.
+    """
+
+    def __init__(self, state_file: Path, compact_every: int = 1000,
+                 fsync_every: int = 64, fsync_interval: float = 1.0):
         self.state_file = state_file
+        self.journal_file = state_file.with_name(state_file.name + '.journal')
+        self.compact_every = compact_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._journal = None
+        self._pending = 0      # journal events not yet in the snapshot
+        self._unsynced = 0     # journal events not yet fsync'ed
+        self._last_sync = time.monotonic()
         self.state = self._load()
     
     def _load(self) -> Dict:
-        """Load state from file"""
+        """Load the snapshot, then replay any journal written after it"""
+        state = {
+            'completed_challenges': set(),
+            'failed_challenges': set(),
+            'files': {},
+            'last_run': None,
+            'platform': None
+        }
         if self.state_file.exists():
             try:
                 with open(self.state_file, 'r') as f:
@@ -108,29 +1527,100 @@ class ScraperState:
                 # JSON serializes sets as lists — convert back to sets
                 data['completed_challenges'] = set(data.get('completed_challenges', []))
                 data['failed_challenges'] = set(data.get('failed_challenges', []))
-                return data
+                data.setdefault('files', {})
+                state = data
             except Exception as e:
                 logging.warning(f"Failed to load state: {e}")
-        return {
-            'completed_challenges': set(),
-            'failed_challenges': set(),
-            'last_run': None,
-            'platform': None
-        }
-    
+
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue   # torn final line from a crash mid-write
+                    self._apply(state, event)
+                    self._pending += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Failed to replay state journal: {e}")
+        return state
+
+    @staticmethod
+    def _apply(state: Dict, event: Dict) -> None:
+        """Apply one journal event (replaying twice gives the same result)."""
+        challenge_id = event.get('id')
+        if event.get('op') == 'completed':
+            state['completed_challenges'].add(challenge_id)
+            state['failed_challenges'].discard(challenge_id)
+        elif event.get('op') == 'failed':
+            state['failed_challenges'].add(challenge_id)
+        elif event.get('op') == 'file':
+            state['files'].setdefault(challenge_id, {})[event['url']] = {
+                'size': event.get('size'), 'sha256': event.get('sha256')}
+
     def save(self) -> None:
-        """Save state to file"""
+        """Save a full snapshot and drop the journal it supersedes"""
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        """Close the journal (events not yet in the snapshot are replayed on load)"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _compact(self) -> None:
+        """Atomically replace the snapshot (caller holds ``_lock``)."""
         try:
             # Convert sets to lists for JSON serialization
             save_data = self.state.copy()
             save_data['completed_challenges'] = list(self.state['completed_challenges'])
             save_data['failed_challenges'] = list(self.state['failed_challenges'])
             save_data['last_run'] = datetime.now().isoformat()
-            
-            with open(self.state_file, 'w') as f:
+
+            tmp_file = self.state_file.with_name(self.state_file.name + '.tmp')
+            with open(tmp_file, 'w') as f:
                 json.dump(save_data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.state_file)
+
+            # A crash before this point just replays events already in the snapshot
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self.journal_file.exists():
+                self.journal_file.unlink()
+            self._pending = 0
+            self._unsynced = 0
         except Exception as e:
             logging.error(f"Failed to save state: {e}")
+
+    def _append(self, event: Dict) -> None:
+        """Journal one event (caller holds ``_lock``)."""
+        try:
+            if self._journal is None:
+                self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            self._journal.write(json.dumps(event) + '\n')
+            self._journal.flush()   # into the OS page cache — survives kill -9
+            self._pending += 1
+            self._unsynced += 1
+
+            now = time.monotonic()
+            if self._unsynced >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+                os.fsync(self._journal.fileno())
+                self._unsynced = 0
+                self._last_sync = now
+        except Exception as e:
+            logging.error(f"Failed to journal state: {e}")
+            return
+
+        if self._pending >= self.compact_every:
+            self._compact()
     
     def is_completed(self, challenge_id: str) -> bool:
         """Check if challenge is already completed"""
@@ -138,32 +1628,226 @@ class ScraperState:
     
     def mark_completed(self, challenge_id: str):
         """Mark challenge as completed"""
-        self.state['completed_challenges'].add(challenge_id)
-        if challenge_id in self.state.get('failed_challenges', set()):
-            self.state['failed_challenges'].remove(challenge_id)
-        self.save()
+        self._record({'op': 'completed', 'id': challenge_id})
     
     def mark_failed(self, challenge_id: str):
         """Mark challenge as failed"""
-        self.state['failed_challenges'].add(challenge_id)
-        self.save()
+        self._record({'op': 'failed', 'id': challenge_id})
+
+    def _record(self, event: Dict) -> None:
+        with self._lock:
+            self._apply(self.state, event)
+            self._append(event)
+
+    def claim(self, challenge_id: str) -> bool:
+        """Claim a challenge for this process (always succeeds — JSON state is single-process)"""
+        return True
+
+    def record_file(self, challenge_id: str, url: str, status: str,
+                    size: Optional[int] = None, sha256: Optional[str] = None) -> None:
+        """Record a completed file's size and hash (failures are not tracked by the JSON state)"""
+        if status == 'completed':
+            self._record({'op': 'file', 'id': challenge_id, 'url': url,
+                          'size': size, 'sha256': sha256})
+
+    def file_records(self, challenge_id: str) -> Dict[str, Dict]:
+        """Completed files of a challenge: url → {'size', 'sha256'}"""
+        with self._lock:
+            return dict(self.state['files'].get(challenge_id, {}))
+
+
+class SQLiteScraperState:
+    """SQLite-backed drop-in for ScraperState, shareable between processes.
+
+    Tracks per-challenge status, attempts and timestamps plus per-file
+    progress in a WAL-mode database.  ``claim()`` atomically hands each
+    challenge to one worker process, so several ``--state-db`` runs against
+    the same CTF split the work instead of duplicating it.  While a process
+    holds claims, a background thread renews them every ``lease / 3``
+    seconds, so a long download keeps its challenge; a claim whose owner
+    died is taken over after ``lease`` seconds.
+    """
+
+    def __init__(self, db_path: Path, lease: float = 900.0):
+        self.db_path = db_path
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Completions by peers after this point are shared work, not stale results
+        self._opened_at = time.time()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS challenges (
+                id          TEXT PRIMARY KEY,
+                status      TEXT NOT NULL DEFAULT 'pending',
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                owner       TEXT,
+                claimed_at  REAL,
+                updated_at  REAL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                challenge_id TEXT NOT NULL,
+                url          TEXT NOT NULL,
+                status       TEXT NOT NULL,
+                size         INTEGER,
+                updated_at   REAL,
+                sha256       TEXT,
+                PRIMARY KEY (challenge_id, url)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        # Databases from before per-file hashes were recorded
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(files)')}
+        if 'sha256' not in columns:
+            self._db.execute('ALTER TABLE files ADD COLUMN sha256 TEXT')
+        meta = dict(self._db.execute('SELECT key, value FROM meta'))
+        self.state = {'platform': meta.get('platform'), 'last_run': meta.get('last_run')}
+
+    @contextmanager
+    def _transaction(self):
+        """Serialize writers across threads (lock) and processes (BEGIN IMMEDIATE)."""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._db
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+
+    def _set_status(self, challenge_id: str, status: str) -> None:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                """INSERT INTO challenges (id, status, updated_at) VALUES (?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET status = excluded.status,
+                       owner = NULL, updated_at = excluded.updated_at""",
+                (challenge_id, status, now))
+
+    def save(self) -> None:
+        """Persist run metadata (challenge rows are written as they change)"""
+        self.state['last_run'] = datetime.now().isoformat()
+        try:
+            with self._transaction() as db:
+                db.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                               [(k, v) for k, v in self.state.items() if v is not None])
+        except sqlite3.Error as e:
+            logging.error(f"Failed to save state: {e}")
+
+    def is_completed(self, challenge_id: str) -> bool:
+        """Check if challenge is already completed"""
+        with self._lock:
+            row = self._db.execute('SELECT status FROM challenges WHERE id = ?',
+                                   (challenge_id,)).fetchone()
+        return row is not None and row[0] == 'completed'
+
+    def mark_completed(self, challenge_id: str):
+        """Mark challenge as completed and release its claim"""
+        self._set_status(challenge_id, 'completed')
+
+    def mark_failed(self, challenge_id: str):
+        """Mark challenge as failed and release its claim"""
+        self._set_status(challenge_id, 'failed')
+
+    def claim(self, challenge_id: str) -> bool:
+        """Atomically take a challenge unless a live peer holds it or already finished it"""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute('INSERT OR IGNORE INTO challenges (id, updated_at) VALUES (?, ?)',
+                       (challenge_id, now))
+            cur = db.execute(
+                """UPDATE challenges
+                   SET status = 'running', owner = ?, claimed_at = ?,
+                       attempts = attempts + 1, updated_at = ?
+                   WHERE id = ? AND NOT (
+                       (status = 'running' AND owner != ? AND claimed_at > ?)
+                       OR (status = 'completed' AND updated_at >= ?))""",
+                (self.owner, now, now, challenge_id,
+                 self.owner, now - self.lease, self._opened_at))
+            claimed = cur.rowcount == 1
+        if claimed and self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._renew_loop, name='ctf-lease', daemon=True)
+            self._heartbeat.start()
+        return claimed
+
+    def renew(self) -> None:
+        """Push back the lease on every challenge this process is still working on"""
+        with self._transaction() as db:
+            db.execute("UPDATE challenges SET claimed_at = ? WHERE owner = ? AND status = 'running'",
+                       (time.time(), self.owner))
+
+    def _renew_loop(self) -> None:
+        while not self._closed.wait(self.lease / 3):
+            try:
+                self.renew()
+            except sqlite3.Error as e:
+                logging.warning(f"Failed to renew challenge claims: {e}")
+
+    def record_file(self, challenge_id: str, url: str, status: str,
+                    size: Optional[int] = None, sha256: Optional[str] = None) -> None:
+        """Record per-file download progress (and the content hash once complete)"""
+        with self._transaction() as db:
+            db.execute("""INSERT OR REPLACE INTO files (challenge_id, url, status, size, updated_at, sha256)
+                          VALUES (?, ?, ?, ?, ?, ?)""",
+                       (challenge_id, url, status, size, time.time(), sha256))
+
+    def file_records(self, challenge_id: str) -> Dict[str, Dict]:
+        """Completed files of a challenge: url → {'size', 'sha256'}"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, size, sha256 FROM files WHERE challenge_id = ? AND status = 'completed'",
+                (challenge_id,)).fetchall()
+        return {url: {'size': size, 'sha256': sha256} for url, size, sha256 in rows}
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        with self._lock:
+            self._db.close()
 
 
 class UniversalCTFScraper:
     def __init__(self, url: str, cookies_str: Optional[str] = None, output_dir: str = "./output",
                  skip_existing: bool = False, dry_run: bool = False,
                  max_workers: int = 5, timeout: int = 30, verbose: bool = False,
-                 rate_limit: float = 0.0, token: Optional[str] = None):
+                 rate_limit: Union[float, str] = 0.0, token: Optional[str] = None,
+                 redetect: bool = False, state_db: Optional[str] = None,
+                 burst: int = 1, cdn_workers: Optional[int] = None,
+                 cdn_rate_limit: float = 0.0, http_cache: bool = False,
+                 cache_ttl: float = 300, cache_size_mb: int = 256,
+                 incremental: bool = False, segments: int = 4,
+                 segment_threshold_mb: float = 32, verify: bool = False,
+                 dedup: bool = False, blob_dir: Optional[str] = None,
+                 metrics_out: Optional[str] = None, metrics_prom: Optional[str] = None,
+                 metrics_interval: float = 15, trace_out: Optional[str] = None,
+                 profile_dir: Optional[str] = None, profile_memory: bool = False,
+                 cpu_workers: int = 0, extract: bool = False,
+                 extract_max_mb: float = 1024, extract_max_ratio: float = 200,
+                 extract_max_files: int = 10000):
         self.url = url
         self.output_dir = Path(output_dir)
         self.skip_existing = skip_existing
+        self.verify = verify
+        self.incremental = incremental
         self.dry_run = dry_run
         self.max_workers = max_workers
         self.timeout = timeout
         
-        # Setup logging — use TqdmHandler so log lines don't break the progress bar
-        from tqdm.contrib.logging import logging_redirect_tqdm
-        self._logging_redirect_tqdm = logging_redirect_tqdm
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # Setup logging (routed through tqdm while the progress bar is up, see _run_challenges)
         log_level = logging.DEBUG if verbose else logging.INFO
         handler = logging.StreamHandler()
         handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S'))
@@ -196,15 +1880,84 @@ class UniversalCTFScraper:
             'Referer': self.base_url,
         })
 
+        # Connection pools sized to our concurrency (requests' default is 10 per host).
+        # The CTF host gets its own adapter; the default adapters keep one pool per
+        # off-site host (CDNs, object storage, redirect targets).
+        cdn_workers = cdn_workers or max_workers
+        for prefix in ('https://', 'http://'):
+            self.session.mount(prefix, HTTPAdapter(pool_connections=32, pool_maxsize=cdn_workers))
+        self.session.mount(self.base_url + '/', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+
         # Bearer token auth (rCTF, HTB, etc.)
         if token:
             self.session.headers['Authorization'] = f'Bearer {token}'
 
-        # Rate limiter (0 = disabled)
-        self._rate_limiter = RateLimiter(rate_limit)
+        # Rate limiter (0 = disabled, 'auto' = adaptive); API calls and file downloads
+        # each get half of it, so --rate-limit caps the CTF host as a whole and
+        # queued downloads never delay an API call
+        if rate_limit == 'auto':
+            self._rate_limiter = AdaptiveRateLimiter(burst=burst, shared_buckets=True)
+        else:
+            self._rate_limiter = RateLimiter(rate_limit, burst, shared_buckets=True)
+        self._rate_limiter.bucket('files')
+
+        # Optional response cache for challenge metadata, keyed per auth identity
+        self._response_cache = None
+        if http_cache:
+            self._response_cache = ResponseCache(_cache_dir() / 'http',
+                                                 max_bytes=cache_size_mb * 1024 * 1024,
+                                                 ttl=cache_ttl)
+        self._auth_identity = hashlib.sha256(
+            json.dumps([sorted(self.cookies.items()), token or '']).encode()).hexdigest()
+
+        # Off-site file hosts get their own per-host rate buckets
+        self._cdn_limiter = RateLimiter(cdn_rate_limit, burst)
+
+        # --trace-out: per-challenge span timeline (Chrome trace JSON)
+        self.tracer = Tracer(enabled=bool(trace_out))
+        self._trace_out = Path(trace_out) if trace_out else None
+
+        # --extract: archives are unpacked next to themselves on a process pool
+        # of their own, so parsing stays on the threads unless --cpu-workers is set
+        self.extract = extract
+        self._extract_limits = (int(extract_max_mb * 1024 * 1024), extract_max_ratio, extract_max_files)
+        extract_workers = (cpu_workers or min(4, os.cpu_count() or 1)) if extract else 0
+
+        # One scheduler for all adapters — max_workers bounds requests in flight
+        # to the CTF, cdn_workers bounds each off-site file host, cpu_workers
+        # sizes the process pool for parsing and hashing (0 = on the worker threads)
+        self._scheduler = Scheduler(max_workers, host_limit=cdn_workers, tracer=self.tracer,
+                                    cpu_workers=cpu_workers, extract_workers=extract_workers)
+
+        # Request/disk metrics, written to --metrics-out (JSON) and refreshed
+        # in --metrics-prom (Prometheus textfile) every metrics_interval seconds
+        self.metrics = Metrics()
+        self.metrics.gauge('queues', self._scheduler.depths)
+        self.metrics.gauge('stats', lambda: dict(self.stats))
+        self._metrics_out = Path(metrics_out) if metrics_out else None
+        self._metrics_prom = Path(metrics_prom) if metrics_prom else None
+        self._metrics_interval = max(1.0, metrics_interval)
+
+        # --dedup: challenge files become links into a content-addressed store;
+        # _url_fetches holds the one in-flight fetch per file URL this run
+        self._blobs = None
+        if dedup or blob_dir:
+            self._blobs = BlobStore(Path(blob_dir) if blob_dir else self.output_dir / '.blobs')
+        self._url_fetches: Dict[str, Future] = {}
+
+        # Files at least this large are fetched as parallel byte ranges (0 = never)
+        self.segments = max(1, segments)
+        self.segment_threshold = int(segment_threshold_mb * 1024 * 1024)
         
-        # State management
-        self.state = ScraperState(self.output_dir / '.scraper_state.json')
+        # State management (SQLite when shared between worker processes)
+        if state_db:
+            self.state = SQLiteScraperState(Path(state_db))
+        else:
+            self.state = ScraperState(self.output_dir / '.scraper_state.json')
+
+        # Platform fingerprints shared across output directories
+        self._platform_cache = PlatformCache(_cache_dir() / 'platforms.json')
+        self._redetect = redetect
         
         # Thread safety for stats and state
         self._lock = threading.Lock()
@@ -219,23 +1972,259 @@ class UniversalCTFScraper:
             'failed_files': 0
         }
 
-        # JSON manifest — collects every processed challenge for index.json
-        self._manifest: List[Dict] = []
-
-    def _save_json_manifest(self) -> None:
-        """Write index.json to the output root — machine-readable challenge list."""
+        # JSON manifest — each finished challenge is appended to this process's
+        # own index.<pid>.<id>.jsonl (entries stay in memory only while their
+        # challenge is in flight) and merged into index.json at the end
+        self._open_entries: Dict[str, Dict] = {}
+        self._manifest_file = None
+        self._journal_path = self.output_dir / f'index.{os.getpid()}.{uuid.uuid4().hex[:8]}.jsonl'
+        # Size and SHA-256 of each file on disk this run: challenge ID → url → record
+        self._downloads: Dict[str, Dict[str, Dict]] = {}
+
+        # --incremental: previous manifest entries by challenge ID, this run's diff,
+        # and unchanged-looking CTFd challenges whose details still need a check
+        self._previous: Dict[str, Dict] = {}
+        self._changelog: Optional[Dict] = None
+        self._recheck: Set[str] = set()
+
+        # --profile: sample every thread, and swap the shared locks for timed ones
+        # while nothing holds them yet
+        self._profiler = None
+        if profile_dir:
+            self._profiler = Profiler(Path(profile_dir), memory=profile_memory)
+            locks = self._profiler.locks
+            locks.instrument(self, 'scraper._lock')
+            locks.instrument(self._rate_limiter, 'RateLimiter._lock')
+            locks.instrument(self._cdn_limiter, 'RateLimiter._lock (cdn)')
+            locks.instrument(self.state, 'state._lock')
+            locks.instrument(self._response_cache, 'ResponseCache._lock')
+            locks.instrument(self.metrics, 'Metrics._lock')
+            locks.instrument(self.tracer, 'Tracer._lock')
+            locks.instrument(self._scheduler, 'Scheduler._state_lock', '_state_lock')
+
+    def _append_manifest(self, entry: Dict) -> None:
+        """Stream one challenge record to this process's journal (flushed, so a crash keeps it)."""
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        start = time.perf_counter()
+        with self.tracer.span('append index.jsonl', 'disk'), self._lock:
+            if self._manifest_file is None:
+                self._manifest_file = open(self._journal_path, 'a', encoding='utf-8')
+                _lock_file(self._manifest_file)   # held while we live — recovery leaves it alone
+            self._manifest_file.write(line)
+            self._manifest_file.flush()
+        self.metrics.disk_write('manifest', len(line.encode('utf-8')), time.perf_counter() - start)
+
+    def _save_json_manifest(self, recover_only: bool = False) -> None:
+        """Write index.json to the output root — machine-readable challenge list.
+
+        The previous index.json is merged with this run's journal records
+        (newer wins per challenge ID), so challenges skipped this run keep
+        their entries; ones --incremental saw removed from the CTF are dropped.
+        Journals left by processes that died are folded in too; ones another
+        running process still holds are not touched.  The merge runs under
+        ``index.json.lock``, the file is replaced atomically and the consumed
+        journals deleted.  With ``recover_only``, nothing is written unless
+        there was a dead process's journal to fold in.
+        """
         manifest_path = self.output_dir / 'index.json'
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'version': __version__,
-                'platform': self.state.state.get('platform', 'unknown'),
-                'url': self.url,
-                'scraped_at': datetime.now().isoformat(),
-                'total': len(self._manifest),
-                'challenges': self._manifest
-            }, f, indent=2, ensure_ascii=False)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.output_dir / 'index.json.lock'):
+            with self._lock:
+                if self._manifest_file is not None:
+                    _unlock_file(self._manifest_file)
+                    self._manifest_file.close()
+                    self._manifest_file = None
+            orphans = self._orphan_journals()
+            try:
+                if recover_only and not orphans:
+                    return
+                if orphans:
+                    self.logger.info(f"📄 Recovering {len(orphans)} journal(s) from interrupted runs")
+                self._merge_manifest(manifest_path, [self._journal_path] + [p for p, _ in orphans])
+            finally:
+                for _, f in orphans:
+                    _unlock_file(f)
+                    f.close()
+            for path in [self._journal_path] + [p for p, _ in orphans]:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
         self.logger.info(f"📄 Manifest written → {manifest_path}")
-    
+
+    def _orphan_journals(self) -> List[Tuple[Path, object]]:
+        """Other runs' journals that no live process holds, each opened and locked.
+
+        Empty ones are skipped: their owner may not have locked them yet.
+        """
+        found = []
+        for path in sorted(self.output_dir.glob('index*.jsonl')):
+            if path == self._journal_path:
+                continue
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except OSError:
+                continue
+            if _lock_file(f, blocking=False) and os.fstat(f.fileno()).st_size:
+                found.append((path, f))
+            else:
+                f.close()
+        return found
+
+    def _merge_manifest(self, manifest_path: Path, journals: List[Path]) -> None:
+        """Replace index.json with its entries plus the journals' (caller holds the file lock)."""
+        entries: Dict[object, Dict] = {}
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get('challenges', [])
+        except (OSError, ValueError, AttributeError):
+            previous = []
+        def _merge(entry: Dict) -> None:
+            # Records without an ID can't be matched — keep each one
+            key = entry.get('id')
+            entries[key if key is not None else ('#', len(entries))] = entry
+
+        for entry in previous:
+            if isinstance(entry, dict):
+                _merge(entry)
+        for journal_path in journals:
+            try:
+                with open(journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            _merge(json.loads(line))
+                        except ValueError:
+                            continue   # torn final line from a crash mid-write
+            except FileNotFoundError:
+                pass
+        for removed in (self._changelog or {}).get('removed', []):
+            entries.pop(removed['id'], None)
+
+        tmp_path = manifest_path.with_name(f'{manifest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        start = time.perf_counter()
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': __version__,
+                    'platform': self.state.state.get('platform', 'unknown'),
+                    'url': self.url,
+                    'scraped_at': datetime.now().isoformat(),
+                    'total': len(entries),
+                    'challenges': list(entries.values())
+                }, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+                written = f.tell()
+            os.replace(tmp_path, manifest_path)
+        except BaseException:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        self.metrics.disk_write('index', written, time.perf_counter() - start)
+
+    def _with_downloads(self, entry: Dict) -> Dict:
+        """Manifest entry plus the size/hash of each of its files (this run's, else the last run's)."""
+        chal_id = entry.get('id')
+        with self._lock:
+            records = {d.get('url'): d for d in self._previous.get(chal_id, {}).get('downloads', [])}
+            records.update(self._downloads.pop(chal_id, {}))
+        if not records:
+            return entry
+        keys = [_file_key(f) for f in entry.get('files', [])]
+        return dict(entry, downloads=[records[k] for k in keys if k in records])
+
+    def _load_previous_manifest(self) -> Dict[str, Dict]:
+        """Previous index.json entries keyed by challenge ID (entries without IDs are ignored)."""
+        try:
+            with open(self.output_dir / 'index.json', 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('challenges', [])
+        except (OSError, ValueError, AttributeError):
+            return {}
+        return {str(e['id']): e for e in entries if isinstance(e, dict) and e.get('id') is not None}
+
+    def _plan_incremental(self, challenges: List[Dict], id_of: Callable[[Dict], str],
+                          recheck: bool = False) -> List[Dict]:
+        """Diff the fresh challenge list against the last run; return only added/changed ones.
+
+        A challenge is changed when its list-entry hash differs from the one in
+        index.json, or when it never completed.  Unchanged entries stay in
+        index.json as they are; the diff is written to changelog.json.  With
+        ``recheck`` (CTFd, whose list entries carry no description or files),
+        unchanged ones are returned too and noted in ``_recheck``: their
+        details are fetched conditionally and diffed before anything is written.
+        """
+        self._previous = self._load_previous_manifest()
+        added, changed, todo = [], [], []
+        seen = set()
+        for chal in challenges:
+            chal_id = id_of(chal)
+            seen.add(chal_id)
+            prev = self._previous.get(chal_id)
+            if prev is None:
+                added.append(chal)
+            elif prev.get('list_hash') != _list_hash(chal) or not self.state.is_completed(chal_id):
+                changed.append(chal)
+            elif recheck:
+                self._recheck.add(chal_id)
+            else:
+                continue   # its index.json entry is kept as is
+            todo.append(chal)
+        removed = [(chal_id, prev) for chal_id, prev in self._previous.items() if chal_id not in seen]
+
+        self._changelog = {
+            'scraped_at': datetime.now().isoformat(),
+            'added':   [self._changelog_entry(id_of(c), c) for c in added],
+            'changed': [self._changelog_entry(id_of(c), c) for c in changed],
+            'removed': [self._changelog_entry(chal_id, e) for chal_id, e in removed],
+        }
+        self.stats['skipped'] += len(challenges) - len(todo)
+        rechecks = f", {len(self._recheck)} to re-check" if self._recheck else ""
+        self.logger.info(f"🔄 Incremental: {len(added)} added, {len(changed)} changed, "
+                         f"{len(removed)} removed, {len(challenges) - len(todo)} unchanged{rechecks}")
+        self._write_changelog()
+        return todo
+
+    @staticmethod
+    def _changelog_entry(chal_id: str, entry: Dict) -> Dict:
+        category = entry.get('category')
+        if isinstance(category, dict):
+            category = category.get('name')
+        return {'id': chal_id, 'name': entry.get('name', entry.get('title')), 'category': category}
+
+    def _write_changelog(self) -> None:
+        if self.dry_run:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            text = json.dumps(self._changelog, indent=2, ensure_ascii=False)
+        with open(self.output_dir / 'changelog.json', 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def _details_unchanged(self, chal_id: str, name: str, detail_data: Optional[Dict],
+                           etag: Optional[str], not_modified: bool) -> bool:
+        """For a CTFd challenge in ``_recheck``: True (and nothing to write) if its details did not change.
+
+        Otherwise it is added to the changelog's ``changed`` list.
+        """
+        if chal_id not in self._recheck:
+            return False
+        prev = self._previous.get(chal_id, {})
+        if not_modified or (detail_data and detail_data.get('success')
+                            and _detail_hash(detail_data.get('data') or {}) == prev.get('detail_hash')):
+            if etag and etag != prev.get('detail_etag'):
+                self._append_manifest(dict(prev, detail_etag=etag))
+            self.state.mark_completed(chal_id)   # releases a --state-db claim
+            with self._lock:
+                self.stats['skipped'] += 1
+            self.logger.debug(f"⏭️  Skipping {name} (details unchanged)")
+            return True
+        if detail_data and detail_data.get('success'):
+            with self._lock:
+                self._changelog['changed'].append(self._changelog_entry(chal_id, prev))
+        return False
+
     def _parse_cookies(self, cookies_str: str) -> Dict[str, str]:
         """Parse cookies from string, file, or environment variable"""
         # Check if it's a file reference (@file.txt)
@@ -259,7 +2248,13 @@ class UniversalCTFScraper:
         return cookies
     
     def detect_platform(self) -> str:
-        """Auto-detect the CTF platform by probing known API fingerprints."""
+        """Auto-detect the CTF platform by probing known API fingerprints.
+
+        All probes (plus one fetch of the base page) run concurrently.  The
+        winner is picked in ``_PLATFORM_PROBES`` priority order as soon as every
+        higher-priority probe has answered, or immediately when the base page
+        carries exactly one platform's HTML markers.
+        """
         self.logger.info(f"🔍 Detecting platform type for {self.domain}...")
 
         # ── Domain shortcuts ──────────────────────────────────────────────────
@@ -267,67 +2262,72 @@ class UniversalCTFScraper:
             self.logger.info("✅ Detected: picoCTF")
             return 'picoctf'
 
-        # ── rCTF  (/api/v1/challs → {"kind":"goodChallenge",...}) ────────────
+        executor = ThreadPoolExecutor(max_workers=len(_PLATFORM_PROBES) + 1)
         try:
-            resp = self.session.get(
-                urljoin(self.base_url, '/api/v1/challs'), timeout=self.timeout)
-            if resp.status_code == 200 and resp.content:
-                data = resp.json()
-                if isinstance(data, dict) and data.get('kind') in (
-                        'goodChallenge', 'badToken', 'goodChallenges'):
-                    self.logger.info("✅ Detected: rCTF platform")
-                    return 'rctf'
-        except Exception as e:
-            self.logger.debug(f"rCTF probe failed: {e}")
+            futures = {executor.submit(self._probe_html_markers): None}
+            for platform, path, matches, _label in _PLATFORM_PROBES:
+                futures[executor.submit(self._probe_api, platform, path, matches)] = platform
 
-        # ── CTFd  (/api/v1/challenges → {"success":true,"data":[...]}) ────────
-        try:
-            resp = self.session.get(
-                urljoin(self.base_url, '/api/v1/challenges'), timeout=self.timeout)
-            if resp.status_code == 200 and resp.content:
-                data = resp.json()
-                if isinstance(data, dict) and ('success' in data or 'data' in data):
-                    self.logger.info("✅ Detected: CTFd platform")
-                    return 'ctfd'
-        except Exception as e:
-            self.logger.debug(f"CTFd probe failed: {e}")
+            results: Dict[str, bool] = {}
+            for future in as_completed(futures):
+                platform = futures[future]
+                if platform is None:
+                    marked = future.result()
+                    if marked:
+                        self.logger.info(f"✅ Detected: {_PLATFORM_LABELS[marked]} (page markers)")
+                        return marked
+                    continue
+                results[platform] = future.result()
+
+                # Decide as soon as no pending probe could outrank a match
+                for candidate, _path, _matches, label in _PLATFORM_PROBES:
+                    if candidate not in results:
+                        break
+                    if results[candidate]:
+                        self.logger.info(f"✅ Detected: {label}")
+                        return candidate
+        finally:
+            # Losing probes finish (or time out) on their own
+            executor.shutdown(wait=False)
 
-        # ── picoCTF-style  (/api/challenges/ → paginated list) ───────────────
+        self.logger.warning("⚠️  Platform unknown — use --browser for manual login")
+        return 'unknown'
+
+    def _probe_api(self, platform: str, path: str, matches: Callable) -> bool:
+        """Fetch one API fingerprint endpoint and test its JSON shape."""
         try:
-            resp = self.session.get(
-                urljoin(self.base_url, '/api/challenges/'), timeout=self.timeout)
+            resp = self._http_get('probe', urljoin(self.base_url, path), timeout=self.timeout)
             if resp.status_code == 200 and resp.content:
-                data = resp.json()
-                if isinstance(data, (list, dict)):
-                    self.logger.info("✅ Detected: picoCTF-style platform")
-                    return 'picoctf'
+                return bool(matches(resp.json()))
         except Exception as e:
-            self.logger.debug(f"picoCTF probe failed: {e}")
+            self.logger.debug(f"{platform} probe failed: {e}")
+        return False
 
-        # ── Mellivora  (/api/challenges.php → JSON array) ─────────────────────
+    def _probe_html_markers(self) -> Optional[str]:
+        """Return the platform whose markers alone appear on the base page, if any."""
         try:
-            resp = self.session.get(
-                urljoin(self.base_url, '/api/challenges.php'), timeout=self.timeout)
-            if resp.status_code == 200 and resp.content:
-                data = resp.json()
-                if isinstance(data, list) and data and 'title' in data[0]:
-                    self.logger.info("✅ Detected: Mellivora platform")
-                    return 'mellivora'
+            resp = self._http_get('probe', self.base_url + '/', timeout=self.timeout)
+            if resp.status_code != 200:
+                return None
+            html = resp.text
+            found = [platform for platform, markers in _HTML_MARKERS.items()
+                     if any(marker in html for marker in markers)]
+            if len(found) == 1:
+                return found[0]
         except Exception as e:
-            self.logger.debug(f"Mellivora probe failed: {e}")
+            self.logger.debug(f"Base page probe failed: {e}")
+        return None
 
-        self.logger.warning("⚠️  Platform unknown — use --browser for manual login")
-        return 'unknown'
-    
     def scrape_ctfd(self) -> bool:
         """Scrape CTFd-based platform"""
+        import requests
         self.logger.info(f"\n🎯 Scraping CTFd platform: {self.domain}")
         print("=" * 60)
         
         api_url = urljoin(self.base_url, '/api/v1/challenges')
         
         try:
-            resp = self.session.get(api_url, timeout=self.timeout)
+            resp = self._http_get('list', api_url, timeout=self.timeout)
             resp.raise_for_status()
             data = resp.json()
             
@@ -338,6 +2338,9 @@ class UniversalCTFScraper:
             challenges = data.get('data', [])
             self.stats['total'] = len(challenges)
             self.logger.info(f"📦 Found {len(challenges)} challenges\n")
+
+            if self.incremental:
+                challenges = self._plan_incremental(challenges, _challenge_id, recheck=True)
             
             if self.dry_run:
                 print("🔍 DRY RUN - Preview of challenges:")
@@ -347,22 +2350,9 @@ class UniversalCTFScraper:
                     print(f"  ... and {len(challenges) - 10} more")
                 return True
 
-            # Process challenges concurrently with progress bar
-            with self._logging_redirect_tqdm():
-                with tqdm(total=len(challenges), desc="Progress", unit="chal", dynamic_ncols=True) as pbar:
-                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                        futures = {
-                            executor.submit(self._process_ctfd_challenge, c): c
-                            for c in challenges
-                        }
-                        for future in as_completed(futures):
-                            result = future.result()
-                            with self._lock:
-                                if result:
-                                    self.stats['success'] += 1
-                                else:
-                                    self.stats['failed'] += 1
-                            pbar.update(1)
+            self._run_challenges(challenges, self._process_ctfd_challenge, _challenge_id)
+            if self._recheck:
+                self._write_changelog()   # with the challenges whose details changed
             
             self._print_summary()
             self._save_json_manifest()
@@ -375,6 +2365,36 @@ class UniversalCTFScraper:
             self.logger.error(f"❌ Error scraping CTFd platform: {e}", exc_info=True)
             return False
     
+    def _run_challenges(self, challenges: List[Dict], process: Callable[[Dict], bool],
+                        key: Callable[[Dict], str]) -> None:
+        """Feed challenges through the scheduler's metadata stage with a progress bar.
+
+        key gives each challenge's ID, which tags its trace spans (--trace-out).
+        """
+        from tqdm import tqdm
+        from tqdm.contrib.logging import logging_redirect_tqdm
+        with logging_redirect_tqdm():
+            with tqdm(total=len(challenges), desc="Progress", unit="chal", dynamic_ncols=True) as pbar:
+                def _done(future: Future) -> None:
+                    ok = future.exception() is None and future.result()
+                    with self._lock:
+                        self.stats['success' if ok else 'failed'] += 1
+                        pbar.update(1)
+
+                futures = []
+                for challenge in challenges:
+                    with self.tracer.bind(challenge=key(challenge)):
+                        future = self._scheduler.submit(Scheduler.META, self._process_traced,
+                                                        process, challenge)
+                    future.add_done_callback(_done)
+                    futures.append(future)
+                wait(futures)
+
+    def _process_traced(self, process: Callable[[Dict], bool], challenge: Dict) -> bool:
+        """Run one challenge's process function inside a 'challenge' span."""
+        with self.tracer.span('challenge', title=challenge.get('name', challenge.get('title'))):
+            return process(challenge)
+
     def _process_ctfd_challenge(self, challenge: Dict) -> bool:
         """Process a single CTFd challenge"""
         try:
@@ -382,24 +2402,23 @@ class UniversalCTFScraper:
             name = challenge.get('name', 'Unknown')
             category = challenge.get('category', 'Misc')
 
-            # Check if already completed (thread-safe read via lock)
-            if self.skip_existing and self.state.is_completed(chal_id):
-                with self._lock:
-                    self.stats['skipped'] += 1
-                self.logger.debug(f"⏭️  Skipping {name} (already completed)")
+            if self._should_skip(chal_id, name):
                 return True
 
             self.logger.info(f"📥 Processing: {name} ({category})")
 
-            # Get detailed challenge info with retry
-            detail_data = self._fetch_with_retry(
-                urljoin(self.base_url, f'/api/v1/challenges/{chal_id}')
-            )
+            # Get detailed challenge info with retry — for --incremental re-checks,
+            # revalidated against the last run's ETag
+            etag = self._previous.get(chal_id, {}).get('detail_etag') if chal_id in self._recheck else None
+            with self.tracer.span('fetch details', 'http'):
+                detail_data, etag, not_modified = self._fetch_revalidated(
+                    urljoin(self.base_url, f'/api/v1/challenges/{chal_id}'), etag)
+            if self._details_unchanged(chal_id, name, detail_data, etag, not_modified):
+                return True
 
             if not detail_data or not detail_data.get('success'):
                 self.logger.warning(f"  ⚠️  Failed to get details for {name}")
-                with self._lock:
-                    self.state.mark_failed(chal_id)
+                self.state.mark_failed(chal_id)
                 return False
 
             chal_detail = detail_data.get('data', {})
@@ -407,10 +2426,15 @@ class UniversalCTFScraper:
             # Create folder structure
             category_folder = self.output_dir / self._sanitize_filename(category)
             challenge_folder = category_folder / self._sanitize_filename(name)
-            challenge_folder.mkdir(parents=True, exist_ok=True)
+            with self.tracer.span('create folder', 'disk'):
+                challenge_folder.mkdir(parents=True, exist_ok=True)
 
             # Save challenge info
             self._save_challenge_info(challenge_folder, {
+                'id': chal_id,
+                'list_hash': _list_hash(challenge),
+                'detail_hash': _detail_hash(chal_detail),
+                'detail_etag': etag,
                 'name': name,
                 'category': category,
                 'description': chal_detail.get('description', ''),
@@ -423,28 +2447,131 @@ class UniversalCTFScraper:
             # Download files concurrently
             files = chal_detail.get('files', [])
             if files:
-                self._download_files_concurrent(files, challenge_folder)
+                self._download_files_concurrent(files, challenge_folder, chal_id)
 
-            with self._lock:
-                self.state.mark_completed(chal_id)
+            self._close_manifest_entry(chal_id)
+            self.state.mark_completed(chal_id)
             self.logger.info(f"  ✅ Saved to {challenge_folder}")
             return True
 
         except Exception as e:
             self.logger.error(f"  ❌ Error processing challenge: {e}", exc_info=True)
             if 'chal_id' in locals():
-                with self._lock:
-                    self.state.mark_failed(chal_id)
+                self._close_manifest_entry(chal_id)
+                self.state.mark_failed(chal_id)
             return False
     
+    def _http_get(self, endpoint: str, url: str, **kwargs):
+        """``session.get`` timed and counted under an endpoint class in ``self.metrics``.
+
+        Streamed bodies are not read here — their callers report the bytes.
+        """
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(url, **kwargs)
+        except Exception:
+            end = time.perf_counter()
+            self.metrics.observe_request(endpoint, 'error', end - start)
+            self.tracer.add(f'GET {endpoint}', 'http', start, end, url=url, status='error')
+            raise
+        content = None if kwargs.get('stream') else resp.content
+        end = time.perf_counter()
+        self.metrics.observe_request(endpoint, resp.status_code, end - start,
+                                     len(content) if isinstance(content, bytes) else 0)
+        self.tracer.add(f'GET {endpoint}', 'http', start, end, url=url, status=str(resp.status_code))
+        return resp
+
+    def _throttle(self, limiter: RateLimiter, endpoint: str) -> None:
+        """Wait for limiter, counting the time held back."""
+        start = time.perf_counter()
+        waited = limiter.wait()
+        self.metrics.rate_wait(endpoint, waited)
+        if waited:
+            self.tracer.add('rate limit wait', 'queue', start, time.perf_counter(), endpoint=endpoint)
+
+    def _get(self, url: str, endpoint: str = 'detail', headers: Optional[Dict[str, str]] = None):
+        """Rate-limited API GET in an in-flight slot, via the response cache if enabled.
+
+        With the cache on, stored validators are sent as If-None-Match /
+        If-Modified-Since and a 304 comes back as the cached 200; entries with
+        no validators are returned without any request while inside the TTL —
+        except for ``list`` endpoints, which always go to the server so new
+        challenges are never missed.  ``headers`` (a caller's own If-None-Match)
+        are sent as well; the cache's validators take precedence over them.
+        """
+        cache = self._response_cache
+        cached = None
+        headers = dict(headers or {})
+        if cache is not None:
+            key = ResponseCache.key(url, self._auth_identity)
+            cached = cache.get(key)
+            if cached:
+                meta, body = cached
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+                if not headers and endpoint != 'list' and cache.is_fresh(meta):
+                    return _cached_response(url, body)
+
+        self._throttle(self._rate_limiter, endpoint)
+        with self._scheduler.slot():
+            if headers:
+                resp = self._http_get(endpoint, url, timeout=self.timeout, headers=headers)
+            else:
+                resp = self._http_get(endpoint, url, timeout=self.timeout)
+        self._rate_limiter.record(resp.status_code)
+
+        if cache is not None:
+            if resp.status_code == 304 and cached and headers.get('If-None-Match') == cached[0].get('etag'):
+                cache.refresh(key)
+                return _cached_response(url, cached[1], cached[0].get('etag'))
+            if resp.status_code == 200:
+                cache.put(key, resp.content, resp.headers)
+        return resp
+
+    def _should_skip(self, chal_id: str, name: str) -> bool:
+        """Skip completed challenges (--skip-existing) and ones claimed by a peer process."""
+        # --incremental already narrowed the list to added/changed challenges;
+        # --verify revisits completed ones to check their files
+        if (self.skip_existing and not self.incremental and not self.verify
+                and self.state.is_completed(chal_id)):
+            reason = "already completed"
+        elif not self.state.claim(chal_id):
+            reason = "claimed by another worker"
+        else:
+            return False
+        with self._lock:
+            self.stats['skipped'] += 1
+        self.logger.debug(f"⏭️  Skipping {name} ({reason})")
+        return True
+
     def _fetch_with_retry(self, url: str, max_retries: int = 3) -> Optional[Dict]:
         """Fetch URL with retry logic and optional rate limiting."""
+        return self._fetch_revalidated(url, max_retries=max_retries)[0]
+
+    def _fetch_revalidated(self, url: str, etag: Optional[str] = None,
+                           max_retries: int = 3) -> Tuple[Optional[Dict], Optional[str], bool]:
+        """``_fetch_with_retry`` sending If-None-Match: etag.
+
+        Returns (JSON, the response's ETag, whether it was a 304); the JSON is
+        None on a 304 or after the last failed retry.
+        """
+        import requests
+        headers = {'If-None-Match': etag} if etag else None
         for attempt in range(max_retries):
+            if attempt:
+                self.metrics.retry('detail')
             try:
-                self._rate_limiter.wait()
-                resp = self.session.get(url, timeout=self.timeout)
+                resp = self._get(url, headers=headers)
+                if resp.status_code in _THROTTLE_STATUSES and attempt < max_retries - 1:
+                    self._back_off(self._rate_limiter, resp, attempt)
+                    continue
+                if resp.status_code == 304 and etag:
+                    return None, etag, True
                 resp.raise_for_status()
-                return resp.json()
+                new_etag = resp.headers.get('ETag')
+                return resp.json(), (new_etag if isinstance(new_etag, str) else None), False
             except requests.exceptions.RequestException as e:
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt
@@ -452,70 +2579,309 @@ class UniversalCTFScraper:
                     time.sleep(wait_time)
                 else:
                     self.logger.error(f"Failed after {max_retries} retries: {e}")
-                    return None
-        return None
+                    return None, None, False
+        return None, None, False
     
-    def _download_files_concurrent(self, files: List[str], output_folder: Path):
+    def _back_off(self, limiter: RateLimiter, resp, attempt: int) -> None:
+        """Pause every thread using ``limiter`` after a 429/503, honouring Retry-After.
+
+        Throttling by the CTF host holds back its API calls and file downloads
+        alike: pausing the API limiter pauses the buckets sharing its rate
+        (which the caller's ``record()`` already slowed under ``--rate-limit auto``).
+        """
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = 2 ** attempt
+        self.logger.debug(f"Throttled ({resp.status_code}) — pausing requests for {delay:.1f}s")
+        if limiter is self._rate_limiter.bucket('files'):
+            limiter = self._rate_limiter
+        limiter.pause(delay)
+
+    def _download_limits(self, url: str) -> Tuple[RateLimiter, Optional[str]]:
+        """Rate bucket and slot host for a download — off-site hosts get their own."""
+        host = urlparse(url).netloc
+        if not host or host == self.domain:
+            return self._rate_limiter.bucket('files'), None
+        return self._cdn_limiter.bucket(host), host
+
+    def _download_files_concurrent(self, files: List[str], output_folder: Path,
+                                   challenge_id: Optional[str] = None):
         """Download files concurrently with progress bar"""
         if not files:
             return
         
+        if self.incremental and challenge_id in self._previous:
+            # Same file path (tokens stripped) as last run and still on disk → unchanged
+            before = {_file_key(f) for f in self._previous[challenge_id].get('files', [])}
+            files = [f for f in files
+                     if _file_key(f) not in before
+                     or not self._existing_file_ok(challenge_id, f,
+                                                   output_folder / _file_key(f).split('/')[-1])]
+            if not files:
+                return
+
         self.logger.info(f"  📥 Downloading {len(files)} file(s)...")
-        
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(self._download_file, file_url, output_folder): file_url
-                for file_url in files
-            }
-            
-            for future in as_completed(futures):
-                file_url = futures[future]
-                try:
-                    success = future.result()
-                    with self._lock:
-                        if success:
-                            self.stats['downloaded_files'] += 1
-                        else:
-                            self.stats['failed_files'] += 1
-                except Exception as e:
-                    self.logger.error(f"     ✗ Error downloading {file_url}: {e}")
-                    with self._lock:
+
+        # With --extract, each archive goes to the extraction pool as soon as it lands,
+        # while the challenge's other files are still downloading
+        extractions = []
+
+        def download(file_url: str) -> bool:
+            ok = self._download_file(file_url, output_folder, challenge_id)
+            if ok and self.extract:
+                pending = self._start_extraction(file_url, output_folder)
+                if pending:
+                    extractions.append(pending)
+            return ok
+
+        # Queue on the shared download stage — no per-challenge executor
+        futures = {
+            self._scheduler.submit(Scheduler.FILES, download, file_url): file_url
+            for file_url in files
+        }
+
+        with self.tracer.span('wait for downloads', 'queue', files=len(futures)):
+            wait(futures)
+        for future in as_completed(futures):
+            file_url = futures[future]
+            try:
+                success = future.result()
+                with self._lock:
+                    if success:
+                        self.stats['downloaded_files'] += 1
+                    else:
                         self.stats['failed_files'] += 1
-    
-    def _download_file(self, file_url: str, output_folder: Path) -> bool:
-        """Download a single file with progress bar and integrity check."""
+            except Exception as e:
+                self.logger.error(f"     ✗ Error downloading {file_url}: {e}")
+                with self._lock:
+                    self.stats['failed_files'] += 1
+        for pending in extractions:
+            self._finish_extraction(challenge_id, *pending)
+
+    def _start_extraction(self, file_url: str, output_folder: Path) -> Optional[Tuple]:
+        """Queue a downloaded archive for unpacking into a sibling folder.
+
+        Returns (future, file_url, folder), or None if the file is not an archive.
+        """
+        file_name = file_url.split('/')[-1].split('?')[0]
+        stem = _archive_stem(file_name)
+        if stem is None:
+            return None
+        dest = output_folder / stem
+        if dest.exists() and not dest.is_dir():
+            dest = output_folder / f'{stem}_extracted'
+        try:
+            future = self._scheduler.submit(Scheduler.EXTRACT, _extract_archive, output_folder / file_name,
+                                            dest, *self._extract_limits)
+        except Exception as e:
+            # A dead pool (BrokenProcessPool) fails the extraction, not the download
+            future = Future()
+            future.set_exception(e)
+        return future, file_url, dest
+
+    def _finish_extraction(self, challenge_id: Optional[str], future: Future,
+                           file_url: str, dest: Path) -> None:
+        """Wait for an archive to be unpacked and note its file list for index.json."""
+        file_name = file_url.split('/')[-1].split('?')[0]
+        with self.tracer.span('wait for extraction', 'queue', file=file_name):
+            try:
+                files, error = future.result(), None
+            except Exception as e:
+                files, error = None, str(e) or type(e).__name__
+        if error is None:
+            self.logger.info(f"     📦 {file_name} → {dest.name}/ ({len(files)} files)")
+            extracted = {'path': Path(os.path.relpath(dest, self.output_dir)).as_posix(), 'files': files}
+        else:
+            self.logger.warning(f"     ⚠️  Not extracting {file_name}: {error}")
+            extracted = {'error': error}
+        with self._lock:
+            record = self._downloads.get(challenge_id, {}).get(_file_key(file_url))
+            if record is not None:
+                record['extracted'] = extracted
+
+    def _download_file(self, file_url: str, output_folder: Path,
+                       challenge_id: Optional[str] = None) -> bool:
+        """Download a single file; with --dedup each URL is fetched at most once per run.
+
+        Later requests for a URL already being fetched wait for that fetch and
+        link its blob, however many challenges reference it concurrently.
+        """
+        with self.tracer.span('download', 'http', file=file_url.split('/')[-1].split('?')[0]):
+            return self._download_file_once(file_url, output_folder, challenge_id)
+
+    def _download_file_once(self, file_url: str, output_folder: Path,
+                            challenge_id: Optional[str] = None) -> bool:
+        if self._blobs is None:
+            return self._fetch_file(file_url, output_folder, challenge_id)
+
+        url_key = _dedup_key(urljoin(self.base_url, file_url), self.domain)
+        with self._lock:
+            pending = self._url_fetches.get(url_key)
+            owner = pending is None
+            if owner:
+                pending = self._url_fetches[url_key] = Future()
+        if not owner:
+            record = pending.result()
+            if record:
+                file_name = file_url.split('/')[-1].split('?')[0]
+                return self._link_blob(record, challenge_id, file_url, output_folder / file_name)
+            # The first fetch failed — try on our own
+            return self._fetch_file(file_url, output_folder, challenge_id)
+
+        record = None
+        try:
+            if self._fetch_file(file_url, output_folder, challenge_id):
+                record = self._blobs.lookup(url_key)
+                return True
+            return False
+        finally:
+            pending.set_result(record)
+
+    def _fetch_file(self, file_url: str, output_folder: Path,
+                    challenge_id: Optional[str] = None) -> bool:
+        """Download a single file via a resumable ``.part`` file, renamed into place when complete.
+
+        The response's validators (ETag / Last-Modified / length) are kept in
+        ``<name>.part.json``, so retries and later runs continue with a Range
+        request guarded by If-Range instead of starting from byte 0.
+        """
+        import requests
         try:
             file_full_url = urljoin(self.base_url, file_url)
             file_name = file_url.split('/')[-1].split('?')[0]
             file_path = output_folder / file_name
+            part_path = output_folder / f'{file_name}.part'
+            meta_path = output_folder / f'{file_name}.part.json'
 
-            # Skip if exists and skip_existing is enabled
-            if self.skip_existing and file_path.exists():
+            # Skip if exists — files only get their final name once complete
+            if ((self.skip_existing or self.verify)
+                    and self._existing_file_ok(challenge_id, file_url, file_path)):
                 self.logger.debug(f"     ⏭️  {file_name} (exists)")
                 return True
 
+            # A URL the blob store already holds: link it, revalidating if we can
+            url_key = _dedup_key(file_full_url, self.domain)
+            known = self._blobs.lookup(url_key) if self._blobs is not None else None
+            if known and not self._blobs.verify(known['sha256']):
+                self.logger.warning(f"     ⚠️  Stored copy of {file_name} is corrupt — downloading it again")
+                self._blobs.forget(url_key)
+                known = None
+            if known and not (known.get('etag') or known.get('last_modified')):
+                return self._link_blob(known, challenge_id, file_url, file_path)
+
             # Download with retry
+            limiter, host = self._download_limits(file_full_url)
+            allow_segments = self.segments > 1 and self.segment_threshold > 0
             for attempt in range(3):
+                if attempt:
+                    self.metrics.retry('file')
                 try:
-                    self._rate_limiter.wait()
-                    resp = self.session.get(file_full_url, timeout=self.timeout * 2, stream=True)
-                    resp.raise_for_status()
-                    
-                    # Get total size
-                    total_size = int(resp.headers.get('Content-Length', 0))
-                    
-                    # Download with progress
-                    with open(file_path, 'wb') as f:
-                        for chunk in resp.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    # Verify file size if Content-Length was provided
-                    if total_size > 0 and file_path.stat().st_size != total_size:
-                        self.logger.warning(f"     ⚠️  Size mismatch for {file_name}")
+                    headers, offset, expected = _resume_request(file_url, part_path, meta_path)
+                    if known and not headers:
+                        if known.get('etag'):
+                            headers['If-None-Match'] = known['etag']
+                        if known.get('last_modified'):
+                            headers['If-Modified-Since'] = known['last_modified']
+                    self._throttle(limiter, 'file')
+                    with self._scheduler.slot(host):
+                        kwargs = {'headers': headers} if headers else {}
+                        resp = self._http_get('file', file_full_url, timeout=self.timeout * 2,
+                                              stream=True, **kwargs)
+                        limiter.record(resp.status_code)
+                        if resp.status_code in _THROTTLE_STATUSES and attempt < 2:
+                            resp.close()
+                            self._back_off(limiter, resp, attempt)
+                            continue
+                        if resp.status_code == 304 and known:
+                            resp.close()
+                            return self._link_blob(known, challenge_id, file_url, file_path)
+                        if resp.status_code == 416:
+                            # Our part no longer fits the remote file — start over
+                            resp.close()
+                            _discard_part(part_path, meta_path)
+                            continue
+                        resp.raise_for_status()
+
+                        length = int(resp.headers.get('Content-Length', 0))
+                        hasher, digest = hashlib.sha256(), None
+                        if resp.status_code == 206:
+                            start, total_size = _content_range(resp)
+                            if start != offset or (expected and total_size != expected):
+                                resp.close()
+                                _discard_part(part_path, meta_path)
+                                continue
+                            if total_size is None:
+                                # 'bytes a-b/*': the server does not know the total
+                                total_size = expected or (offset + length if length else 0)
+                            mode = 'ab'
+                            _hash_into(hasher, part_path)   # the bytes we already have
+                            self.logger.debug(f"     ↻ Resuming {file_name} at {offset} bytes")
+                        else:
+                            # 200: full body (no part yet, or If-Range saw a changed file)
+                            mode, total_size = 'wb', length
+                            if (allow_segments and total_size >= self.segment_threshold
+                                    and resp.headers.get('Accept-Ranges', '').lower() == 'bytes'):
+                                resp.close()
+                                mode = None   # fetched below as parallel ranges
+
+                        etag, last_modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+                        with open(meta_path, 'w') as f:
+                            json.dump({
+                                'url':           _file_key(file_url),
+                                'etag':          etag,
+                                'last_modified': last_modified,
+                                'length':        total_size,
+                                'segmented':     mode is None,
+                            }, f)
+                        if mode:
+                            # Hash while streaming — no second pass over the file
+                            received, write_time = 0, 0.0
+                            try:
+                                with open(part_path, mode) as f:
+                                    for chunk in resp.iter_content(chunk_size=8192):
+                                        start = time.perf_counter()
+                                        f.write(chunk)
+                                        write_time += time.perf_counter() - start
+                                        received += len(chunk)
+                                        hasher.update(chunk)
+                            finally:
+                                self.metrics.add_bytes('file', received)
+                                self.metrics.disk_write('file', received, write_time)
+
+                    if mode is None:
+                        # Our slot is released — each segment takes its own
+                        segment_url = resp.url if isinstance(resp.url, str) else file_full_url
+                        if not self._download_segments(segment_url, part_path, total_size,
+                                                       _strong_validator(etag, last_modified)):
+                            _discard_part(part_path, meta_path)
+                            allow_segments = False
+                            continue
+                        # Segments land out of order, so they are hashed afterwards
+                        digest = self._scheduler.run_cpu(_sha256_file, part_path)
+
+                    # Verify file size if the server told us the length
+                    size = part_path.stat().st_size
+                    if total_size > 0 and size != total_size:
+                        self.logger.warning(f"     ⚠️  Size mismatch for {file_name} ({size}/{total_size} bytes)")
+                        if size > total_size:
+                            _discard_part(part_path, meta_path)
                         if attempt < 2:
                             continue
-                    
+                        return False   # a short part stays behind for the next run to resume
+
+                    digest = digest or hasher.hexdigest()
+                    if self._blobs is not None:
+                        self._blobs.add(part_path, digest)
+                        self._blobs.link(digest, file_path)
+                        self._blobs.remember(url_key, digest, size, etag, last_modified)
+                    else:
+                        os.replace(part_path, file_path)
+                    _discard_part(part_path, meta_path)
                     self.logger.info(f"     ✓ {file_name}")
+                    if challenge_id:
+                        record = self._note_download(challenge_id, file_url, file_path, size, digest)
+                        self.state.record_file(challenge_id, record['url'], 'completed',
+                                               size, record['sha256'])
                     return True
                     
                 except requests.exceptions.RequestException as e:
@@ -528,12 +2894,148 @@ class UniversalCTFScraper:
             
         except Exception as e:
             self.logger.error(f"     ✗ Failed to download {file_name}: {e}")
+            if challenge_id:
+                self.state.record_file(challenge_id, _file_key(file_url), 'failed')
             return False
+
+    def _link_blob(self, blob: Dict, challenge_id: Optional[str], file_url: str,
+                   file_path: Path) -> bool:
+        """Place an already-stored blob at file_path instead of downloading it."""
+        self._blobs.link(blob['sha256'], file_path)
+        self.logger.info(f"     🔗 {file_path.name} (deduplicated)")
+        if challenge_id:
+            record = self._note_download(challenge_id, file_url, file_path,
+                                         blob['size'], blob['sha256'])
+            self.state.record_file(challenge_id, record['url'], 'completed',
+                                   blob['size'], blob['sha256'])
+        return True
+
+    def _existing_file_ok(self, challenge_id: Optional[str], file_url: str, file_path: Path) -> bool:
+        """Whether a file already on disk can be kept rather than fetched again.
+
+        Checked against the size (and with --verify, the SHA-256) recorded when
+        it was downloaded; files from before hashes were recorded are trusted
+        as long as they exist.
+        """
+        if not file_path.exists():
+            return False
+        if not challenge_id:
+            return True
+        key = _file_key(file_url)
+        records = self.state.file_records(challenge_id)
+        record = records.get(key)
+        if record is None:
+            # CTFd paths carry the upload hash (/files/<hash>/name): the same
+            # name recorded under another path means the file was replaced
+            return not any(url.split('/')[-1] == file_path.name for url in records)
+        size = file_path.stat().st_size
+        if record.get('size') is not None and size != record['size']:
+            self.logger.info(f"     ↻ {file_path.name} is truncated ({size}/{record['size']} bytes)")
+            return False
+        sha256 = record.get('sha256')
+        if self.verify and sha256 and self._scheduler.run_cpu(_sha256_file, file_path) != sha256:
+            self.logger.info(f"     ↻ {file_path.name} fails its SHA-256 check")
+            return False
+        self._note_download(challenge_id, file_url, file_path, size, sha256)
+        return True
+
+    def _note_download(self, challenge_id: str, file_url: str, file_path: Path,
+                       size: int, sha256: Optional[str]) -> Dict:
+        """Remember a file's size and hash for index.json."""
+        record = {
+            'url':    _file_key(file_url),
+            'path':   Path(os.path.relpath(file_path, self.output_dir)).as_posix(),
+            'size':   size,
+            'sha256': sha256,
+        }
+        with self._lock:
+            self._downloads.setdefault(challenge_id, {})[record['url']] = record
+        return record
     
+    def _download_segments(self, url: str, part_path: Path, total: int,
+                           validator: Optional[str]) -> bool:
+        """Fetch url as ``self.segments`` byte ranges into a preallocated part file."""
+        with open(part_path, 'wb') as f:
+            f.truncate(total)
+        size = -(-total // self.segments)
+        futures = [
+            self._scheduler.submit(Scheduler.SEGMENTS, self._download_segment,
+                                   url, part_path, start, min(start + size, total) - 1, total, validator)
+            for start in range(0, total, size)
+        ]
+        # Let every segment finish before the caller may discard the part
+        wait(futures)
+        try:
+            for future in futures:
+                future.result()
+        except Exception as e:
+            self.logger.debug(f"     Segmented download of {url} failed ({e}), falling back to one stream")
+            return False
+        return True
+
+    def _download_segment(self, url: str, part_path: Path, start: int, end: int,
+                          total: int, validator: Optional[str]) -> None:
+        """Write bytes start..end of url into part_path, resuming within the range on retry."""
+        with self.tracer.span('segment', 'http', range=f'{start}-{end}'):
+            self._fetch_segment(url, part_path, start, end, total, validator)
+
+    def _fetch_segment(self, url: str, part_path: Path, start: int, end: int,
+                       total: int, validator: Optional[str]) -> None:
+        import requests
+        limiter, host = self._download_limits(url)
+        offset = start
+        for attempt in range(3):
+            if attempt:
+                self.metrics.retry('segment')
+            headers = {'Range': f'bytes={offset}-{end}'}
+            if validator:
+                headers['If-Range'] = validator
+            try:
+                self._throttle(limiter, 'segment')
+                with self._scheduler.slot(host):
+                    resp = self._http_get('segment', url, headers=headers,
+                                          timeout=self.timeout * 2, stream=True)
+                    limiter.record(resp.status_code)
+                    if resp.status_code in _THROTTLE_STATUSES and attempt < 2:
+                        resp.close()
+                        self._back_off(limiter, resp, attempt)
+                        continue
+                    resp.raise_for_status()
+                    if resp.status_code != 206 or _content_range(resp) != (offset, total):
+                        # Range ignored, or If-Range says the file changed underneath us
+                        resp.close()
+                        raise IOError(f"server did not honour {headers['Range']}")
+                    received, write_time = offset, 0.0
+                    try:
+                        with open(part_path, 'r+b') as f:
+                            f.seek(offset)
+                            for chunk in resp.iter_content(chunk_size=65536):
+                                chunk = chunk[:end + 1 - offset]
+                                write_start = time.perf_counter()
+                                f.write(chunk)
+                                write_time += time.perf_counter() - write_start
+                                offset += len(chunk)
+                                if offset > end:
+                                    break
+                    finally:
+                        self.metrics.add_bytes('segment', offset - received)
+                        self.metrics.disk_write('file', offset - received, write_time)
+                if offset > end:
+                    return
+            except requests.exceptions.RequestException:
+                if attempt < 2:
+                    time.sleep(2 ** attempt)
+                    continue
+                raise
+        raise IOError(f"segment {start}-{end} incomplete ({offset - start} bytes)")
+
     def _save_challenge_info(self, folder: Path, info: Dict) -> None:
         """Save challenge information as plain text, with HTML stripped from description."""
-        description = _html_to_text(info.get('description', ''))
-        with open(folder / 'challenge.txt', 'w', encoding='utf-8') as f:
+        with self.tracer.span('html to text', 'cpu'):
+            description = self._scheduler.run_cpu(_html_to_text, info.get('description', ''))
+        start = time.perf_counter()
+        with self.tracer.span('write challenge.txt', 'disk'), \
+                open(folder / 'challenge.txt', 'w', encoding='utf-8') as f:
             f.write(f"Challenge : {info['name']}\n")
             f.write(f"Category  : {info['category']}\n")
             f.write(f"Points    : {info.get('points', 'N/A')}\n")
@@ -549,10 +3051,17 @@ class UniversalCTFScraper:
                 f.write(f"\n{'='*60}\nFILES\n{'='*60}\n")
                 for file_url in files:
                     f.write(f"  - {file_url}\n")
+            written = f.tell()
+        self.metrics.disk_write('info', written, time.perf_counter() - start)
 
-        # Append to in-memory manifest
+        self._add_to_manifest(folder, info, description)
+
+    def _add_to_manifest(self, folder: Path, info: Dict, description: str) -> None:
+        """Hold a challenge's manifest record until its files are done (see _close_manifest_entry)."""
         with self._lock:
-            self._manifest.append({
+            self._open_entries[info.get('id')] = {
+                'id':          info.get('id'),
+                'list_hash':   info.get('list_hash'),
                 'name':        info['name'],
                 'category':    info['category'],
                 'points':      info.get('points', 0),
@@ -562,7 +3071,17 @@ class UniversalCTFScraper:
                 'description': description,
                 'files':       info.get('files', []),
                 'folder':      str(folder.relative_to(self.output_dir)),
-            })
+            }
+            for key in ('detail_hash', 'detail_etag'):
+                if info.get(key):
+                    self._open_entries[info.get('id')][key] = info[key]
+
+    def _close_manifest_entry(self, chal_id: str) -> None:
+        """Stream a finished challenge's record, with its files' hashes, to this run's journal."""
+        with self._lock:
+            entry = self._open_entries.pop(chal_id, None)
+        if entry is not None:
+            self._append_manifest(self._with_downloads(entry))
     
     def scrape_picoctf(self) -> bool:
         """Scrape picoCTF platform"""
@@ -573,7 +3092,7 @@ class UniversalCTFScraper:
         first_url = urljoin(self.base_url, '/api/challenges/?page=1')
         self.logger.info("📄 Fetching page 1...")
         try:
-            resp = self.session.get(first_url, timeout=self.timeout)
+            resp = self._get(first_url, 'list')
             resp.raise_for_status()
             first_data = resp.json()
         except Exception as e:
@@ -597,15 +3116,14 @@ class UniversalCTFScraper:
         # Fetch remaining pages concurrently
         if total_pages > 1:
             pages_fetched = {1: all_challenges}
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {
-                    executor.submit(self._fetch_picoctf_page, p): p
-                    for p in range(2, total_pages + 1)
-                }
-                for future in as_completed(futures):
-                    page_num, results = future.result()
-                    pages_fetched[page_num] = results
-                    self.logger.info(f"📄 Page {page_num}: {len(results)} challenges")
+            futures = [
+                self._scheduler.submit(Scheduler.META, self._fetch_picoctf_page, p)
+                for p in range(2, total_pages + 1)
+            ]
+            for future in as_completed(futures):
+                page_num, results = future.result()
+                pages_fetched[page_num] = results
+                self.logger.info(f"📄 Page {page_num}: {len(results)} challenges")
 
             # Reassemble in order
             all_challenges = []
@@ -615,6 +3133,9 @@ class UniversalCTFScraper:
         self.stats['total'] = len(all_challenges)
         self.logger.info(f"\n📦 Total challenges found: {len(all_challenges)}\n")
 
+        if self.incremental:
+            all_challenges = self._plan_incremental(all_challenges, _challenge_id)
+
         if self.dry_run:
             print("🔍 DRY RUN - Preview of challenges:")
             for chal in all_challenges[:10]:
@@ -627,17 +3148,7 @@ class UniversalCTFScraper:
             return True
 
         # --- Step 2: Process challenges concurrently ---
-        with self._logging_redirect_tqdm():
-            with tqdm(total=len(all_challenges), desc="Progress", unit="chal", dynamic_ncols=True) as pbar:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {executor.submit(self._process_picoctf_challenge, c): c for c in all_challenges}
-                    for future in as_completed(futures):
-                        result = future.result()
-                        if result:
-                            self.stats['success'] += 1
-                        else:
-                            self.stats['failed'] += 1
-                        pbar.update(1)
+        self._run_challenges(all_challenges, self._process_picoctf_challenge, _challenge_id)
 
         self._print_summary()
         self._save_json_manifest()
@@ -647,8 +3158,7 @@ class UniversalCTFScraper:
         """Fetch a single page of picoCTF challenges from the API."""
         url = urljoin(self.base_url, f'/api/challenges/?page={page_num}')
         try:
-            self._rate_limiter.wait()
-            r = self.session.get(url, timeout=self.timeout)
+            r = self._get(url, 'list')
             r.raise_for_status()
             d = r.json()
             if isinstance(d, dict) and 'results' in d:
@@ -670,16 +3180,14 @@ class UniversalCTFScraper:
             if isinstance(category, dict):
                 category = category.get('name', 'Misc')
             
-            # Check if already completed
-            if self.skip_existing and self.state.is_completed(chal_id):
-                with self._lock:
-                    self.stats['skipped'] += 1
+            if self._should_skip(chal_id, name):
                 return True
             
             # Create folder structure
             category_folder = self.output_dir / self._sanitize_filename(category)
             challenge_folder = category_folder / self._sanitize_filename(name)
-            challenge_folder.mkdir(parents=True, exist_ok=True)
+            with self.tracer.span('create folder', 'disk'):
+                challenge_folder.mkdir(parents=True, exist_ok=True)
             
             # Handle event and tags
             event = challenge.get('event', 'Unknown')
@@ -691,11 +3199,14 @@ class UniversalCTFScraper:
                 tags = [tag.get('name', '') for tag in tags]
             
             # Fetch full challenge details from API
-            description, hints, files_urls = self._fetch_picoctf_challenge_details_api(chal_id)
+            with self.tracer.span('fetch details', 'http'):
+                description, hints, files_urls = self._fetch_picoctf_challenge_details_api(chal_id)
             challenge_url = urljoin(self.base_url, f'/practice/challenge/{self._sanitize_url_name(name)}')
             
             # Save challenge info
-            with open(challenge_folder / 'challenge.txt', 'w', encoding='utf-8') as f:
+            start = time.perf_counter()
+            with self.tracer.span('write challenge.txt', 'disk'), \
+                    open(challenge_folder / 'challenge.txt', 'w', encoding='utf-8') as f:
                 f.write(f"Challenge: {name}\n")
                 f.write(f"Category: {category}\n")
                 f.write(f"Difficulty: {challenge.get('difficulty', 'N/A')}\n")
@@ -723,20 +3234,36 @@ class UniversalCTFScraper:
                     f.write(f"{'='*60}\n")
                     for i, hint in enumerate(hints, 1):
                         f.write(f"{i}. {hint}\n")
+                written = f.tell()
+            self.metrics.disk_write('info', written, time.perf_counter() - start)
             
+            self._add_to_manifest(challenge_folder, {
+                'id':        chal_id,
+                'list_hash': _list_hash(challenge),
+                'name':      name,
+                'category':  category,
+                'points':    challenge.get('event_points', 0),
+                'solves':    challenge.get('users_solved', 0),
+                'author':    challenge.get('author', ''),
+                'tags':      tags,
+                'files':     files_urls,
+            }, description)
+
             # Download files
             if files_urls:
                 files_folder = challenge_folder / 'files'
                 files_folder.mkdir(exist_ok=True)
-                for file_url in files_urls:
-                    self._download_file(file_url, files_folder)
+                self._download_files_concurrent(files_urls, files_folder, chal_id)
             
-            with self._lock:
-                self.state.mark_completed(chal_id)
+            self._close_manifest_entry(chal_id)
+            self.state.mark_completed(chal_id)
             return True
             
         except Exception as e:
             self.logger.error(f"  ❌ Error: {e}")
+            if 'chal_id' in locals():
+                self._close_manifest_entry(chal_id)
+                self.state.mark_failed(chal_id)
             return False
     
     def _sanitize_url_name(self, name: str) -> str:
@@ -748,39 +3275,15 @@ class UniversalCTFScraper:
         """Fetch full challenge details from picoCTF instance API"""
         try:
             api_url = urljoin(self.base_url, f'/api/challenges/{challenge_id}/instance/')
-            resp = self.session.get(api_url, timeout=self.timeout)
+            resp = self._get(api_url)
             if resp.status_code != 200:
                 self.logger.debug(f"  ⚠️  Instance API returned {resp.status_code} for challenge {challenge_id}")
                 return "", [], []
 
             data = resp.json()
 
-            # Parse description HTML -> plain text and extract file links
-            description = ""
-            file_urls = []
-            raw_desc = data.get('description', '') or ''
-            if raw_desc:
-                soup = BeautifulSoup(raw_desc, 'html.parser')
-                # Extract file download links before stripping HTML
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if href and href not in file_urls:
-                        file_urls.append(href)
-                description = soup.get_text(separator='\n', strip=True)
-
-            # Parse hints HTML -> plain text
-            hints = []
-            for hint in data.get('hints', []):
-                if isinstance(hint, str) and hint:
-                    hint_text = BeautifulSoup(hint, 'html.parser').get_text(strip=True)
-                    if hint_text:
-                        hints.append(hint_text)
-                elif isinstance(hint, dict):
-                    raw = hint.get('hint', hint.get('body', hint.get('text', '')))
-                    if raw:
-                        hints.append(BeautifulSoup(raw, 'html.parser').get_text(strip=True))
-
-            return description, hints, file_urls
+            with self.tracer.span('html to text', 'cpu'):
+                return self._scheduler.run_cpu(_picoctf_details, data)
 
         except Exception as e:
             self.logger.debug(f"  ⚠️  Error fetching challenge details from API: {e}")
@@ -797,17 +3300,24 @@ class UniversalCTFScraper:
         print(f"⏭️  Skipped: {self.stats['skipped']}")
         print(f"📥 Files Downloaded: {self.stats['downloaded_files']}")
         print(f"❌ Files Failed: {self.stats['failed_files']}")
+        if self._changelog:
+            print(f"🔄 Added: {len(self._changelog['added'])}  "
+                  f"Changed: {len(self._changelog['changed'])}  "
+                  f"Removed: {len(self._changelog['removed'])}")
+            for kind, mark in (('added', '+'), ('changed', '~'), ('removed', '-')):
+                for entry in self._changelog[kind]:
+                    print(f"   {mark} {entry['name']} ({entry['category']})")
         print(f"{'='*60}")
         print(f"📂 Output: {self.output_dir}")
     
     def scrape_rctf(self) -> bool:
         """Scrape an rCTF-based platform (redpwn framework)."""
+        import requests
         self.logger.info(f"\n🎯 Scraping rCTF platform: {self.domain}")
         print("=" * 60)
 
         try:
-            resp = self.session.get(
-                urljoin(self.base_url, '/api/v1/challs'), timeout=self.timeout)
+            resp = self._get(urljoin(self.base_url, '/api/v1/challs'), 'list')
             resp.raise_for_status()
             data = resp.json()
 
@@ -820,6 +3330,10 @@ class UniversalCTFScraper:
             self.stats['total'] = len(challenges)
             self.logger.info(f"📦 Found {len(challenges)} challenges\n")
 
+            key = lambda c: str(c.get('id', c.get('name', 'unknown')))
+            if self.incremental:
+                challenges = self._plan_incremental(challenges, key)
+
             if self.dry_run:
                 for chal in challenges[:10]:
                     print(f"  • {chal.get('name')} ({chal.get('category', 'Misc')})")
@@ -827,20 +3341,7 @@ class UniversalCTFScraper:
                     print(f"  ... and {len(challenges) - 10} more")
                 return True
 
-            with tqdm(total=len(challenges), desc="Progress", unit="chal", dynamic_ncols=True) as pbar:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {
-                        executor.submit(self._process_rctf_challenge, c): c
-                        for c in challenges
-                    }
-                    for future in as_completed(futures):
-                        result = future.result()
-                        with self._lock:
-                            if result:
-                                self.stats['success'] += 1
-                            else:
-                                self.stats['failed'] += 1
-                        pbar.update(1)
+            self._run_challenges(challenges, self._process_rctf_challenge, key)
 
             self._print_summary()
             self._save_json_manifest()
@@ -860,16 +3361,15 @@ class UniversalCTFScraper:
             name     = challenge.get('name', 'Unknown')
             category = challenge.get('category', 'Misc')
 
-            if self.skip_existing and self.state.is_completed(chal_id):
-                with self._lock:
-                    self.stats['skipped'] += 1
+            if self._should_skip(chal_id, name):
                 return True
 
             self.logger.info(f"📥 Processing: {name} ({category})")
 
             category_folder   = self.output_dir / self._sanitize_filename(category)
             challenge_folder  = category_folder / self._sanitize_filename(name)
-            challenge_folder.mkdir(parents=True, exist_ok=True)
+            with self.tracer.span('create folder', 'disk'):
+                challenge_folder.mkdir(parents=True, exist_ok=True)
 
             # rCTF files: [{"name":"chall.zip","url":"https://..."}]
             raw_files = challenge.get('files', [])
@@ -877,6 +3377,8 @@ class UniversalCTFScraper:
             file_names = [f.get('name', f['url'].split('/')[-1]) for f in raw_files if 'url' in f]
 
             self._save_challenge_info(challenge_folder, {
+                'id':          chal_id,
+                'list_hash':   _list_hash(challenge),
                 'name':        name,
                 'category':    category,
                 'description': challenge.get('description', ''),
@@ -888,18 +3390,18 @@ class UniversalCTFScraper:
             })
 
             if file_urls:
-                self._download_files_concurrent(file_urls, challenge_folder)
+                self._download_files_concurrent(file_urls, challenge_folder, chal_id)
 
-            with self._lock:
-                self.state.mark_completed(chal_id)
+            self._close_manifest_entry(chal_id)
+            self.state.mark_completed(chal_id)
             self.logger.info(f"  ✅ Saved to {challenge_folder}")
             return True
 
         except Exception as e:
             self.logger.error(f"  ❌ Error processing {challenge.get('name')}: {e}", exc_info=True)
             if 'chal_id' in locals():
-                with self._lock:
-                    self.state.mark_failed(chal_id)
+                self._close_manifest_entry(chal_id)
+                self.state.mark_failed(chal_id)
             return False
 
     def scrape_mellivora(self) -> bool:
@@ -908,8 +3410,8 @@ class UniversalCTFScraper:
         print("=" * 60)
 
         try:
-            resp = self.session.get(
-                urljoin(self.base_url, '/api/challenges.php'), timeout=self.timeout)
+            resp = self._http_get(
+                'list', urljoin(self.base_url, '/api/challenges.php'), timeout=self.timeout)
             resp.raise_for_status()
             challenges = resp.json()
 
@@ -920,6 +3422,10 @@ class UniversalCTFScraper:
             self.stats['total'] = len(challenges)
             self.logger.info(f"📦 Found {len(challenges)} challenges\n")
 
+            key = lambda c: str(c.get('id', c.get('title', 'unknown')))
+            if self.incremental:
+                challenges = self._plan_incremental(challenges, key)
+
             if self.dry_run:
                 for chal in challenges[:10]:
                     print(f"  • {chal.get('title')} ({chal.get('category', 'Misc')})")
@@ -927,20 +3433,7 @@ class UniversalCTFScraper:
                     print(f"  ... and {len(challenges) - 10} more")
                 return True
 
-            with tqdm(total=len(challenges), desc="Progress", unit="chal", dynamic_ncols=True) as pbar:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {
-                        executor.submit(self._process_mellivora_challenge, c): c
-                        for c in challenges
-                    }
-                    for future in as_completed(futures):
-                        result = future.result()
-                        with self._lock:
-                            if result:
-                                self.stats['success'] += 1
-                            else:
-                                self.stats['failed'] += 1
-                        pbar.update(1)
+            self._run_challenges(challenges, self._process_mellivora_challenge, key)
 
             self._print_summary()
             self._save_json_manifest()
@@ -957,9 +3450,7 @@ class UniversalCTFScraper:
             name     = challenge.get('title', 'Unknown')
             category = challenge.get('category', 'Misc')
 
-            if self.skip_existing and self.state.is_completed(chal_id):
-                with self._lock:
-                    self.stats['skipped'] += 1
+            if self._should_skip(chal_id, name):
                 return True
 
             self.logger.info(f"📥 Processing: {name} ({category})")
@@ -968,9 +3459,12 @@ class UniversalCTFScraper:
                 self.output_dir / self._sanitize_filename(category)
                 / self._sanitize_filename(name)
             )
-            challenge_folder.mkdir(parents=True, exist_ok=True)
+            with self.tracer.span('create folder', 'disk'):
+                challenge_folder.mkdir(parents=True, exist_ok=True)
 
             self._save_challenge_info(challenge_folder, {
+                'id':          chal_id,
+                'list_hash':   _list_hash(challenge),
                 'name':        name,
                 'category':    category,
                 'description': challenge.get('description', ''),
@@ -981,33 +3475,119 @@ class UniversalCTFScraper:
                 'files':       [],
             })
 
-            with self._lock:
-                self.state.mark_completed(chal_id)
+            self._close_manifest_entry(chal_id)
+            self.state.mark_completed(chal_id)
             self.logger.info(f"  ✅ Saved to {challenge_folder}")
             return True
 
         except Exception as e:
             self.logger.error(f"  ❌ Error: {e}", exc_info=True)
+            if 'chal_id' in locals():
+                self._close_manifest_entry(chal_id)
+                self.state.mark_failed(chal_id)
             return False
 
     def scrape(self) -> bool:
         """Main scraping method — auto-detects platform and scrapes."""
-        platform = self.detect_platform()
-        self.state.state['platform'] = platform
-
-        dispatch = {
-            'ctfd':      self.scrape_ctfd,
-            'picoctf':   self.scrape_picoctf,
-            'rctf':      self.scrape_rctf,
-            'mellivora': self.scrape_mellivora,
-        }
+        stop_metrics = self._start_metrics_writer()
+        try:
+            if self._profiler:
+                self._profiler.start()
+            # Fold in records streamed by runs that crashed before writing index.json
+            if not self.dry_run and any(self.output_dir.glob('index*.jsonl')):
+                self._save_json_manifest(recover_only=True)
+
+            dispatch = {
+                'ctfd':      self.scrape_ctfd,
+                'picoctf':   self.scrape_picoctf,
+                'rctf':      self.scrape_rctf,
+                'mellivora': self.scrape_mellivora,
+            }
 
-        if platform in dispatch:
-            return dispatch[platform]()
+            cached = None if self._redetect else self._platform_cache.get(self.domain)
+            if cached in dispatch:
+                self.logger.info(f"✅ Using cached platform for {self.domain}: {cached}")
+                self.state.state['platform'] = cached
+                if dispatch[cached]():
+                    return True
+                if self.stats['total']:
+                    return False
+                # The cached adapter could not even list challenges — stale fingerprint
+                self.logger.warning("⚠️  Cached platform failed; re-detecting...")
+                self._platform_cache.invalidate(self.domain)
+
+            platform = self.detect_platform()
+            self.state.state['platform'] = platform
+
+            if platform in dispatch:
+                self._platform_cache.put(self.domain, platform)
+                if platform == cached:
+                    return False   # same adapter already failed above
+                return dispatch[platform]()
+
+            self.logger.error(
+                "❌ Platform not recognized. Try --browser for manual login.")
+            return False
+        finally:
+            self._scheduler.shutdown()
+            # Fold this run's journal into the snapshot (also persists platform)
+            if not self.dry_run and self.output_dir.exists():
+                self.state.save()
+            self.state.close()
+            stop_metrics()
+            if self._trace_out:
+                self._write_trace()
+            if self._profiler:
+                self._write_profile()
+
+    def _write_profile(self) -> None:
+        try:
+            self._profiler.stop()
+            self.logger.info(f"🔬 Profile written → {self._profiler.directory} "
+                             f"(summary.txt, profile.pstats, profile.folded)")
+        except OSError as e:
+            self.logger.error(f"❌ Could not write profile: {e}")
 
-        self.logger.error(
-            "❌ Platform not recognized. Try --browser for manual login.")
-        return False
+    def _write_trace(self) -> None:
+        try:
+            self.tracer.write(self._trace_out, url=self.url, version=__version__,
+                              platform=self.state.state.get('platform', 'unknown'))
+            self.logger.info(f"🧭 Trace written → {self._trace_out} (open in https://ui.perfetto.dev)")
+        except OSError as e:
+            self.logger.error(f"❌ Could not write trace: {e}")
+
+    def _start_metrics_writer(self) -> Callable[[], None]:
+        """Refresh the Prometheus textfile in the background; returns a stop function.
+
+        Stopping writes the final JSON (--metrics-out) and textfile.
+        """
+        if not (self._metrics_out or self._metrics_prom):
+            return lambda: None
+        done = threading.Event()
+
+        def refresh():
+            while not done.wait(self._metrics_interval):
+                try:
+                    self.metrics.write(prom_path=self._metrics_prom)
+                except OSError as e:
+                    self.logger.debug(f"Could not refresh metrics: {e}")
+
+        writer = None
+        if self._metrics_prom:
+            writer = threading.Thread(target=refresh, name='ctf-metrics', daemon=True)
+            writer.start()
+
+        def stop():
+            done.set()
+            if writer is not None:
+                writer.join()
+            try:
+                self.metrics.write(self._metrics_out, self._metrics_prom)
+                if self._metrics_out:
+                    self.logger.info(f"📈 Metrics written → {self._metrics_out}")
+            except OSError as e:
+                self.logger.error(f"❌ Could not write metrics: {e}")
+        return stop
     
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
@@ -1281,6 +3861,16 @@ def get_cookies_securely() -> Optional[str]:
     return None
 
 
+def _rate_limit_arg(value: str) -> Union[float, str]:
+    """argparse type for --rate-limit: a number or 'auto'."""
+    if value.lower() == 'auto':
+        return 'auto'
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {value!r}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description=f'Ultimate Universal CTF Scraper v{__version__}',
@@ -1321,6 +3911,9 @@ Examples:
 
   # Rate-limited (polite scraping, 2 req/sec)
   %(prog)s "URL" -c "COOKIES" --rate-limit 2 ./output
+
+  # Adaptive rate — as fast as the CTF's WAF tolerates
+  %(prog)s "URL" -c "COOKIES" --rate-limit auto ./output
         """
     )
 
@@ -1331,10 +3924,65 @@ Examples:
     parser.add_argument('--browser', action='store_true', help='Use browser fallback mode')
     parser.add_argument('--dry-run', action='store_true', help='Preview challenges without downloading')
     parser.add_argument('--skip-existing', action='store_true', help='Skip already downloaded challenges')
-    parser.add_argument('--max-workers', type=int, default=5, help='Max concurrent downloads (default: 5)')
+    parser.add_argument('--verify', action='store_true',
+                        help='Check files on disk against their recorded SHA-256 and re-fetch bad ones')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch challenges added or changed since the last run (uses index.json)')
+    parser.add_argument('--max-workers', type=int, default=5,
+                        help='Max concurrent requests across all stages (default: 5)')
     parser.add_argument('--timeout', type=int, default=30, help='Request timeout in seconds (default: 30)')
-    parser.add_argument('--rate-limit', type=float, default=0.0, metavar='N',
-                        help='Max requests per second, e.g. 2.0 (default: unlimited)')
+    parser.add_argument('--rate-limit', type=_rate_limit_arg, default=0.0, metavar='N',
+                        help='Max requests per second to the CTF, split evenly between API calls and '
+                             'file downloads, e.g. 2.0, or "auto" to adapt to 429/503 responses (default: unlimited)')
+    parser.add_argument('--burst', type=int, default=1, metavar='N',
+                        help='Requests allowed back-to-back before --rate-limit applies (default: 1)')
+    parser.add_argument('--cdn-workers', type=int, metavar='N',
+                        help='Max concurrent downloads per off-site file host (default: --max-workers)')
+    parser.add_argument('--cdn-rate-limit', type=float, default=0.0, metavar='N',
+                        help='Max requests per second per off-site file host (default: unlimited)')
+    parser.add_argument('--cpu-workers', type=int, default=0, metavar='N',
+                        help='Processes for HTML parsing and file hashing, so they do not hold the GIL '
+                             'against downloads (default: 0, run them on the worker threads)')
+    parser.add_argument('--segments', type=int, default=4, metavar='N',
+                        help='Byte ranges fetched in parallel for large files (default: 4)')
+    parser.add_argument('--segment-threshold', type=float, default=32, metavar='MB',
+                        help='Split files at least this large into --segments ranges, 0 to disable (default: 32)')
+    parser.add_argument('--extract', action='store_true',
+                        help='Unpack downloaded zip/tar archives into sibling folders on a process pool of '
+                             'their own (--cpu-workers processes, or up to 4 when that is 0)')
+    parser.add_argument('--extract-max-size', type=float, default=1024, metavar='MB',
+                        help='Refuse archives that unpack to more than this (default: 1024)')
+    parser.add_argument('--extract-max-ratio', type=float, default=200, metavar='N',
+                        help='Refuse archives that unpack to more than N times their size (default: 200)')
+    parser.add_argument('--extract-max-files', type=int, default=10000, metavar='N',
+                        help='Refuse archives with more than N entries (default: 10000)')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Store each distinct file once under <output>/.blobs and hardlink it into challenges')
+    parser.add_argument('--blob-dir', metavar='PATH',
+                        help='Blob store for --dedup, shareable between CTF mirrors (implies --dedup)')
+    parser.add_argument('--http-cache', action='store_true',
+                        help='Cache challenge metadata on disk and revalidate with ETag/Last-Modified')
+    parser.add_argument('--cache-ttl', type=float, default=300, metavar='SECONDS',
+                        help='Reuse cached detail responses without validators for this long; '
+                             'challenge lists are always refetched (default: 300)')
+    parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+                        help='Max size of the response cache (default: 256)')
+    parser.add_argument('--state-db', metavar='PATH',
+                        help='Keep resume state in a SQLite database shareable by several worker processes')
+    parser.add_argument('--metrics-out', metavar='PATH',
+                        help='Write request latency, throughput, retry, rate-limit and queue metrics as JSON')
+    parser.add_argument('--metrics-prom', metavar='PATH',
+                        help='Keep a Prometheus textfile (node_exporter collector) of the same metrics updated')
+    parser.add_argument('--metrics-interval', type=float, default=15, metavar='SECONDS',
+                        help='How often --metrics-prom is refreshed during the run (default: 15)')
+    parser.add_argument('--trace-out', metavar='PATH',
+                        help='Write a per-challenge span timeline as Chrome trace JSON (Perfetto, chrome://tracing)')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Sample every thread and write pstats, flamegraph stacks and lock waits to DIR')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='With --profile, also record where peak memory was allocated (tracemalloc)')
+    parser.add_argument('--redetect', action='store_true',
+                        help='Ignore the cached platform fingerprint and probe again')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose logging')
     parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
 
@@ -1377,6 +4025,31 @@ Examples:
             verbose=args.verbose,
             rate_limit=args.rate_limit,
             token=args.token,
+            redetect=args.redetect,
+            state_db=args.state_db,
+            burst=args.burst,
+            cdn_workers=args.cdn_workers,
+            cdn_rate_limit=args.cdn_rate_limit,
+            cpu_workers=args.cpu_workers,
+            extract=args.extract,
+            extract_max_mb=args.extract_max_size,
+            extract_max_ratio=args.extract_max_ratio,
+            extract_max_files=args.extract_max_files,
+            http_cache=args.http_cache,
+            cache_ttl=args.cache_ttl,
+            cache_size_mb=args.cache_size,
+            incremental=args.incremental,
+            segments=args.segments,
+            segment_threshold_mb=args.segment_threshold,
+            verify=args.verify,
+            dedup=args.dedup,
+            blob_dir=args.blob_dir,
+            metrics_out=args.metrics_out,
+            metrics_prom=args.metrics_prom,
+            metrics_interval=args.metrics_interval,
+            trace_out=args.trace_out,
+            profile_dir=args.profile,
+            profile_memory=args.profile_memory,
         )
 
         success = scraper.scrape()
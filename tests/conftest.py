@@ -0,0 +1,7 @@
+"""Shared fixtures — keep the per-user cache out of the real home directory."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CTF_SCRAPER_CACHE_DIR", str(tmp_path / ".cache"))
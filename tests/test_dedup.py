@@ -0,0 +1,163 @@
+"""Tests for --dedup: the content-addressed blob store and per-URL fetch dedup."""
+import hashlib
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from ctf_scraper import BlobStore, UniversalCTFScraper, _dedup_key
+
+URL = "/files/abc/libc.so.6"
+BODY = b"\x7fELF" + b"x" * 500
+
+
+def _scraper(tmp_path, **kwargs):
+    return UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                               dedup=True, **kwargs)
+
+
+def _resp(status=200, body=BODY, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = {"Content-Length": str(len(body)), **(headers or {})}
+    resp.iter_content.return_value = [body]
+    return resp
+
+
+def _folders(tmp_path, *names):
+    folders = [tmp_path / name for name in names]
+    for folder in folders:
+        folder.mkdir()
+    return folders
+
+
+def test_concurrent_references_fetch_url_once(tmp_path):
+    scraper = _scraper(tmp_path)
+    folders = _folders(tmp_path, "part1", "part2", "part3")
+    calls = []
+
+    def slow_get(url, **kwargs):
+        calls.append(url)
+        time.sleep(0.05)
+        return _resp()
+
+    with patch.object(scraper.session, "get", side_effect=slow_get):
+        threads = [threading.Thread(target=scraper._download_file, args=(f"{URL}?token={i}", folder, str(i)))
+                   for i, folder in enumerate(folders)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert len(calls) == 1
+    inodes = {os.stat(folder / "libc.so.6").st_ino for folder in folders}
+    assert inodes == {os.stat(BlobStore(tmp_path / ".blobs").path(hashlib.sha256(BODY).hexdigest())).st_ino}
+    assert all(scraper.state.file_records(str(i)) for i in range(3))
+
+
+def test_query_selected_files_are_not_conflated(tmp_path):
+    scraper = _scraper(tmp_path)
+    a, b = _folders(tmp_path, "a", "b")
+    bodies = {"1": b"first file", "2": b"second file"}
+    with patch.object(scraper.session, "get",
+                      side_effect=lambda url, **k: _resp(body=bodies[url.rsplit("=", 1)[1]])):
+        assert scraper._download_file("https://ctf.example.com/get?id=1", a, "1")
+        assert scraper._download_file("https://ctf.example.com/get?id=2", b, "2")
+    assert (a / "get").read_bytes() == b"first file"
+    assert (b / "get").read_bytes() == b"second file"
+
+
+def test_dedup_key_drops_only_ctf_file_tokens():
+    host = "ctf.example.com"
+    assert _dedup_key("https://ctf.example.com/files/abc/a.zip?token=x.y", host) == \
+        "https://ctf.example.com/files/abc/a.zip"
+    assert _dedup_key("https://ctf.example.com/files/abc/a.zip?token=x&v=2", host) == \
+        "https://ctf.example.com/files/abc/a.zip?v=2"
+    assert _dedup_key("https://ctf.example.com/get?id=1", host) == "https://ctf.example.com/get?id=1"
+    assert _dedup_key("https://cdn.example.net/files/a.zip?token=x", host) == \
+        "https://cdn.example.net/files/a.zip?token=x"
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    scraper = _scraper(tmp_path)
+    a, b = _folders(tmp_path, "a", "b")
+    with patch.object(scraper.session, "get", side_effect=lambda *a, **k: _resp()):
+        assert scraper._download_file("/files/111/libc.so.6", a)
+        assert scraper._download_file("/files/222/libc.so.6", b)
+
+    assert os.stat(a / "libc.so.6").st_ino == os.stat(b / "libc.so.6").st_ino
+    blobs = [p for p in (tmp_path / ".blobs").rglob("*") if p.is_file() and p.parent.name != "urls"]
+    assert len(blobs) == 1
+    assert blobs[0].stat().st_mode & 0o222 == 0   # read-only
+
+
+def test_known_url_with_validator_is_revalidated(tmp_path):
+    first = _scraper(tmp_path)
+    a, b = _folders(tmp_path, "a", "b")
+    with patch.object(first.session, "get", return_value=_resp(headers={"ETag": '"v1"'})):
+        assert first._download_file(URL, a)
+
+    second = _scraper(tmp_path)
+    not_modified = _resp(status=304)
+    with patch.object(second.session, "get", return_value=not_modified) as get:
+        assert second._download_file(URL, b)
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    not_modified.iter_content.assert_not_called()
+    assert (b / "libc.so.6").read_bytes() == BODY
+
+
+def test_known_url_without_validator_needs_no_request(tmp_path):
+    first = _scraper(tmp_path)
+    a, b = _folders(tmp_path, "a", "b")
+    with patch.object(first.session, "get", return_value=_resp()):
+        assert first._download_file(URL, a)
+
+    second = _scraper(tmp_path)
+    with patch.object(second.session, "get") as get:
+        assert second._download_file(URL, b)
+    get.assert_not_called()
+    assert (b / "libc.so.6").read_bytes() == BODY
+
+
+def _corrupt(blob):
+    os.chmod(blob, 0o644)
+    blob.write_bytes(b"garbage")
+
+
+def test_corrupt_blob_is_downloaded_again_not_relinked(tmp_path):
+    first = _scraper(tmp_path)
+    a, b = _folders(tmp_path, "a", "b")
+    with patch.object(first.session, "get", return_value=_resp()):
+        assert first._download_file(URL, a)
+    _corrupt(first._blobs.path(hashlib.sha256(BODY).hexdigest()))
+
+    second = _scraper(tmp_path)
+    with patch.object(second.session, "get", return_value=_resp()) as get:
+        assert second._download_file(URL, b)
+    get.assert_called_once()
+    assert "headers" not in get.call_args.kwargs      # no If-None-Match for a bad blob
+    assert (b / "libc.so.6").read_bytes() == BODY
+    assert second._blobs.verify(hashlib.sha256(BODY).hexdigest())
+
+
+def test_add_replaces_a_corrupt_blob(tmp_path):
+    digest = hashlib.sha256(BODY).hexdigest()
+    src = tmp_path / "blob"
+    src.write_bytes(BODY)
+    _corrupt(BlobStore(tmp_path / "store").add(src, digest))
+
+    src.write_bytes(BODY)
+    assert BlobStore(tmp_path / "store").add(src, digest).read_bytes() == BODY
+    assert not src.exists()
+
+
+def test_link_falls_back_to_symlink(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    src = tmp_path / "blob"
+    src.write_bytes(BODY)
+    digest = hashlib.sha256(BODY).hexdigest()
+    store.add(src, digest)
+    with patch("os.link", side_effect=OSError("cross-device link")):
+        store.link(digest, tmp_path / "out")
+    assert (tmp_path / "out").is_symlink()
+    assert (tmp_path / "out").read_bytes() == BODY
@@ -0,0 +1,227 @@
+"""Tests for file downloads: .part resume, Range segments, atomic rename and content hashes."""
+import hashlib
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from ctf_scraper import UniversalCTFScraper
+
+URL = "/files/abc/payload.bin"
+BODY = b"0123456789" * 100
+
+
+def _scraper(tmp_path, **kwargs):
+    return UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path), **kwargs)
+
+
+def _resp(status, chunks, headers=None, fail_after=False):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+
+    def iter_content(chunk_size=8192):
+        yield from chunks
+        if fail_after:
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+    resp.iter_content.side_effect = iter_content
+    return resp
+
+
+def test_interrupted_download_resumes_with_range(tmp_path):
+    scraper = _scraper(tmp_path)
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(kwargs.get("headers"))
+        if len(calls) == 1:
+            return _resp(200, [BODY[:300]], {"Content-Length": str(len(BODY)), "ETag": '"v1"'},
+                         fail_after=True)
+        return _resp(206, [BODY[300:]], {"Content-Range": f"bytes 300-{len(BODY) - 1}/{len(BODY)}",
+                                         "Content-Length": str(len(BODY) - 300), "ETag": '"v1"'})
+
+    with patch.object(scraper.session, "get", side_effect=fake_get), patch("time.sleep"):
+        assert scraper._download_file(URL, tmp_path)
+
+    assert calls == [None, {"Range": "bytes=300-", "If-Range": '"v1"'}]
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+    assert not (tmp_path / "payload.bin.part").exists()
+    assert not (tmp_path / "payload.bin.part.json").exists()
+
+
+def test_resume_with_unknown_total_length(tmp_path):
+    # A part kept by its ETag alone, resumed by a server that answers 'bytes a-b/*'
+    (tmp_path / "payload.bin.part").write_bytes(BODY[:300])
+    (tmp_path / "payload.bin.part.json").write_text(json.dumps(
+        {"url": URL, "etag": '"v1"', "last_modified": None, "length": 0}))
+    scraper = _scraper(tmp_path)
+    resp = _resp(206, [BODY[300:]], {"Content-Range": f"bytes 300-{len(BODY) - 1}/*",
+                                     "Content-Length": str(len(BODY) - 300), "ETag": '"v1"'})
+
+    with patch.object(scraper.session, "get", return_value=resp) as get:
+        assert scraper._download_file(URL, tmp_path)
+
+    assert get.call_args.kwargs["headers"] == {"Range": "bytes=300-", "If-Range": '"v1"'}
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+    assert not (tmp_path / "payload.bin.part").exists()
+
+
+def test_changed_file_restarts_from_scratch(tmp_path):
+    # A part left by an earlier run; If-Range fails so the server sends the whole new file
+    (tmp_path / "payload.bin.part").write_bytes(b"stale")
+    (tmp_path / "payload.bin.part.json").write_text(json.dumps(
+        {"url": URL, "etag": '"v1"', "last_modified": None, "length": 999}))
+    scraper = _scraper(tmp_path)
+    resp = _resp(200, [BODY], {"Content-Length": str(len(BODY)), "ETag": '"v2"'})
+
+    with patch.object(scraper.session, "get", return_value=resp) as get:
+        assert scraper._download_file(URL, tmp_path)
+
+    assert get.call_args.kwargs["headers"] == {"Range": "bytes=5-", "If-Range": '"v1"'}
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+
+def test_part_without_validators_is_not_resumed(tmp_path):
+    (tmp_path / "payload.bin.part").write_bytes(b"stale")
+    scraper = _scraper(tmp_path)
+    resp = _resp(200, [BODY], {"Content-Length": str(len(BODY))})
+
+    with patch.object(scraper.session, "get", return_value=resp) as get:
+        assert scraper._download_file(URL, tmp_path)
+
+    assert "headers" not in get.call_args.kwargs
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+
+def test_unsatisfiable_range_discards_part(tmp_path):
+    (tmp_path / "payload.bin.part").write_bytes(BODY + b"extra")
+    (tmp_path / "payload.bin.part.json").write_text(json.dumps(
+        {"url": URL, "etag": '"v1"', "last_modified": None, "length": len(BODY)}))
+    scraper = _scraper(tmp_path)
+    responses = [_resp(416, []), _resp(200, [BODY], {"Content-Length": str(len(BODY))})]
+
+    with patch.object(scraper.session, "get", side_effect=responses) as get:
+        assert scraper._download_file(URL, tmp_path)
+
+    assert "headers" not in get.call_args.kwargs
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+
+def test_leftover_part_is_not_treated_as_existing(tmp_path):
+    (tmp_path / "payload.bin.part").write_bytes(BODY[:10])
+    scraper = _scraper(tmp_path, skip_existing=True)
+    resp = _resp(200, [BODY], {"Content-Length": str(len(BODY))})
+
+    with patch.object(scraper.session, "get", return_value=resp) as get:
+        assert scraper._download_file(URL, tmp_path)
+
+    get.assert_called_once()
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+
+def _range_server(calls, honour_ranges=True):
+    """Fake session.get serving BODY, with byte ranges when asked."""
+    lock = threading.Lock()
+
+    def fake_get(url, **kwargs):
+        headers = kwargs.get("headers") or {}
+        with lock:
+            calls.append(headers.get("Range"))
+        if "Range" in headers and honour_ranges:
+            start, end = (int(x) for x in headers["Range"][len("bytes="):].split("-"))
+            return _resp(206, [BODY[start:end + 1]],
+                         {"Content-Range": f"bytes {start}-{end}/{len(BODY)}",
+                          "Content-Length": str(end + 1 - start)})
+        return _resp(200, [BODY], {"Content-Length": str(len(BODY)), "Accept-Ranges": "bytes",
+                                   "ETag": '"v1"'})
+    return fake_get
+
+
+def test_large_file_is_fetched_in_segments(tmp_path):
+    scraper = _scraper(tmp_path, segments=4, segment_threshold_mb=0.0005)   # ~524 bytes
+    calls = []
+    try:
+        with patch.object(scraper.session, "get", side_effect=_range_server(calls)):
+            assert scraper._download_file(URL, tmp_path)
+    finally:
+        scraper._scheduler.shutdown()
+
+    assert calls[0] is None
+    assert sorted(calls[1:]) == ["bytes=0-249", "bytes=250-499", "bytes=500-749", "bytes=750-999"]
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+    assert not (tmp_path / "payload.bin.part").exists()
+
+
+def test_segments_fall_back_to_single_stream(tmp_path):
+    scraper = _scraper(tmp_path, segments=4, segment_threshold_mb=0.0005)
+    calls = []
+    try:
+        with patch.object(scraper.session, "get", side_effect=_range_server(calls, honour_ranges=False)):
+            assert scraper._download_file(URL, tmp_path)
+    finally:
+        scraper._scheduler.shutdown()
+
+    assert calls[-1] is None   # last request was a plain full download
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+
+def test_small_file_is_not_segmented(tmp_path):
+    scraper = _scraper(tmp_path, segments=4, segment_threshold_mb=1)
+    calls = []
+    with patch.object(scraper.session, "get", side_effect=_range_server(calls)):
+        assert scraper._download_file(URL, tmp_path)
+    assert calls == [None]
+
+
+def _fetch(scraper, folder, url=URL, body=BODY):
+    resp = _resp(200, [body], {"Content-Length": str(len(body))})
+    with patch.object(scraper.session, "get", return_value=resp) as get:
+        assert scraper._download_file(url, folder, "1")
+    return get
+
+
+def test_hash_is_recorded_in_state_and_manifest(tmp_path):
+    scraper = _scraper(tmp_path)
+    _fetch(scraper, tmp_path)
+    digest = hashlib.sha256(BODY).hexdigest()
+    assert scraper.state.file_records("1") == {URL: {"size": len(BODY), "sha256": digest}}
+
+    scraper._open_entries["1"] = {"id": "1", "name": "x", "files": [URL + "?token=t"]}
+    scraper._close_manifest_entry("1")
+    scraper._save_json_manifest()
+    entry = json.loads((tmp_path / "index.json").read_text())["challenges"][0]
+    assert entry["downloads"] == [{"url": URL, "path": "payload.bin",
+                                   "size": len(BODY), "sha256": digest}]
+
+
+def test_skip_existing_refetches_truncated_file(tmp_path):
+    _fetch(_scraper(tmp_path), tmp_path)
+    (tmp_path / "payload.bin").write_bytes(BODY[:10])
+    scraper = _scraper(tmp_path, skip_existing=True)
+    _fetch(scraper, tmp_path).assert_called_once()
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+    # Intact now — kept without a request
+    with patch.object(scraper.session, "get") as get:
+        assert scraper._download_file(URL, tmp_path, "1")
+    get.assert_not_called()
+
+
+def test_verify_refetches_corrupted_file(tmp_path):
+    _fetch(_scraper(tmp_path), tmp_path)
+    (tmp_path / "payload.bin").write_bytes(BODY[::-1])   # same size, wrong bytes
+    scraper = _scraper(tmp_path, skip_existing=True)
+    with patch.object(scraper.session, "get") as get:
+        assert scraper._download_file(URL, tmp_path, "1")
+    get.assert_not_called()   # size alone cannot tell
+
+    _fetch(_scraper(tmp_path, verify=True), tmp_path).assert_called_once()
+    assert (tmp_path / "payload.bin").read_bytes() == BODY
+
+
+def test_changed_ctfd_file_hash_triggers_refetch(tmp_path):
+    _fetch(_scraper(tmp_path), tmp_path)
+    scraper = _scraper(tmp_path, skip_existing=True)
+    _fetch(scraper, tmp_path, url="/files/def/payload.bin", body=b"new").assert_called_once()
+    assert (tmp_path / "payload.bin").read_bytes() == b"new"
@@ -0,0 +1,140 @@
+"""Tests for --extract: safe archive unpacking and its index.json records."""
+import io
+import json
+import tarfile
+import zipfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ctf_scraper import ExtractError, Scheduler, UniversalCTFScraper, _archive_stem, _extract_archive
+
+LIMITS = (1024 * 1024 * 1024, 200, 10000)
+
+
+def _zip(path, members):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return path
+
+
+def test_archive_stem():
+    assert _archive_stem("chall.tar.gz") == "chall"
+    assert _archive_stem("Dist.ZIP") == "Dist"
+    assert _archive_stem("libc.so.6") is None
+    assert _archive_stem(".zip") is None
+
+
+def test_unpacks_zip_and_tar(tmp_path):
+    archive = _zip(tmp_path / "a.zip", {"src/main.c": "int main;", "README": "hi", "empty/": ""})
+    assert _extract_archive(archive, tmp_path / "a", *LIMITS) == ["README", "src/main.c"]
+    assert (tmp_path / "a" / "src" / "main.c").read_text() == "int main;"
+    assert (tmp_path / "a" / "empty").is_dir()
+
+    with tarfile.open(tmp_path / "b.tar.gz", "w:gz") as tf:
+        info = tarfile.TarInfo("flag.txt")
+        info.size = 4
+        tf.addfile(info, io.BytesIO(b"flag"))
+        link = tarfile.TarInfo("passwd")
+        link.type, link.linkname = tarfile.SYMTYPE, "/etc/passwd"
+        tf.addfile(link)
+    assert _extract_archive(tmp_path / "b.tar.gz", tmp_path / "b", *LIMITS) == ["flag.txt"]
+    assert not (tmp_path / "b" / "passwd").exists()
+
+
+@pytest.mark.parametrize("name", ["../evil", "/etc/evil", "a/../../evil", "..\\evil", "C:/evil"])
+def test_refuses_paths_outside_the_folder(tmp_path, name):
+    archive = _zip(tmp_path / "t.zip", {"ok.txt": "x", name: "pwned"})
+    (tmp_path / "out").mkdir()
+    with pytest.raises(ExtractError, match="outside"):
+        _extract_archive(archive, tmp_path / "out" / "t", *LIMITS)
+    assert not (tmp_path / "out" / "t").exists()
+    assert list((tmp_path / "out").iterdir()) == []
+    assert not (tmp_path / "evil").exists()
+
+
+def test_enforces_size_ratio_and_entry_limits(tmp_path):
+    bomb = _zip(tmp_path / "bomb.zip", {"zeros": b"\0" * (4 * 1024 * 1024)})
+    with pytest.raises(ExtractError, match="expands past"):
+        _extract_archive(bomb, tmp_path / "bomb", 1024 ** 3, 200, 10000)     # ratio
+    with pytest.raises(ExtractError, match="expands past"):
+        _extract_archive(bomb, tmp_path / "bomb", 1024 * 1024, 10 ** 6, 10000)   # total size
+    assert _extract_archive(bomb, tmp_path / "bomb", 1024 ** 3, 10 ** 6, 10000) == ["zeros"]
+
+    many = _zip(tmp_path / "many.zip", {f"f{i}": "" for i in range(5)})
+    with pytest.raises(ExtractError, match="more than 4 entries"):
+        _extract_archive(many, tmp_path / "many", *LIMITS[:2], 4)
+
+
+def test_extract_does_not_move_parsing_to_processes(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path), extract=True)
+    try:
+        assert "extract" in scraper._scheduler.depths()["stages"]
+        assert "cpu" not in scraper._scheduler.depths()["stages"]
+    finally:
+        scraper._scheduler.shutdown()
+
+
+def _fake_ctfd(payloads):
+    """session.get stand-in: one CTFd challenge whose files are payloads."""
+    def fake_get(url, **kwargs):
+        resp = MagicMock()
+        resp.status_code = 200
+        if url.endswith("/api/v1/challenges"):
+            resp.json.return_value = {"success": True, "data": [{"id": 1, "name": "pwn1", "category": "Pwn"}]}
+        elif "/files/" in url:
+            body = payloads[url.split("/")[-1]]
+            resp.headers = {"Content-Length": str(len(body))}
+            resp.iter_content.return_value = [body]
+        else:
+            resp.json.return_value = {"success": True, "data": {
+                "description": "d", "files": [f"/files/h/{name}" for name in payloads]}}
+        return resp
+    return fake_get
+
+
+def _downloads(tmp_path):
+    return {d["url"]: d for d in json.loads((tmp_path / "index.json").read_text())
+            ["challenges"][0]["downloads"]}
+
+
+def test_scrape_records_extracted_files(tmp_path):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("chall/vuln.c", "gets(buf);")
+    payloads = {"dist.zip": buf.getvalue(), "bad.zip": b"not a zip", "notes.txt": b"hi"}
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  extract=True)
+    scraper._platform_cache.put(scraper.domain, "ctfd")
+
+    with patch.object(scraper.session, "get", side_effect=_fake_ctfd(payloads)):
+        assert scraper.scrape()
+
+    downloads = _downloads(tmp_path)
+    assert downloads["/files/h/dist.zip"]["extracted"] == {"path": "Pwn/pwn1/dist", "files": ["chall/vuln.c"]}
+    assert "not a zip" in downloads["/files/h/bad.zip"]["extracted"]["error"]
+    assert "extracted" not in downloads["/files/h/notes.txt"]
+    assert (tmp_path / "Pwn" / "pwn1" / "dist" / "chall" / "vuln.c").read_text() == "gets(buf);"
+
+
+def test_broken_extraction_pool_keeps_the_download(tmp_path):
+    from concurrent.futures.process import BrokenProcessPool
+
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path), extract=True)
+    scraper._platform_cache.put(scraper.domain, "ctfd")
+    submit = scraper._scheduler.submit
+
+    def broken_submit(stage, fn, *args):
+        if stage == Scheduler.EXTRACT:
+            raise BrokenProcessPool("pool died")
+        return submit(stage, fn, *args)
+
+    with patch.object(scraper.session, "get", side_effect=_fake_ctfd({"dist.zip": b"PK"})), \
+            patch.object(scraper._scheduler, "submit", side_effect=broken_submit):
+        assert scraper.scrape()
+
+    assert scraper.stats["downloaded_files"] == 1
+    assert scraper.stats["failed_files"] == 0
+    assert _downloads(tmp_path)["/files/h/dist.zip"]["extracted"] == {"error": "pool died"}
+    assert (tmp_path / "Pwn" / "pwn1" / "dist.zip").read_bytes() == b"PK"
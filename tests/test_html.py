@@ -0,0 +1,61 @@
+"""Tests for the single-pass lxml HTML-to-text layer (_parse_html)."""
+from unittest.mock import MagicMock
+
+import pytest
+from bs4 import BeautifulSoup
+
+from ctf_scraper import UniversalCTFScraper, _html_to_text, _parse_html
+
+DOCUMENTS = [
+    "<h2>Baby ROP</h2><p>Run <code>nc rop.example.com 31337</code> &lt;3</p>",
+    "<ul><li>one</li><li>two<br>three</li></ul><pre>0x401000: pop rdi\n  ret</pre>",
+    "<p>a</p><!-- hidden -->after<script>var flag = 1;</script>x<style>p {}</style>y",
+    "<p>unclosed <b>bold <i>italic</p> tail &amp; more",
+    "<div>a<template>t</template>b</div><table><tr><td>1</td><td>2</td></tr></table>",
+    "<!DOCTYPE html><html><head><title>T</title></head><body>B</body></html>",
+    "  leading text <b>bold</b>",
+    "a &amp; b",
+]
+
+
+@pytest.mark.parametrize("raw", DOCUMENTS)
+def test_matches_beautifulsoup_get_text(raw):
+    soup = BeautifulSoup(raw, "lxml")
+    strings, _links = _parse_html(raw)
+    assert "\n".join(strings) == soup.get_text(separator="\n", strip=True)
+    assert "".join(strings) == soup.get_text(strip=True)
+
+
+def test_links_unique_in_document_order():
+    _strings, links = _parse_html(
+        '<a href="/files/b.zip">b</a> <a href="/files/a.zip">a</a>'
+        '<a href="/files/b.zip">again</a><a>none</a><a href="">empty</a>')
+    assert links == ("/files/b.zip", "/files/a.zip")
+
+
+def test_plain_text_skips_parser():
+    assert _parse_html("  just markdown **text**  ") == (("just markdown **text**",), ())
+    assert _html_to_text("no html here") == "no html here"
+
+
+def test_memoized_by_content():
+    raw = "<p>memo <b>me</b> unique-7f3a</p>"
+    _parse_html(raw)
+    hits = _parse_html.cache_info().hits
+    assert _parse_html("".join(["<p>memo <b>me</b> ", "unique-7f3a</p>"])) == (("memo", "me", "unique-7f3a"), ())
+    assert _parse_html.cache_info().hits == hits + 1
+
+
+def test_picoctf_details_one_parse_per_document(tmp_path):
+    scraper = UniversalCTFScraper(url="https://play.picoctf.org", output_dir=str(tmp_path))
+    resp = MagicMock(status_code=200)
+    resp.json.return_value = {
+        "description": '<p>Get <a href="/files/x.bin">x.bin</a> and '
+                       '<a href="/files/y.txt">y.txt</a></p><p>Good luck</p>',
+        "hints": ["<p>Look at <code>strings</code></p>", {"hint": "Try <b>harder</b>"}, ""],
+    }
+    scraper._get = MagicMock(return_value=resp)
+    description, hints, files = scraper._fetch_picoctf_challenge_details_api("5")
+    assert description == "Get\nx.bin\nand\ny.txt\nGood luck"
+    assert hints == ["Look atstrings", "Tryharder"]
+    assert files == ["/files/x.bin", "/files/y.txt"]
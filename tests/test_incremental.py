@@ -0,0 +1,119 @@
+"""Tests for --incremental: list diffing, changelog and selective refetch."""
+import json
+from unittest.mock import MagicMock, patch
+
+from ctf_scraper import UniversalCTFScraper, _detail_hash, _list_hash
+
+
+def _scraper(tmp_path, **kwargs):
+    return UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                               incremental=True, **kwargs)
+
+
+def _write_index(tmp_path, entries):
+    (tmp_path / "index.json").write_text(json.dumps({"challenges": entries}))
+
+
+def test_list_hash_ignores_solves_and_file_tokens():
+    a = {"id": 1, "name": "x", "value": 100, "solves": 3,
+         "files": ["/files/abc/a.zip?token=1"]}
+    b = dict(a, solves=9, files=["/files/abc/a.zip?token=2"])
+    assert _list_hash(a) == _list_hash(b)
+    assert _list_hash(a) != _list_hash(dict(a, value=90))
+    assert _list_hash(a) != _list_hash(dict(a, files=["/files/def/a.zip?token=1"]))
+
+
+def test_plan_classifies_added_changed_removed(tmp_path):
+    old_same = {"id": 1, "name": "same", "category": "Web"}
+    old_edit = {"id": 2, "name": "edit", "category": "Pwn", "value": 500}
+    _write_index(tmp_path, [
+        {"id": "1", "name": "same", "category": "Web", "list_hash": _list_hash(old_same)},
+        {"id": "2", "name": "edit", "category": "Pwn", "list_hash": _list_hash(old_edit)},
+        {"id": "3", "name": "gone", "category": "Rev", "list_hash": "x"},
+    ])
+    scraper = _scraper(tmp_path)
+    scraper.state.mark_completed("1")
+    scraper.state.mark_completed("2")
+
+    fresh = [dict(old_same, solves=50), dict(old_edit, value=450),
+             {"id": 4, "name": "new", "category": "Web"}]
+    todo = scraper._plan_incremental(fresh, lambda c: str(c["id"]))
+
+    assert [c["name"] for c in todo] == ["edit", "new"]
+    log = json.loads((tmp_path / "changelog.json").read_text())
+    assert [e["name"] for e in log["added"]] == ["new"]
+    assert [e["name"] for e in log["changed"]] == ["edit"]
+    assert [e["name"] for e in log["removed"]] == ["gone"]
+    assert scraper.stats["skipped"] == 1
+    # Unchanged entry is kept in the merged index.json; the removed one is dropped
+    scraper._save_json_manifest()
+    index = json.loads((tmp_path / "index.json").read_text())
+    assert [e["name"] for e in index["challenges"]] == ["same", "edit"]
+
+
+def test_plan_retries_incomplete_challenges(tmp_path):
+    entry = {"id": 1, "name": "flaky", "category": "Web"}
+    _write_index(tmp_path, [{"id": "1", "name": "flaky", "list_hash": _list_hash(entry)}])
+    scraper = _scraper(tmp_path)   # state never marked "1" completed
+    assert scraper._plan_incremental([entry], lambda c: str(c["id"])) == [entry]
+
+
+def test_unchanged_files_not_redownloaded(tmp_path):
+    scraper = _scraper(tmp_path)
+    folder = tmp_path / "Web" / "chal"
+    folder.mkdir(parents=True)
+    (folder / "a.zip").write_bytes(b"old")
+    scraper._previous = {"1": {"files": ["/files/aaa/a.zip?token=old"]}}
+    with patch.object(scraper, "_download_file", return_value=True) as dl:
+        scraper._download_files_concurrent(
+            ["/files/aaa/a.zip?token=new", "/files/bbb/b.zip?token=new"], folder, "1")
+    assert [c.args[0] for c in dl.call_args_list] == ["/files/bbb/b.zip?token=new"]
+
+
+def test_detail_hash_ignores_per_user_state_and_file_tokens():
+    a = {"description": "d", "solves": 1, "attempts": 0, "view": "<div>1 solve</div>",
+         "files": ["/files/abc/a.zip?token=1"]}
+    b = dict(a, solves=7, attempts=3, view="<div>7 solves</div>", files=["/files/abc/a.zip?token=2"])
+    assert _detail_hash(a) == _detail_hash(b)
+    assert _detail_hash(a) != _detail_hash(dict(a, description="new"))
+    assert _detail_hash(a) != _detail_hash(dict(a, files=["/files/def/a.zip?token=1"]))
+
+
+def test_incremental_ctfd_rechecks_details_of_unchanged_list_entries(tmp_path):
+    listing = [{"id": i, "name": f"c{i}", "category": "Web", "value": 100} for i in range(4)]
+    detail = {"description": "d", "files": []}
+    _write_index(tmp_path, [
+        {"id": str(c["id"]), "name": c["name"], "category": "Web", "list_hash": _list_hash(c),
+         "detail_hash": _detail_hash(detail), **({"detail_etag": '"v3"'} if c["id"] == 3 else {})}
+        for c in listing])
+    scraper = _scraper(tmp_path)
+    for c in listing:
+        scraper.state.mark_completed(str(c["id"]))
+    listing[1] = dict(listing[1], value=50)                          # list entry changed
+    details = {0: detail, 1: detail, 2: dict(detail, description="edited")}
+
+    requested = {}
+
+    def fake_get(url, **kwargs):
+        requested[url] = kwargs.get("headers", {})
+        resp = MagicMock()
+        resp.status_code = 200
+        if url.endswith("/api/v1/challenges"):
+            resp.json.return_value = {"success": True, "data": listing}
+        elif url.endswith("/3"):
+            resp.status_code = 304                                   # revalidated, not modified
+        else:
+            resp.json.return_value = {"success": True, "data": details[int(url.rsplit("/", 1)[1])]}
+        return resp
+
+    with patch.object(scraper.session, "get", side_effect=fake_get):
+        assert scraper.scrape_ctfd()
+    assert requested["https://ctf.example.com/api/v1/challenges/3"] == {"If-None-Match": '"v3"'}
+    assert sorted(p.name for p in (tmp_path / "Web").iterdir()) == ["c1", "c2"]
+    log = json.loads((tmp_path / "changelog.json").read_text())
+    assert sorted(e["name"] for e in log["changed"]) == ["c1", "c2"]
+    index = {e["id"]: e for e in json.loads((tmp_path / "index.json").read_text())["challenges"]}
+    assert sorted(index) == ["0", "1", "2", "3"]
+    assert index["2"]["description"] == "edited"
+    assert index["3"]["detail_etag"] == '"v3"'
+    assert scraper.stats["skipped"] == 2
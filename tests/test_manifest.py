@@ -0,0 +1,70 @@
+"""Tests for the streamed index.jsonl manifest and the merged index.json."""
+import json
+from unittest.mock import patch
+
+from ctf_scraper import UniversalCTFScraper
+
+
+def _scraper(tmp_path, **kwargs):
+    return UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path), **kwargs)
+
+
+def _index(tmp_path):
+    return json.loads((tmp_path / "index.json").read_text())
+
+
+def test_records_stream_to_jsonl_before_the_run_ends(tmp_path):
+    scraper = _scraper(tmp_path)
+    scraper._add_to_manifest(tmp_path, {"id": "1", "name": "a", "category": "Web"}, "desc")
+    assert not scraper._journal_path.exists()   # still in flight
+    scraper._close_manifest_entry("1")
+    lines = scraper._journal_path.read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["a"]
+
+
+def test_merge_keeps_entries_skipped_this_run(tmp_path):
+    (tmp_path / "index.json").write_text(json.dumps({"challenges": [
+        {"id": "1", "name": "old"}, {"id": "2", "name": "kept"}]}))
+    scraper = _scraper(tmp_path, skip_existing=True)
+    scraper._append_manifest({"id": "1", "name": "new"})
+    scraper._append_manifest({"id": "3", "name": "added"})
+    scraper._save_json_manifest()
+
+    data = _index(tmp_path)
+    assert [e["name"] for e in data["challenges"]] == ["new", "kept", "added"]
+    assert data["total"] == 3
+    assert not list(tmp_path.glob("index*.jsonl"))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_processes_sharing_an_output_dir_keep_each_others_records(tmp_path):
+    a, b = _scraper(tmp_path), _scraper(tmp_path)
+    a._append_manifest({"id": "1"})
+    b._append_manifest({"id": "2"})
+    a._save_json_manifest()                 # b is still running: its journal stays
+    assert b._journal_path.exists()
+    b._append_manifest({"id": "3"})
+    b._save_json_manifest()
+    assert [e["id"] for e in _index(tmp_path)["challenges"]] == ["1", "2", "3"]
+
+
+def test_recovery_skips_a_live_processs_journal(tmp_path):
+    live = _scraper(tmp_path)
+    live._append_manifest({"id": "1"})
+    (tmp_path / "index.999.dead.jsonl").write_text(json.dumps({"id": "2"}) + "\n")
+    scraper = _scraper(tmp_path)
+    with patch.object(scraper, "detect_platform", return_value=None):
+        scraper.scrape()
+    assert [e["id"] for e in _index(tmp_path)["challenges"]] == ["2"]
+    assert live._journal_path.exists()
+    assert not (tmp_path / "index.999.dead.jsonl").exists()
+
+
+def test_leftover_jsonl_is_recovered_on_next_run(tmp_path):
+    (tmp_path / "index.jsonl").write_text(
+        json.dumps({"id": "1", "name": "survivor"}) + "\n" + '{"id": "2", "na')   # torn tail
+    scraper = _scraper(tmp_path)
+    with patch.object(scraper, "detect_platform", return_value=None):
+        scraper.scrape()
+    assert [e["name"] for e in _index(tmp_path)["challenges"]] == ["survivor"]
+    assert not (tmp_path / "index.jsonl").exists()
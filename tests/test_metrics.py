@@ -0,0 +1,101 @@
+"""Tests for the Metrics collector and --metrics-out / --metrics-prom."""
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ctf_scraper import Metrics, RateLimiter, UniversalCTFScraper
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    for seconds in (0.001, 0.03, 0.03, 2.0, 100.0):
+        metrics.observe_request("detail", 200, seconds, nbytes=10)
+    metrics.observe_request("detail", "error", 0.2)
+    detail = metrics.snapshot()["endpoints"]["detail"]
+    assert detail["requests"] == {"200": 5, "error": 1}
+    assert detail["bytes_in"] == 50
+    buckets = detail["latency"]["buckets"]
+    assert buckets["0.005"] == 1
+    assert buckets["0.05"] == 3
+    assert buckets["2.5"] == 5
+    assert buckets["+Inf"] == detail["latency"]["count"] == 6
+    assert detail["latency"]["max_ms"] == 100000.0
+
+
+def test_prometheus_text_format():
+    metrics = Metrics()
+    metrics.observe_request("file", 206, 0.5)
+    metrics.retry("file")
+    metrics.rate_wait("file", 1.5)
+    metrics.disk_write("file", 4096, 0.01)
+    metrics.gauge("queues", lambda: {"stages": {"files": {"depth": 2, "peak": 7}}, "in_flight": 1})
+    text = metrics.to_prometheus()
+    assert '# TYPE ctf_scraper_request_duration_seconds histogram' in text
+    assert 'ctf_scraper_requests_total{endpoint="file",status="206"} 1' in text
+    assert 'ctf_scraper_request_duration_seconds_bucket{endpoint="file",le="+Inf"} 1' in text
+    assert 'ctf_scraper_retries_total{endpoint="file"} 1' in text
+    assert 'ctf_scraper_rate_limit_wait_seconds_total{endpoint="file"} 1.5' in text
+    assert 'ctf_scraper_disk_written_bytes_total{kind="file"} 4096' in text
+    assert 'ctf_scraper_queue_depth_peak{stage="files"} 7' in text
+    assert text.endswith("\n")
+
+
+def test_rate_limiter_wait_returns_time_slept():
+    limiter = RateLimiter(1000)
+    assert limiter.wait() == 0.0
+    assert limiter.wait() > 0
+
+
+def test_scrape_writes_metrics(tmp_path):
+    metrics_json = tmp_path / "metrics.json"
+    metrics_prom = tmp_path / "textfile" / "ctf.prom"
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path / "out"),
+                                  redetect=True, metrics_out=str(metrics_json),
+                                  metrics_prom=str(metrics_prom))
+
+    def fake_get(url, **kwargs):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.content = b'{}'
+        if url.endswith("/api/v1/challenges"):
+            resp.json.return_value = {"success": True, "data": [
+                {"id": 1, "name": "chal", "category": "Web"}]}
+        elif "/files/" in url:
+            resp.headers = {"Content-Length": "5"}
+            resp.iter_content.return_value = [b"hello"]
+        elif url.endswith("/api/v1/challenges/1"):
+            resp.json.return_value = {"success": True, "data": {
+                "description": "d", "files": ["/files/abc/a.bin"]}}
+        else:
+            resp.status_code = 404
+        return resp
+
+    with patch.object(scraper.session, "get", side_effect=fake_get):
+        assert scraper.scrape()
+
+    report = json.loads(metrics_json.read_text())
+    endpoints = report["endpoints"]
+    assert set(endpoints) == {"probe", "list", "detail", "file"}
+    assert endpoints["file"]["requests"] == {"200": 1}
+    assert endpoints["file"]["bytes_in"] == 5
+    assert report["disk"]["file"] == {"writes": 1, "bytes": 5, "seconds": report["disk"]["file"]["seconds"]}
+    assert report["disk"]["info"]["writes"] == 1
+    assert report["queues"]["stages"]["meta"]["peak"] == 1
+    assert report["queues"]["in_flight"] == 0
+    assert report["stats"]["downloaded_files"] == 1
+    assert 'ctf_scraper_requests_total{endpoint="detail",status="200"} 1' in metrics_prom.read_text()
+
+
+def test_failed_recovery_still_stops_metrics_and_pools(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "index.jsonl").write_text("{}\n")
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(out),
+                                  metrics_out=str(tmp_path / "metrics.json"))
+    with patch.object(scraper, "_save_json_manifest", side_effect=OSError("disk full")), \
+            patch.object(scraper._scheduler, "shutdown") as shutdown:
+        with pytest.raises(OSError):
+            scraper.scrape()
+    shutdown.assert_called_once()
+    assert (tmp_path / "metrics.json").exists()
@@ -1,8 +1,9 @@
 """Tests for platform detection and RateLimiter."""
+import threading
 import time
 import pytest
 from unittest.mock import MagicMock, patch
-from ctf_scraper import UniversalCTFScraper, RateLimiter
+from ctf_scraper import UniversalCTFScraper, RateLimiter, PlatformCache
 
 
 # ── Platform Detection ────────────────────────────────────────────────────────
@@ -64,6 +65,143 @@ def test_detect_ctfd_uses_correct_endpoint(tmp_path):
     assert any('/api/v1/challenges' in u for u in called_urls)
 
 
+def _json_resp(data, status=200):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.content = b'x'
+    resp.json.return_value = data
+    return resp
+
+
+def test_detect_probes_run_concurrently(tmp_path):
+    """A slow host costs one probe timeout, not four in a row."""
+    scraper = _scraper_for(tmp_path, "https://slow.example.com")
+
+    def fake_get(url, **kwargs):
+        time.sleep(0.2)
+        return _json_resp(None, status=404)
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        start = time.monotonic()
+        result = scraper.detect_platform()
+    assert result == 'unknown'
+    assert time.monotonic() - start < 0.6
+
+
+def test_detect_priority_rctf_over_ctfd(tmp_path):
+    """When several fingerprints match, the higher-priority platform wins."""
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com")
+
+    def fake_get(url, **kwargs):
+        if url.endswith('/api/v1/challs'):
+            time.sleep(0.1)   # slower than the CTFd probe, still wins
+            return _json_resp({"kind": "badToken"})
+        return _json_resp({"success": True, "data": []})
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        assert scraper.detect_platform() == 'rctf'
+
+
+def test_detect_does_not_wait_for_lower_priority_probes(tmp_path):
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com")
+
+    def fake_get(url, **kwargs):
+        if url.endswith('/api/v1/challenges'):
+            return _json_resp({"success": True, "data": []})
+        if url.endswith('/api/v1/challs'):
+            return _json_resp(None, status=404)
+        time.sleep(1.0)
+        return _json_resp(None, status=404)
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        start = time.monotonic()
+        assert scraper.detect_platform() == 'ctfd'
+    assert time.monotonic() - start < 0.5
+
+
+def test_detect_short_circuits_on_html_markers(tmp_path):
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com/challenges")
+
+    def fake_get(url, **kwargs):
+        if url == "https://ctf.example.com/":
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.text = "<script>var init = {'csrfNonce': 'abc'}</script>"
+            return resp
+        time.sleep(1.0)
+        return _json_resp(None, status=404)
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        start = time.monotonic()
+        assert scraper.detect_platform() == 'ctfd'
+    assert time.monotonic() - start < 0.5
+
+
+def test_detect_ignores_ambiguous_html_markers(tmp_path):
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com")
+
+    def fake_get(url, **kwargs):
+        if url == "https://ctf.example.com/":
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.text = "csrfNonce ... Powered by Mellivora"
+            return resp
+        if url.endswith('/api/challenges.php'):
+            return _json_resp([{"title": "x"}])
+        return _json_resp(None, status=404)
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        assert scraper.detect_platform() == 'mellivora'
+
+
+# ── Platform cache ────────────────────────────────────────────────────────────
+
+def test_platform_cache_roundtrip(tmp_path):
+    cache = PlatformCache(tmp_path / "platforms.json")
+    assert cache.get("ctf.example.com") is None
+    cache.put("CTF.example.com", "ctfd")
+    assert PlatformCache(tmp_path / "platforms.json").get("ctf.example.com") == "ctfd"
+    cache.invalidate("ctf.example.com")
+    assert cache.get("ctf.example.com") is None
+
+
+def test_platform_cache_expires(tmp_path):
+    cache = PlatformCache(tmp_path / "platforms.json", ttl=60)
+    cache.put("ctf.example.com", "ctfd")
+    with patch("ctf_scraper.time.time", return_value=time.time() + 61):
+        assert cache.get("ctf.example.com") is None
+
+
+def test_scrape_uses_cached_platform(tmp_path):
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com")
+    scraper._platform_cache.put("ctf.example.com", "mellivora")
+    with patch.object(scraper, 'detect_platform') as detect, \
+            patch.object(scraper, 'scrape_mellivora', return_value=True) as run:
+        assert scraper.scrape()
+    detect.assert_not_called()
+    run.assert_called_once()
+
+
+def test_scrape_redetects_when_cached_list_fails(tmp_path):
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com")
+    scraper._platform_cache.put("ctf.example.com", "mellivora")
+    with patch.object(scraper, 'detect_platform', return_value='ctfd'), \
+            patch.object(scraper, 'scrape_mellivora', return_value=False), \
+            patch.object(scraper, 'scrape_ctfd', return_value=True) as run:
+        assert scraper.scrape()
+    run.assert_called_once()
+    assert scraper._platform_cache.get("ctf.example.com") == "ctfd"
+
+
+def test_scrape_caches_detected_platform(tmp_path):
+    scraper = _scraper_for(tmp_path, "https://ctf.example.com")
+    with patch.object(scraper, 'detect_platform', return_value='rctf'), \
+            patch.object(scraper, 'scrape_rctf', return_value=True):
+        scraper.scrape()
+    other = _scraper_for(tmp_path / "elsewhere", "https://ctf.example.com/challenges")
+    assert other._platform_cache.get(other.domain) == "rctf"
+
+
 # ── RateLimiter ───────────────────────────────────────────────────────────────
 
 def test_rate_limiter_zero_is_instant():
@@ -86,6 +224,48 @@ def test_rate_limiter_enforces_interval():
     assert elapsed >= 0.15
 
 
+def test_rate_limiter_burst_is_instant():
+    limiter = RateLimiter(1, burst=5)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - start < 0.1
+
+
+def test_rate_limiter_sleeps_outside_lock():
+    """A waiting thread must not hold the lock while it sleeps."""
+    limiter = RateLimiter(2)
+    limiter.wait()                       # consume the only token
+    sleeper = threading.Thread(target=limiter.wait)
+    sleeper.start()
+    time.sleep(0.05)
+    assert limiter._lock.acquire(timeout=0.1)
+    limiter._lock.release()
+    sleeper.join()
+
+
+def test_rate_limiter_threads_get_spaced_reservations():
+    limiter = RateLimiter(20)
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 5 calls at 20/sec → 4 intervals of 0.05s, not serialized beyond that
+    assert 0.15 <= time.monotonic() - start < 0.4
+
+
+def test_rate_limiter_named_buckets_are_independent():
+    limiter = RateLimiter(1)
+    limiter.wait()
+    files = limiter.bucket('files')
+    assert files is limiter.bucket('files')
+    start = time.monotonic()
+    files.wait()
+    assert time.monotonic() - start < 0.1
+
+
 def test_version_string():
     from ctf_scraper import __version__
     parts = __version__.split('.')
@@ -0,0 +1,66 @@
+"""Tests for --profile: the all-thread sampler and the lock-wait table."""
+import pstats
+import threading
+import time
+
+from ctf_scraper import LockStats, Profiler, RateLimiter, UniversalCTFScraper
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_timed_lock_records_contention():
+    stats = LockStats()
+    owner = RateLimiter(0)
+    stats.instrument(owner, "RateLimiter._lock")
+    holder_in = threading.Event()
+
+    def hold():
+        with owner._lock:
+            holder_in.set()
+            time.sleep(0.05)
+
+    t = threading.Thread(target=hold)
+    t.start()
+    holder_in.wait()
+    owner.wait()                                  # blocks on the held lock
+    t.join()
+    # Buckets created later report under the parent's name
+    owner.bucket("files").wait()
+
+    table = stats.summary().splitlines()
+    row = next(line for line in table if line.startswith("RateLimiter._lock"))
+    acquired, contended, wait_s = row.split()[1:4]
+    assert (int(acquired), int(contended)) == (4, 1)   # hold, wait, bucket(), bucket wait
+    assert float(wait_s) >= 0.03
+
+
+def test_profiler_samples_worker_threads(tmp_path):
+    profiler = Profiler(tmp_path / "prof", interval=0.002, memory=True)
+    profiler.start()
+    worker = threading.Thread(target=_spin, args=(0.2,), name="ctf-meta_0")
+    worker.start()
+    worker.join()
+    profiler.stop()
+
+    folded = (tmp_path / "prof" / "profile.folded").read_text().splitlines()
+    assert any(line.startswith("ctf-meta;") and "_spin (test_profile.py:" in line for line in folded)
+    stats = pstats.Stats(str(tmp_path / "prof" / "profile.pstats"))
+    spin = [func for func in stats.stats if func[2] == "_spin"]
+    assert spin and stats.stats[spin[0]][2] > 0   # own time
+    summary = (tmp_path / "prof" / "summary.txt").read_text()
+    assert "ctf-meta" in summary and "cpu" in summary
+    assert (tmp_path / "prof" / "memory.txt").read_text().startswith("Peak traced")
+
+
+def test_scraper_instruments_its_locks(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  profile_dir=str(tmp_path / "prof"))
+    with scraper._lock:
+        pass
+    scraper.state.mark_completed("1")
+    table = scraper._profiler.locks.summary()
+    assert "scraper._lock" in table and "state._lock" in table
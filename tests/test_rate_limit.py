@@ -0,0 +1,157 @@
+"""Tests for adaptive rate control and Retry-After handling."""
+import threading
+import time
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ctf_scraper import (AdaptiveRateLimiter, RateLimiter, UniversalCTFScraper,
+                         _rate_limit_arg, _retry_after)
+
+
+def _resp(status, headers=None, json_data=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.json.return_value = json_data
+    return resp
+
+
+def test_retry_after_seconds_and_date():
+    assert _retry_after(_resp(429, {'Retry-After': '7'})) == 7.0
+    in_ten = formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= _retry_after(_resp(429, {'Retry-After': in_ten})) <= 10
+    assert _retry_after(_resp(429)) is None
+    assert _retry_after(_resp(429, {'Retry-After': 'soon'})) is None
+
+
+def test_retry_after_is_capped_and_finite():
+    assert _retry_after(_resp(429, {'Retry-After': '1e9'})) == 300.0
+    far_future = formatdate(time.time() + 10 ** 8, usegmt=True)
+    assert _retry_after(_resp(429, {'Retry-After': far_future})) == 300.0
+    assert _retry_after(_resp(429, {'Retry-After': 'inf'})) is None
+    assert _retry_after(_resp(429, {'Retry-After': 'nan'})) is None
+    assert _retry_after(_resp(429, {'Retry-After': '-5'})) == 0.0
+
+
+def test_pause_blocks_all_threads_even_when_unlimited():
+    limiter = RateLimiter(0)
+    limiter.pause(0.2)
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert 0.15 <= time.monotonic() - start < 0.4
+
+
+def test_adaptive_additive_increase():
+    limiter = AdaptiveRateLimiter(initial=2.0, increase=1.0)
+    for _ in range(4):
+        limiter.record(200)
+    assert 3.5 < limiter.rate < 4.5   # ~+1 req/s after ~rate responses
+
+
+def test_adaptive_multiplicative_decrease_once_per_burst():
+    limiter = AdaptiveRateLimiter(initial=8.0, decrease=0.5, cooldown=10)
+    limiter.record(429)
+    limiter.record(503)   # same burst — ignored
+    assert limiter.rate == 4.0
+
+
+def test_adaptive_respects_bounds():
+    limiter = AdaptiveRateLimiter(initial=1.0, min_rate=0.5, max_rate=2.0, cooldown=0)
+    for _ in range(5):
+        limiter.record(429)
+    assert limiter.rate == 0.5
+    for _ in range(50):
+        limiter.record(200)
+    assert limiter.rate == 2.0
+
+
+def test_adaptive_buckets_stay_adaptive():
+    assert isinstance(AdaptiveRateLimiter().bucket('files'), AdaptiveRateLimiter)
+
+
+def test_shared_buckets_split_the_rate():
+    limiter = RateLimiter(10, shared_buckets=True)
+    files = limiter.bucket('files')
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait()
+        files.wait()
+    # 5/sec each: 3 requests per bucket → 2 intervals of 0.2s, not 0.1s
+    assert time.monotonic() - start >= 0.35
+
+
+def test_queued_downloads_do_not_delay_api_calls():
+    limiter = RateLimiter(4, shared_buckets=True)
+    files = limiter.bucket('files')
+    with patch('ctf_scraper.time.sleep'):
+        for _ in range(12):
+            files.wait()        # downloads already waiting for their turn
+    assert limiter.wait() == 0.0
+    with patch('ctf_scraper.time.sleep'):
+        assert limiter.wait() == pytest.approx(0.5, abs=0.05)
+
+
+def test_shared_adaptive_bucket_reports_to_parent():
+    limiter = AdaptiveRateLimiter(initial=8.0, decrease=0.5, shared_buckets=True)
+    files = limiter.bucket('files')
+    files.record(429)
+    assert limiter.rate == 4.0
+    assert files._share() == limiter._share() == 2.0
+
+
+def test_scraper_rate_limit_covers_file_downloads(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path), rate_limit=2)
+    files, _host = scraper._download_limits("https://ctf.example.com/files/x")
+    assert files._parent is scraper._rate_limiter
+    cdn, _host = scraper._download_limits("https://cdn.example.net/x")
+    assert cdn._parent is None
+
+
+def test_rate_limit_arg():
+    assert _rate_limit_arg('auto') == 'auto'
+    assert _rate_limit_arg('2.5') == 2.5
+    with pytest.raises(Exception):
+        _rate_limit_arg('fast')
+
+
+def test_fetch_with_retry_honours_retry_after(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  rate_limit='auto')
+    responses = iter([_resp(429, {'Retry-After': '3'}), _resp(200, json_data={"ok": True})])
+    sleeps = []
+    with patch.object(scraper.session, 'get', side_effect=lambda *a, **k: next(responses)), \
+            patch('ctf_scraper.time.sleep', side_effect=sleeps.append):
+        assert scraper._fetch_with_retry("https://ctf.example.com/api/v1/challenges/1") == {"ok": True}
+    # The Retry-After pause is served by the limiter — no extra exponential backoff
+    assert len(sleeps) == 1 and 2.5 < sleeps[0] <= 3
+    assert scraper._rate_limiter.rate < 5.0
+
+
+def test_ctf_throttling_backs_off_api_and_downloads(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  rate_limit='auto')
+    api, files = scraper._rate_limiter, scraper._rate_limiter.bucket('files')
+    api.record(429)                                   # what _get() does for an API 429
+    scraper._back_off(api, _resp(429, {'Retry-After': '30'}), 0)
+    assert files._share() < 2.5
+    with patch('ctf_scraper.time.sleep') as sleep:
+        files.wait()
+    assert sleep.call_args[0][0] > 25
+
+    other = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path / "b"),
+                                rate_limit='auto')
+    api, files = other._rate_limiter, other._rate_limiter.bucket('files')
+    files.record(503)                                 # what _fetch_file() does for a download 503
+    other._back_off(files, _resp(503, {'Retry-After': '30'}), 0)
+    assert api.rate < 5.0
+    assert api._paused_until - time.monotonic() > 25
+    # Off-site hosts are throttled on their own
+    cdn = other._cdn_limiter.bucket('cdn.example.net')
+    other._back_off(cdn, _resp(429, {'Retry-After': '60'}), 0)
+    assert api._paused_until - time.monotonic() < 31
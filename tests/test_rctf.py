@@ -93,9 +93,7 @@ def test_detect_platform_mellivora(tmp_path):
 def test_save_json_manifest_creates_file(tmp_path):
     scraper = UniversalCTFScraper(
         url="https://ctf.example.com", output_dir=str(tmp_path))
-    scraper._manifest = [
-        {"name": "Test", "category": "Web", "points": 100}
-    ]
+    scraper._append_manifest({"name": "Test", "category": "Web", "points": 100})
     scraper._save_json_manifest()
     manifest_path = tmp_path / "index.json"
     assert manifest_path.exists()
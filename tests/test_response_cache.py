@@ -0,0 +1,131 @@
+"""Tests for the on-disk ResponseCache and conditional API requests."""
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from ctf_scraper import ResponseCache, UniversalCTFScraper
+
+
+def _resp(status, body=b'', headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.content = body
+    resp.headers = headers or {}
+    resp.json.side_effect = lambda: json.loads(body)
+    return resp
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.key("https://ctf.example.com/api/v1/challenges/1", "alice")
+    cache.put(key, b'{"a": 1}', {'ETag': '"v1"'})
+    meta, body = ResponseCache(tmp_path).get(key)
+    assert body == b'{"a": 1}'
+    assert meta['etag'] == '"v1"'
+
+
+def test_concurrent_puts_of_one_key_do_not_collide(tmp_path):
+    cache = ResponseCache(tmp_path)
+    key = ResponseCache.key("https://ctf.example.com/api/v1/challenges/1")
+    bodies = [bytes([65 + i]) * 200_000 for i in range(8)]
+    errors = []
+
+    def store(body):
+        try:
+            for _ in range(10):
+                cache.put(key, body, {})
+        except Exception as e:
+            errors.append(e)
+
+    with patch("ctf_scraper.logging.debug", side_effect=errors.append):
+        threads = [threading.Thread(target=store, args=(body,)) for body in bodies]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert errors == []
+    assert cache.get(key)[1] in bodies
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_key_depends_on_auth_identity():
+    url = "https://ctf.example.com/api/v1/challenges/1"
+    assert ResponseCache.key(url, "alice") != ResponseCache.key(url, "bob")
+
+
+def test_lru_eviction_bounds_size(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=25)
+    for name in ("a", "b", "c"):
+        cache.put(name, b'x' * 10, {})
+        time.sleep(0.01)
+    assert cache.get("a") is None            # oldest evicted
+    assert cache.get("c") is not None
+    assert cache._total <= 25
+
+
+def test_lru_eviction_prefers_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=25)
+    cache.put("a", b'x' * 10, {})
+    time.sleep(0.01)
+    cache.put("b", b'x' * 10, {})
+    time.sleep(0.01)
+    cache.get("a")
+    cache.put("c", b'x' * 10, {})
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def _cached_scraper(tmp_path, **kwargs):
+    return UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                               cookies_str="session=s1", http_cache=True, **kwargs)
+
+
+def test_revalidates_with_etag_and_serves_304(tmp_path):
+    scraper = _cached_scraper(tmp_path)
+    url = "https://ctf.example.com/api/v1/challenges/1"
+    calls = []
+
+    def fake_get(u, **kwargs):
+        calls.append(kwargs.get('headers', {}))
+        if calls[-1].get('If-None-Match') == '"v1"':
+            return _resp(304)
+        return _resp(200, b'{"success": true, "data": {"id": 1}}', {'ETag': '"v1"'})
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        first = scraper._fetch_with_retry(url)
+        second = scraper._fetch_with_retry(url)
+    assert first == second == {"success": True, "data": {"id": 1}}
+    assert calls == [{}, {'If-None-Match': '"v1"'}]
+
+
+def test_ttl_serves_without_request_when_no_validators(tmp_path):
+    scraper = _cached_scraper(tmp_path, cache_ttl=60)
+    url = "https://ctf.example.com/api/challenges/5/instance/"
+    with patch.object(scraper.session, 'get', return_value=_resp(200, b'{"description": "hi"}')) as get:
+        scraper._get(url)
+        assert scraper._get(url).json() == {"description": "hi"}
+    assert get.call_count == 1
+
+
+def test_list_endpoints_skip_the_ttl(tmp_path):
+    scraper = _cached_scraper(tmp_path, cache_ttl=60)
+    url = "https://ctf.example.com/api/v1/challs"
+    with patch.object(scraper.session, 'get', side_effect=[_resp(200, b'[1]'), _resp(200, b'[1, 2]')]) as get:
+        assert scraper._get(url, 'list').json() == [1]
+        assert scraper._get(url, 'list').json() == [1, 2]
+    assert get.call_count == 2
+
+
+def test_expired_ttl_refetches(tmp_path):
+    scraper = _cached_scraper(tmp_path, cache_ttl=0)
+    url = "https://ctf.example.com/api/v1/challs"
+    with patch.object(scraper.session, 'get', return_value=_resp(200, b'{}')) as get:
+        scraper._get(url)
+        scraper._get(url)
+    assert get.call_count == 2
+
+
+def test_cache_disabled_by_default(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path))
+    assert scraper._response_cache is None
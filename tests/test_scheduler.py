@@ -0,0 +1,159 @@
+"""Tests for the shared staged Scheduler and how adapters feed it."""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from ctf_scraper import Scheduler, UniversalCTFScraper, _html_to_text, _sha256_file
+
+
+class _Gauge:
+    """Track the peak number of concurrent holders."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def test_slot_caps_in_flight_across_stages():
+    scheduler = Scheduler(3)
+    gauge = _Gauge()
+
+    def work():
+        with scheduler.slot(), gauge:
+            time.sleep(0.02)
+
+    futures = [scheduler.submit(stage, work)
+               for stage in (Scheduler.META, Scheduler.FILES) for _ in range(10)]
+    for f in futures:
+        f.result()
+    scheduler.shutdown()
+    assert gauge.peak == 3
+
+
+def test_submit_blocks_when_stage_queue_full():
+    scheduler = Scheduler(1, queue_size=1)
+    release = threading.Event()
+    scheduler.submit(Scheduler.META, release.wait)   # running
+    scheduler.submit(Scheduler.META, lambda: None)   # queued
+
+    blocked = threading.Thread(target=scheduler.submit, args=(Scheduler.META, lambda: None))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(1)
+    assert not blocked.is_alive()
+    scheduler.shutdown()
+
+
+def test_meta_task_waiting_on_files_does_not_deadlock():
+    scheduler = Scheduler(1)
+
+    def download():
+        with scheduler.slot():
+            return 'ok'
+
+    def process():
+        with scheduler.slot():
+            pass   # detail fetch
+        return scheduler.submit(Scheduler.FILES, download).result(timeout=1)
+
+    futures = [scheduler.submit(Scheduler.META, process) for _ in range(3)]
+    assert [f.result(timeout=2) for f in futures] == ['ok'] * 3
+    scheduler.shutdown()
+
+
+def test_ctfd_scrape_bounds_total_requests(tmp_path):
+    """10 challenges × 3 files with --max-workers 2 never exceed 2 requests in flight."""
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  max_workers=2)
+    gauge = _Gauge()
+
+    def fake_get(url, **kwargs):
+        with gauge:
+            time.sleep(0.005)
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.raise_for_status.return_value = None
+            resp.headers = {}
+            if url.endswith('/api/v1/challenges'):
+                resp.json.return_value = {"success": True, "data": [
+                    {"id": i, "name": f"c{i}", "category": "Web"} for i in range(10)]}
+            elif '/api/v1/challenges/' in url:
+                cid = url.rsplit('/', 1)[-1]
+                resp.json.return_value = {"success": True, "data": {
+                    "description": "d", "files": [f"/files/{cid}/f{j}" for j in range(3)]}}
+            else:
+                resp.iter_content.return_value = [b"data"]
+            return resp
+
+    with patch.object(scraper.session, 'get', side_effect=fake_get):
+        assert scraper.scrape_ctfd()
+    assert scraper.stats['success'] == 10
+    assert scraper.stats['downloaded_files'] == 30
+    assert gauge.peak <= 2
+
+
+def test_host_slots_are_separate_from_global_slot():
+    scheduler = Scheduler(1, host_limit=2)
+    with scheduler.slot():
+        # The CTF slot is taken, yet two CDN requests can still run
+        with scheduler.slot("cdn.example.net"), scheduler.slot("cdn.example.net"):
+            with scheduler.slot("storage.example.org"):
+                pass
+    scheduler.shutdown()
+
+
+def test_session_pools_sized_to_concurrency(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com/challenges", output_dir=str(tmp_path),
+                                  max_workers=8, cdn_workers=24)
+    ctf_adapter = scraper.session.get_adapter("https://ctf.example.com/api/v1/challenges")
+    cdn_adapter = scraper.session.get_adapter("https://storage.googleapis.com/bucket/a.zip")
+    assert ctf_adapter is not cdn_adapter
+    assert ctf_adapter._pool_maxsize == 8
+    assert cdn_adapter._pool_maxsize == 24
+
+
+def test_offsite_downloads_use_per_host_limits(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  rate_limit=1, cdn_rate_limit=0)
+    limiter, host = scraper._download_limits("https://cdn.example.net/f/a.zip")
+    assert host == "cdn.example.net"
+    assert limiter.rate == 0
+    assert limiter is scraper._download_limits("https://cdn.example.net/f/b.zip")[0]
+
+    limiter, host = scraper._download_limits("https://ctf.example.com/files/x")
+    assert host is None
+    assert limiter is scraper._rate_limiter.bucket('files')
+
+
+def test_run_cpu_uses_process_pool(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"abc")
+    scheduler = Scheduler(2, cpu_workers=1)
+    try:
+        assert scheduler.run_cpu(_sha256_file, path) == (
+            "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad")
+        assert scheduler.run_cpu(_html_to_text, "<p>a</p><p>b</p>") == "a\nb"
+        assert scheduler.depths()["stages"]["cpu"]["peak"] == 1
+    finally:
+        scheduler.shutdown()
+
+
+def test_run_cpu_inline_without_cpu_workers():
+    scheduler = Scheduler(2)
+    caller = threading.current_thread()
+    assert scheduler.run_cpu(threading.current_thread) is caller
+    assert "cpu" not in scheduler.depths()["stages"]
+    scheduler.shutdown()
@@ -0,0 +1,131 @@
+"""Tests for SQLiteScraperState — the multi-process state / work-queue backend."""
+import sqlite3
+import time
+from unittest.mock import patch
+
+from ctf_scraper import SQLiteScraperState, UniversalCTFScraper
+
+
+def test_mark_completed_and_failed(tmp_path):
+    state = SQLiteScraperState(tmp_path / "state.db")
+    state.mark_failed("1")
+    assert not state.is_completed("1")
+    state.mark_completed("1")
+    assert state.is_completed("1")
+    assert not state.is_completed("2")
+
+
+def test_state_survives_reopen(tmp_path):
+    db = tmp_path / "state.db"
+    state = SQLiteScraperState(db)
+    state.mark_completed("42")
+    state.state['platform'] = 'ctfd'
+    state.save()
+    state.close()
+
+    reopened = SQLiteScraperState(db)
+    assert reopened.is_completed("42")
+    assert reopened.state['platform'] == 'ctfd'
+    assert reopened.state['last_run'] is not None
+
+
+def test_wal_mode_enabled(tmp_path):
+    db = tmp_path / "state.db"
+    SQLiteScraperState(db)
+    assert sqlite3.connect(str(db)).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_claim_is_exclusive_between_workers(tmp_path):
+    db = tmp_path / "state.db"
+    a = SQLiteScraperState(db)
+    b = SQLiteScraperState(db)
+    assert a.claim("1")
+    assert not b.claim("1")
+    assert b.claim("2")
+    assert not a.claim("2")
+
+
+def test_claim_released_on_failure_and_counts_attempts(tmp_path):
+    db = tmp_path / "state.db"
+    a = SQLiteScraperState(db)
+    b = SQLiteScraperState(db)
+    assert a.claim("1")
+    a.mark_failed("1")
+    assert b.claim("1")
+    attempts = sqlite3.connect(str(db)).execute(
+        "SELECT attempts FROM challenges WHERE id = '1'").fetchone()[0]
+    assert attempts == 2
+
+
+def test_claim_not_retaken_after_peer_completes(tmp_path):
+    db = tmp_path / "state.db"
+    a = SQLiteScraperState(db)
+    b = SQLiteScraperState(db)
+    assert a.claim("1")
+    a.mark_completed("1")
+    assert not b.claim("1")
+
+
+def test_stale_claim_taken_over_after_lease(tmp_path):
+    db = tmp_path / "state.db"
+    a = SQLiteScraperState(db)
+    b = SQLiteScraperState(db, lease=0)
+    assert a.claim("1")
+    assert b.claim("1")
+
+
+def test_claim_renewed_while_held(tmp_path):
+    db = tmp_path / "state.db"
+    a = SQLiteScraperState(db, lease=0.6)
+    b = SQLiteScraperState(db, lease=0.6)
+    try:
+        assert a.claim("1")
+        time.sleep(0.9)     # past the lease — the heartbeat keeps it alive
+        assert not b.claim("1")
+    finally:
+        a.close()
+    time.sleep(0.7)
+    assert b.claim("1")
+
+
+def test_scrape_closes_state(tmp_path):
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  state_db=str(tmp_path / "state.db"))
+    with patch.object(scraper, "detect_platform", return_value="unknown"), \
+            patch.object(scraper.state, "close") as close:
+        assert not scraper.scrape()
+    close.assert_called_once()
+
+
+def test_record_file_progress(tmp_path):
+    db = tmp_path / "state.db"
+    state = SQLiteScraperState(db)
+    state.record_file("1", "/files/a.zip", "completed", 123)
+    row = sqlite3.connect(str(db)).execute(
+        "SELECT status, size FROM files WHERE challenge_id = '1'").fetchone()
+    assert row == ("completed", 123)
+
+
+def test_scraper_skips_challenges_claimed_by_peer(tmp_path):
+    db = tmp_path / "state.db"
+    peer = SQLiteScraperState(db)
+    peer.claim("7")
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path),
+                                  state_db=str(db))
+    assert scraper._process_mellivora_challenge({"id": 7, "title": "Taken"})
+    assert scraper.stats['skipped'] == 1
+    assert not (tmp_path / "Misc" / "Taken").exists()
+
+
+def test_file_records_and_schema_upgrade(tmp_path):
+    db = tmp_path / "state.db"
+    old = sqlite3.connect(str(db))
+    old.execute("""CREATE TABLE files (challenge_id TEXT NOT NULL, url TEXT NOT NULL,
+                   status TEXT NOT NULL, size INTEGER, updated_at REAL,
+                   PRIMARY KEY (challenge_id, url))""")
+    old.commit()
+    old.close()
+    state = SQLiteScraperState(db)
+    state.record_file("1", "/files/abc/a.zip", "completed", 3, "f00d")
+    state.record_file("1", "/files/abc/b.zip", "failed")
+    assert state.file_records("1") == {"/files/abc/a.zip": {"size": 3, "sha256": "f00d"}}
@@ -0,0 +1,28 @@
+"""Tests that the CLI's quick paths start without the heavy dependencies."""
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import CASES, ROOT, heavy_imports, parse_importtime
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_quick_paths_skip_heavy_imports(case):
+    assert heavy_imports(CASES[case]) == set()
+
+
+def test_scraper_loads_requests_when_built(tmp_path):
+    code = ("import sys, ctf_scraper; "
+            f"ctf_scraper.UniversalCTFScraper(url='https://ctf.example.com', output_dir={str(tmp_path)!r}); "
+            "print('requests' in sys.modules, 'bs4' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["True", "False"]
+
+
+def test_parse_importtime():
+    stderr = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   _io\n"
+              "import time:      4017 |      58762 | ctf_scraper\n"
+              "unrelated line\n")
+    assert parse_importtime(stderr) == {"_io": 120, "ctf_scraper": 58762}
@@ -80,3 +80,86 @@ def test_state_platform_stored(tmp_path):
     state.save()
     reloaded = ScraperState(state_file)
     assert reloaded.state['platform'] == 'ctfd'
+
+
+# ── Journal ───────────────────────────────────────────────────────────────────
+
+def test_mark_appends_to_journal_not_snapshot(tmp_path):
+    state_file = tmp_path / ".state.json"
+    state = ScraperState(state_file)
+    state.mark_completed("1")
+    state.mark_failed("2")
+    assert not state_file.exists()
+    lines = state.journal_file.read_text().splitlines()
+    assert [json.loads(l)["op"] for l in lines] == ["completed", "failed"]
+
+
+def test_journal_replayed_after_crash(tmp_path):
+    """No save() call (kill -9) — the journal alone must restore progress."""
+    state_file = tmp_path / ".state.json"
+    state = ScraperState(state_file)
+    state.mark_failed("1")
+    state.mark_completed("1")
+    state.mark_failed("2")
+
+    reloaded = ScraperState(state_file)
+    assert reloaded.is_completed("1")
+    assert reloaded.state['failed_challenges'] == {"2"}
+
+
+def test_journal_torn_last_line_ignored(tmp_path):
+    state_file = tmp_path / ".state.json"
+    state = ScraperState(state_file)
+    state.mark_completed("1")
+    with open(state.journal_file, "a") as f:
+        f.write('{"op": "completed", "i')
+    reloaded = ScraperState(state_file)
+    assert reloaded.is_completed("1")
+    assert len(reloaded.state['completed_challenges']) == 1
+
+
+def test_save_compacts_journal_into_snapshot(tmp_path):
+    state_file = tmp_path / ".state.json"
+    state = ScraperState(state_file)
+    state.mark_completed("1")
+    state.save()
+    assert not state.journal_file.exists()
+    assert json.loads(state_file.read_text())["completed_challenges"] == ["1"]
+
+    state.mark_completed("2")   # journaling resumes after compaction
+    reloaded = ScraperState(state_file)
+    assert reloaded.is_completed("1") and reloaded.is_completed("2")
+
+
+def test_automatic_compaction(tmp_path):
+    state_file = tmp_path / ".state.json"
+    state = ScraperState(state_file, compact_every=3)
+    for i in range(4):
+        state.mark_completed(str(i))
+    assert set(json.loads(state_file.read_text())["completed_challenges"]) == {"0", "1", "2"}
+    assert len(state.journal_file.read_text().splitlines()) == 1
+
+
+def test_legacy_state_file_plus_journal(tmp_path):
+    """Snapshots written by older versions load, and the journal layers on top."""
+    state_file = tmp_path / ".state.json"
+    state_file.write_text(json.dumps({
+        "completed_challenges": ["1"], "failed_challenges": ["2"],
+        "last_run": None, "platform": "ctfd"}))
+    state = ScraperState(state_file)
+    state.mark_completed("2")
+    reloaded = ScraperState(state_file)
+    assert reloaded.is_completed("1") and reloaded.is_completed("2")
+    assert reloaded.state['failed_challenges'] == set()
+    assert reloaded.state['platform'] == 'ctfd'
+
+
+def test_file_records_survive_journal_replay_and_compaction(tmp_path):
+    path = tmp_path / ".state.json"
+    state = ScraperState(path)
+    state.record_file("1", "/files/abc/a.zip", "completed", 3, "f00d")
+    state.record_file("1", "/files/abc/b.zip", "failed")
+    replayed = ScraperState(path)
+    assert replayed.file_records("1") == {"/files/abc/a.zip": {"size": 3, "sha256": "f00d"}}
+    replayed.save()
+    assert ScraperState(path).file_records("1") == replayed.file_records("1")
@@ -0,0 +1,71 @@
+"""Tests for the span Tracer and --trace-out."""
+import json
+from unittest.mock import MagicMock, patch
+
+from ctf_scraper import Scheduler, Tracer, UniversalCTFScraper
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer(enabled=False)
+    with tracer.bind(challenge="1"), tracer.span("work"):
+        tracer.add("wait", "queue", 0.0, 1.0)
+    fn = lambda: None
+    assert tracer.wrap("meta", fn) is fn
+    tracer.write(tmp_path / "trace.json")
+    assert json.loads((tmp_path / "trace.json").read_text())["traceEvents"] == []
+
+
+def test_scheduler_carries_tags_and_queue_wait(tmp_path):
+    tracer = Tracer()
+    scheduler = Scheduler(1, tracer=tracer)
+
+    def work():
+        with tracer.span("work", "cpu"):
+            pass
+
+    for chal_id in ("1", "2"):
+        with tracer.bind(challenge=chal_id):
+            scheduler.submit(Scheduler.META, work)
+    scheduler.shutdown()
+    tracer.write(tmp_path / "trace.json", url="u")
+
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    events = trace["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert sorted(e["args"]["challenge"] for e in spans) == ["1", "2"]
+    assert all(e["tid"] != 0 and e["dur"] >= 0 for e in spans)
+    waits = [e for e in events if e.get("cat") == "queue"]
+    assert sorted(e["ph"] for e in waits) == ["b", "b", "e", "e"]
+    assert {e["name"] for e in waits} == {"wait for meta worker"}
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert any(name.startswith("ctf-meta") for name in names)
+    assert trace["otherData"] == {"url": "u"}
+
+
+def test_scrape_writes_trace(tmp_path):
+    trace_path = tmp_path / "trace.json"
+    scraper = UniversalCTFScraper(url="https://ctf.example.com", output_dir=str(tmp_path / "out"),
+                                  trace_out=str(trace_path))
+    scraper._platform_cache.put(scraper.domain, "ctfd")
+
+    def fake_get(url, **kwargs):
+        resp = MagicMock()
+        resp.status_code = 200
+        if url.endswith("/api/v1/challenges"):
+            resp.json.return_value = {"success": True, "data": [
+                {"id": 7, "name": "chal", "category": "Web"}]}
+        elif "/files/" in url:
+            resp.headers = {"Content-Length": "2"}
+            resp.iter_content.return_value = [b"hi"]
+        else:
+            resp.json.return_value = {"success": True, "data": {
+                "description": "<p>d</p>", "files": ["/files/abc/a.bin"]}}
+        return resp
+
+    with patch.object(scraper.session, "get", side_effect=fake_get):
+        assert scraper.scrape()
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    tagged = {e["name"] for e in events if e["ph"] == "X" and e["args"].get("challenge") == "7"}
+    assert {"challenge", "fetch details", "GET detail", "create folder", "html to text",
+            "write challenge.txt", "download", "GET file", "wait for downloads"} <= tagged